@@ -8,6 +8,7 @@ compounding, and monitoring system health.
 
 import os
 import sys
+import signal
 import asyncio
 import argparse
 from rich.traceback import install
@@ -19,10 +20,21 @@ from utilities.config import initialize_config
 from utilities.logger import Logger
 from utilities.notifications import NotificationService
 from utilities.blockchain_client import BlockchainClient
+from utilities.rusk_node_client import RuskNodeClient
+from utilities.block_events import BlockEventSubscriber
+from utilities.timeseries import TimeSeriesStore
+from utilities.log_history import LogHistory
+from utilities.state_snapshot import SharedState, StateSnapshot
+from utilities.command_runner import CommandRunner
+from utilities.address_index import AddressIndex
 from utilities.blockchain_monitor import BlockchainMonitor
 from utilities.market_data import MarketDataClient
 from utilities.stake_manager import StakeManager
 from utilities.display_manager import DisplayManager
+from utilities.block_time import BlockTimeEstimator
+from utilities.web_server import DashboardServer, MetricsServer
+from utilities.metrics import REGISTRY, GAUGE
+from utilities.loop_watchdog import LoopWatchdog, measure_loop_lag
 from utilities.colors import *
 
 # Initialize rich traceback handler
@@ -38,11 +50,11 @@ console = Console()
 # SHARED STATE
 # ─────────────────────────────────────────────────────────────────────────────
 
-def create_shared_state():
+def create_shared_state(log_history_size=16):
     """Create and initialize the shared state dictionary."""
-    return {
+    return SharedState({
         "block_height": 0,
-        "remain_time": 0,                 # seconds left in the current sleep
+        "completion_timestamp": 0,        # deadline of the current sleep (ms since epoch)
         "last_no_action_block": None,     # track 'No Action' blocks
         "last_claim_block": 0,
         "stake_info": {
@@ -65,8 +77,37 @@ def create_shared_state():
         "stake_active_blk": 0,
         "options": "",
         "rewards_per_epoch": 0.0,
-        "log_entries": [],
-    }
+        "block_time": 10.0,               # measured seconds per block
+        "log_entries": LogHistory(log_history_size),
+    })
+
+# ─────────────────────────────────────────────────────────────────────────────
+# METRICS
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Shared state values exported as gauges: metric name -> (help, path in the shared state)
+STATE_GAUGES = {
+    "duskman_block_height": ("Current block height", ("block_height",)),
+    "duskman_peer_count": ("Connected node peers", ("peer_count",)),
+    "duskman_stake_amount": ("Eligible stake (DUSK)", ("stake_info", "stake_amount")),
+    "duskman_rewards_amount": ("Accumulated staking rewards (DUSK)", ("stake_info", "rewards_amount")),
+    "duskman_reclaimable_amount": ("Reclaimable slashed stake (DUSK)", ("stake_info", "reclaimable_slashed_stake")),
+    "duskman_balance_public": ("Public wallet balance (DUSK)", ("balances", "public")),
+    "duskman_balance_shielded": ("Shielded wallet balance (DUSK)", ("balances", "shielded")),
+}
+
+def register_state_metrics(shared_state, registry=REGISTRY):
+    """Export shared state values as gauges, read from the state when metrics are collected."""
+    def reader(path):
+        def read():
+            value = shared_state
+            for key in path:
+                value = value.get(key) if isinstance(value, dict) else None
+            return value
+        return read
+    
+    for name, (help_text, path) in STATE_GAUGES.items():
+        registry.register_callback(name, help_text, GAUGE, reader(path))
 
 # ─────────────────────────────────────────────────────────────────────────────
 # MAIN
@@ -78,43 +119,115 @@ async def main():
     config_data = initialize_config()
     
     # Create shared state
-    shared_state = create_shared_state()
+    shared_state = create_shared_state(config_data['log_history_size'])
+    snapshot = StateSnapshot(shared_state)
     
     # Initialize notification service
     notification_config = config_data['notification_config']
-    notifier = NotificationService(notification_config)
+    notifier = NotificationService(notification_config, snapshot=snapshot)
     shared_state["notifier"] = notifier
     
     # Initialize logger
     logger = Logger(shared_state, config_data, notifier)
     log_action = logger.log_action
     
+    # Metrics are always recorded; they are served at /metrics when enabled
+    register_state_metrics(shared_state)
+    notifier.register_metrics()
+    logger.register_metrics()
+    
+    # Event loop lag monitor: logs the stack of anything that blocks the loop
+    watchdog = None
+    if config_data['loop_watchdog']:
+        watchdog = LoopWatchdog(config_data['loop_lag_threshold'], log_action_func=log_action)
+        watchdog.register_metrics()
+    
+    # Initialize node HTTP client (ruskquery is only used when this is unreachable)
+    node_client = None
+    if config_data['node_url']:
+        node_client = RuskNodeClient(
+            config_data['node_url'],
+            timeout=config_data['node_timeout'],
+            connect_timeout=config_data['node_connect_timeout'],
+            rusk_version=config_data['rusk_version'],
+            log_action_func=log_action
+        )
+    
+    # Subscribe to pushed block events (the monitor polls while the stream is down)
+    block_events = None
+    if config_data['node_url'] and config_data['node_events']:
+        block_events = BlockEventSubscriber(
+            config_data['node_url'],
+            rusk_version=config_data['rusk_version'],
+            log_action_func=log_action
+        )
+    
+    # Initialize command runner (bounded concurrency, deadlines, kill-on-timeout)
+    command_runner = CommandRunner(
+        config_data['max_concurrent_commands'],
+        config_data['command_timeout'],
+        log_action
+    )
+    
+    # Load the persisted wallet address index
+    address_index = AddressIndex(
+        config_data['address_index_file'],
+        config_data['address_index_ttl'],
+        log_action
+    )
+    
     # Initialize blockchain client
     blockchain_client = BlockchainClient(
         config_data['use_sudo'],
         config_data['password'],
-        log_action
+        log_action,
+        node_client,
+        config_data['wallet_workers'],
+        command_runner,
+        address_index
     )
     
+    # Time-series history of everything the monitor and market client sample
+    history = None
+    if config_data['enable_history']:
+        history = TimeSeriesStore(
+            config_data['history_file'],
+            raw_retention=config_data['history_raw_days'] * 86400,
+            minute_retention=config_data['history_minute_days'] * 86400,
+            hour_retention=config_data['history_hour_days'] * 86400,
+            flush_interval=config_data['history_flush_interval'],
+            log_action_func=log_action
+        )
+    
     # Initialize market data client
-    market_data_client = MarketDataClient(log_action)
+    market_data_client = MarketDataClient(log_action, history)
     
-    # Initialize blockchain monitor
-    blockchain_monitor = BlockchainMonitor(
+    # Block time estimator shared by the monitor (feeds it), stake manager and display
+    block_time = BlockTimeEstimator()
+    
+    # Initialize stake manager
+    stake_manager = StakeManager(
         blockchain_client,
-        market_data_client,
         shared_state,
         config_data,
-        log_action
+        log_action,
+        block_time
     )
     
-    # Initialize stake manager
-    stake_manager = StakeManager(
+    # Initialize blockchain monitor
+    blockchain_monitor = BlockchainMonitor(
         blockchain_client,
+        market_data_client,
         shared_state,
         config_data,
-        log_action
+        log_action,
+        block_time,
+        stake_manager.wake,
+        block_events,
+        history
     )
+    if block_events:
+        block_events.add_listener(stake_manager.on_block)
     
     # Initialize display manager
     display_manager = DisplayManager(
@@ -122,7 +235,8 @@ async def main():
         config_data['status_bar_config'],
         config_data['display_gui'],
         config_data['enable_tmux'],
-        log_action
+        log_action,
+        block_time
     )
     
     # Helper function to colorize boolean values
@@ -176,17 +290,80 @@ async def main():
     else:
         shared_state["options"] = byline 
 
-    # Start web dashboard if enabled
+    # Start web dashboard if enabled (served from this event loop)
+    dashboard = None
     if enable_webdash:
-        from utilities.web_dashboard import start_dashboard
-        await start_dashboard(shared_state, shared_state["log_entries"], host=config_data['dash_ip'], port=config_data['dash_port'])
+        dashboard = DashboardServer(
+            shared_state,
+            snapshot,
+            host=config_data['dash_ip'],
+            port=config_data['dash_port'],
+            log_action_func=log_action,
+            history=history,
+            metrics=REGISTRY if config_data['enable_metrics'] else None
+        )
+        dashboard.register_metrics()
+        if not await dashboard.start():
+            dashboard = None
+    
+    # Without the dashboard, metrics get a server of their own on the dashboard address
+    metrics_server = None
+    if not enable_webdash and config_data['enable_metrics']:
+        metrics_server = MetricsServer(
+            REGISTRY,
+            host=config_data['dash_ip'] or '0.0.0.0',
+            port=config_data['dash_port'] or 5000,
+            log_action_func=log_action
+        )
+        if not await metrics_server.start():
+            metrics_server = None
+    
+    # Manual controls: SIGUSR1 forces a claim/stake, SIGUSR2 forces an immediate re-check
+    loop = asyncio.get_running_loop()
+    for sig, handler in ((getattr(signal, "SIGUSR1", None), stake_manager.request_claim),
+                         (getattr(signal, "SIGUSR2", None), lambda: stake_manager.wake("Manual check requested"))):
+        if sig is not None:
+            try:
+                loop.add_signal_handler(sig, handler)
+            except NotImplementedError:
+                pass
     
     # Start all the main loops
-    await asyncio.gather(
+    loops = [
         blockchain_monitor.frequent_update_loop(),
         display_manager.realtime_display_loop(),
         stake_manager.stake_management_loop(),
-    )
+    ]
+    if watchdog:
+        loops.append(watchdog.run())
+    elif config_data['enable_metrics']:
+        loops.append(measure_loop_lag())
+    if block_events:
+        loops.append(block_events.run())
+    if history:
+        loops.append(history.run())
+    if dashboard:
+        loops.append(dashboard.run())
+    loops.append(notifier.run())
+    
+    try:
+        await asyncio.gather(*loops)
+    finally:
+        if dashboard:
+            await dashboard.close()
+        if metrics_server:
+            await metrics_server.close()
+        if block_events:
+            await block_events.close()
+        if history:
+            await history.close()
+        await blockchain_client.wallet.stop()
+        if node_client:
+            await node_client.close()
+        await notifier.close()
+        if watchdog:
+            watchdog.close()
+        logger.close()
 
 if __name__ == "__main__":
     try:
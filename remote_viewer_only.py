@@ -92,13 +92,20 @@ def format_hms(seconds):
 
 async def fetch_data(remote_ip, remote_port):
     url = f"http://{remote_ip}:{remote_port}/api/data"
+    etag = None
+    completion_timestamp = 0
     async with aiohttp.ClientSession() as session:
         while True:
             try:
-                async with session.get(url) as response:
-                    if response.status == 200:
+                headers = {"If-None-Match": etag} if etag else {}
+                async with session.get(url, headers=headers) as response:
+                    if response.status == 304:
+                        pass  # unchanged since the last poll
+                    elif response.status == 200:
+                        etag = response.headers.get("ETag")
                         data = await response.json()
                         shared_data = data.get("data", {})
+                        completion_timestamp = shared_data.get("completion_timestamp", 0)
 
                         shared_state["balances"] = {
                             "public": shared_data.get("balances_public", 0),
@@ -110,12 +117,13 @@ async def fetch_data(remote_ip, remote_port):
                         shared_state["last_action_taken"] = shared_data.get("last_action", "")
                         shared_state["peer_count"] = shared_data.get("peer_count", "0")
                         shared_state["price"] = shared_data.get("price", 0.0)
-                        shared_state["remain_time"] = shared_data.get("remain_time", 0)
                         shared_state["stake_info"] = shared_data.get("stake_info", {})
                         shared_state["usd_24h_change"] = shared_data.get("usd_24h_change", 0.0)
 
                     else:
                         logging.error(f"Failed to fetch data: HTTP {response.status}")
+                # Count down locally from the deadline (milliseconds since epoch)
+                shared_state["remain_time"] = max(0, int(completion_timestamp / 1000 - datetime.now().timestamp()))
             except Exception as e:
                 logging.error(f"Error fetching data: {e}")
 
@@ -0,0 +1,95 @@
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+
+class AddressIndex:
+    """
+    Persisted index of the wallet's public and shielded addresses.
+    Loaded at startup and reused across balance refreshes; it only needs to be
+    rebuilt from 'rusk-wallet profiles' when it expires or is invalidated.
+    """
+
+    def __init__(self, path: str = "duskman_addresses.json", ttl: float = 86400, log_action_func=None):
+        """
+        Initialize the address index.
+
+        Args:
+            path: File the index is persisted to (empty to keep it in memory only)
+            ttl: Seconds before the index is revalidated against the wallet
+            log_action_func: Function to call for logging
+        """
+        self.path = path
+        self.ttl = ttl
+        self.log_action = log_action_func or (lambda *args, **kwargs: None)
+        self.addresses: Dict[str, List[str]] = {"public": [], "shielded": []}
+        self.updated = 0.0
+        self.load()
+
+    def load(self) -> bool:
+        """
+        Load the index from disk.
+
+        Returns:
+            True if a valid index was loaded, False otherwise
+        """
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            self.addresses = {
+                "public": list(data.get("public", [])),
+                "shielded": list(data.get("shielded", [])),
+            }
+            self.updated = float(data.get("updated", 0))
+            return True
+        except (OSError, ValueError, TypeError) as e:
+            self.log_action("Address index error", f"Could not load {self.path}: {e}", "debug")
+            return False
+
+    def save(self) -> None:
+        """Persist the index to disk."""
+        if not self.path:
+            return
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"updated": self.updated, **self.addresses}, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            self.log_action("Address index error", f"Could not save {self.path}: {e}", "debug")
+
+    def is_stale(self, now: Optional[float] = None) -> bool:
+        """True if the index is empty, invalidated or older than the TTL."""
+        now = time.time() if now is None else now
+        if not self.addresses["public"] and not self.addresses["shielded"]:
+            return True
+        return now - self.updated >= self.ttl
+
+    def invalidate(self) -> None:
+        """Force revalidation on the next refresh."""
+        self.updated = 0.0
+
+    def update(self, addresses: Dict[str, List[str]]) -> bool:
+        """
+        Replace the index with freshly parsed addresses.
+
+        Args:
+            addresses: Dict with "public" and "shielded" address lists
+
+        Returns:
+            True if the addresses changed, False otherwise
+        """
+        changed = addresses != self.addresses
+        if changed and (self.addresses["public"] or self.addresses["shielded"]):
+            self.log_action(
+                "Wallet addresses changed",
+                f"Public: {len(addresses['public'])}, Shielded: {len(addresses['shielded'])}",
+                "info"
+            )
+        self.addresses = {"public": list(addresses["public"]), "shielded": list(addresses["shielded"])}
+        self.updated = time.time()
+        self.save()
+        return changed
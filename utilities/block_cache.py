@@ -0,0 +1,66 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+class BlockCache:
+    """
+    Read-through cache keyed by block height.
+    A cached value is reused until the block height changes. Concurrent callers
+    asking for the same key at the same height share one in-flight fetch.
+    """
+
+    def __init__(self):
+        """Initialize an empty cache."""
+        self._entries: Dict[str, Tuple[int, Any]] = {}
+        self._inflight: Dict[str, Tuple[int, int, asyncio.Future]] = {}
+        self._generation: Dict[str, int] = {}
+
+    async def get(self, key: str, block_height: Optional[int], fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the value for key at block_height, fetching it if needed.
+
+        Args:
+            key: Cache key (e.g. "stake_info")
+            block_height: Block height the value must belong to. Unknown heights (None/0) bypass the cache
+            fetch: Coroutine function producing the value. None results are not cached
+
+        Returns:
+            The cached or freshly fetched value
+        """
+        if not block_height:
+            return await fetch()
+
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == block_height:
+            return entry[1]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None and inflight[0] == block_height:
+            return await asyncio.shield(inflight[2])
+
+        generation = self._generation.get(key, 0)
+        future = asyncio.ensure_future(fetch())
+        self._inflight[key] = (block_height, generation, future)
+        try:
+            value = await asyncio.shield(future)
+        finally:
+            if self._inflight.get(key, (None, None, None))[2] is future:
+                del self._inflight[key]
+
+        # Only store the result if nothing invalidated the key while we were fetching
+        if value is not None and self._generation.get(key, 0) == generation:
+            self._entries[key] = (block_height, value)
+        return value
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """
+        Drop cached values so the next get() fetches fresh data.
+
+        Args:
+            key: Key to invalidate, or None to invalidate everything
+        """
+        keys = [key] if key is not None else set(self._entries) | set(self._inflight)
+        for k in keys:
+            self._entries.pop(k, None)
+            self._inflight.pop(k, None)
+            self._generation[k] = self._generation.get(k, 0) + 1
@@ -0,0 +1,169 @@
+import asyncio
+import json
+import struct
+from typing import Any, Callable, List, Optional
+
+import aiohttp
+
+# RUES (Rusk Universal Event System) endpoints
+ENDPOINT_EVENTS = "/on"
+TOPIC_BLOCKS_ACCEPTED = "/on/blocks/accepted"
+
+
+class BlockEventSubscriber:
+    """
+    Subscribes to the node's RUES event stream and pushes accepted-block heights
+    to listeners. Reconnects with backoff while the stream is down; callers check
+    `connected` to decide whether they need to fall back to polling.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "http://127.0.0.1:8080",
+        rusk_version: Optional[str] = None,
+        log_action_func=None,
+        reconnect_delay: float = 5.0,
+        max_reconnect_delay: float = 120.0
+    ):
+        """
+        Initialize the block event subscriber.
+
+        Args:
+            base_url: Base URL of the node HTTP endpoint
+            rusk_version: Optional value for the Rusk-Version request header
+            log_action_func: Function to call for logging
+            reconnect_delay: Initial delay in seconds before reconnecting
+            max_reconnect_delay: Upper bound for the reconnect delay
+        """
+        self.base_url = base_url.rstrip("/")
+        self.ws_url = self.base_url.replace("http://", "ws://", 1).replace("https://", "wss://", 1) + ENDPOINT_EVENTS
+        self.headers = {"Rusk-Version": rusk_version} if rusk_version else {}
+        self.log_action = log_action_func or (lambda *args, **kwargs: None)
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+
+        self.connected = False
+        self.latest_height: Optional[int] = None
+        self._listeners: List[Callable[[int], None]] = []
+        self._new_block = asyncio.Event()
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def add_listener(self, listener: Callable[[int], None]) -> None:
+        """
+        Register a function called with the height of every accepted block.
+        """
+        self._listeners.append(listener)
+
+    async def wait_for_block(self, timeout: float, after: Optional[int] = None) -> Optional[int]:
+        """
+        Wait for an accepted block newer than `after`.
+
+        Args:
+            timeout: Seconds to wait
+            after: Height the caller already knows about
+
+        Returns:
+            The new block height, or None if no block arrived in time
+        """
+        if after is not None and self.latest_height is not None and self.latest_height > after:
+            return self.latest_height
+        self._new_block.clear()
+        try:
+            await asyncio.wait_for(self._new_block.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        return self.latest_height
+
+    async def run(self) -> None:
+        """Keep the subscription alive forever, reconnecting with backoff."""
+        delay = self.reconnect_delay
+        while True:
+            try:
+                await self._subscribe_and_listen()
+                delay = self.reconnect_delay
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if self.connected:
+                    self.log_action("Block event stream lost", f"{e} - polling until it reconnects", "debug")
+            finally:
+                self.connected = False
+            await asyncio.sleep(delay)
+            delay = min(self.max_reconnect_delay, delay * 2)
+
+    async def close(self) -> None:
+        """Close the underlying HTTP session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _subscribe_and_listen(self) -> None:
+        """Open the event socket, subscribe to accepted blocks and dispatch events until it closes."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(headers=self.headers)
+
+        async with self._session.ws_connect(self.ws_url, heartbeat=30) as ws:
+            # The first message on the socket is the session id used to subscribe
+            first = await ws.receive(timeout=10)
+            if first.type != aiohttp.WSMsgType.TEXT:
+                raise ConnectionError("No RUES session id received")
+            session_id = first.data.strip()
+
+            async with self._session.get(
+                self.base_url + TOPIC_BLOCKS_ACCEPTED,
+                headers={"Rusk-Session-Id": session_id},
+                timeout=aiohttp.ClientTimeout(total=10)
+            ) as response:
+                if response.status != 200:
+                    raise ConnectionError(f"Subscription failed: HTTP Status {response.status}")
+
+            self.connected = True
+            self.log_action("Block event stream connected", self.ws_url, "debug")
+
+            async for msg in ws:
+                if msg.type == aiohttp.WSMsgType.BINARY:
+                    height = self.parse_event(msg.data)
+                elif msg.type == aiohttp.WSMsgType.TEXT:
+                    height = self.parse_event(msg.data.encode())
+                elif msg.type == aiohttp.WSMsgType.ERROR:
+                    raise ConnectionError(str(ws.exception()))
+                else:
+                    continue
+                if height is not None:
+                    self._dispatch(height)
+
+    def _dispatch(self, height: int) -> None:
+        """Record a new block and notify listeners."""
+        if self.latest_height is not None and height <= self.latest_height:
+            return
+        self.latest_height = height
+        self._new_block.set()
+        for listener in self._listeners:
+            try:
+                listener(height)
+            except Exception as e:
+                self.log_action("Block event listener error", str(e), "error")
+
+    @staticmethod
+    def parse_event(data: bytes) -> Optional[int]:
+        """
+        Extract the block height from a RUES event frame.
+        Frames are a 4-byte little-endian header length, a JSON header and the payload.
+
+        Returns:
+            The block height, or None if the frame doesn't carry one
+        """
+        try:
+            header_len = struct.unpack_from("<I", data, 0)[0]
+            payload: Any = json.loads(data[4 + header_len:])
+        except (struct.error, ValueError):
+            return None
+
+        if isinstance(payload, dict):
+            header = payload.get("header", payload)
+            if isinstance(header, dict) and "height" in header:
+                try:
+                    return int(header["height"])
+                except (TypeError, ValueError):
+                    return None
+        return None
@@ -0,0 +1,86 @@
+import time
+from typing import Optional
+
+EPOCH_BLOCKS = 2160        # Blocks per epoch
+DEFAULT_BLOCK_TIME = 10.0  # Nominal seconds per block
+
+
+class BlockTimeEstimator:
+    """
+    Estimates the real block time from (timestamp, height) samples.
+    Uses an exponentially weighted moving average of seconds-per-block, weighted by
+    how many blocks each sample interval covers, so that predictions follow drift
+    instead of assuming a fixed 10 seconds per block.
+    """
+
+    def __init__(
+        self,
+        default_block_time: float = DEFAULT_BLOCK_TIME,
+        alpha: float = 0.05,
+        min_block_time: float = 1.0,
+        max_block_time: float = 60.0
+    ):
+        """
+        Initialize the estimator.
+
+        Args:
+            default_block_time: Seconds per block assumed until samples arrive
+            alpha: EWMA weight of a single block's worth of new data
+            min_block_time: Intervals faster than this are ignored (e.g. node resync)
+            max_block_time: Intervals slower than this are ignored (e.g. node stall)
+        """
+        self.block_time = default_block_time
+        self.alpha = alpha
+        self.min_block_time = min_block_time
+        self.max_block_time = max_block_time
+        self.last_height: Optional[int] = None
+        self.last_timestamp: Optional[float] = None
+        self.samples = 0
+
+    def add_sample(self, block_height: int, timestamp: Optional[float] = None) -> None:
+        """
+        Feed an observed block height.
+
+        Args:
+            block_height: Observed block height
+            timestamp: Unix time of the observation (defaults to now)
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        if self.last_height is None or block_height < self.last_height:
+            self.last_height, self.last_timestamp = block_height, timestamp
+            return
+
+        blocks = block_height - self.last_height
+        if blocks == 0:
+            # Keep the time of the first observation of this height
+            return
+
+        rate = (timestamp - self.last_timestamp) / blocks
+        self.last_height, self.last_timestamp = block_height, timestamp
+        if not self.min_block_time <= rate <= self.max_block_time:
+            return
+
+        # One EWMA step per block covered by the interval
+        weight = 1 - (1 - self.alpha) ** blocks
+        self.block_time += weight * (rate - self.block_time)
+        self.samples += 1
+
+    def predict_time(self, target_height: int, current_height: Optional[int] = None) -> float:
+        """
+        Predict the unix time at which target_height will be reached.
+
+        Args:
+            target_height: Block height to predict
+            current_height: Current height, used when no samples have been fed yet
+        """
+        if self.last_height is None or (current_height is not None and current_height > self.last_height):
+            base_height, base_time = (current_height or 0), time.time()
+        else:
+            base_height, base_time = self.last_height, self.last_timestamp
+        return base_time + (target_height - base_height) * self.block_time
+
+    def seconds_until(self, target_height: int, current_height: Optional[int] = None) -> float:
+        """
+        Seconds from now until target_height is expected (0 if already reached).
+        """
+        return max(0.0, self.predict_time(target_height, current_height) - time.time())
@@ -1,18 +1,67 @@
 import asyncio
 import re
+import time
 from typing import Optional, Tuple, Dict, Any, List, Union
 
 from utilities.utils import convert_to_float, format_float
+from utilities.rusk_node_client import RuskNodeClient, NodeUnreachableError
+from utilities.wallet_worker import WalletWorker
+from utilities.command_runner import CommandRunner
+from utilities.block_cache import BlockCache
+from utilities.address_index import AddressIndex
+from utilities.retry_policy import RetryPolicy, CircuitBreaker
+from utilities.log_history import CATEGORY_BALANCE
+from utilities.notification_router import EVENT_STAKE_ACTION, SEVERITY_CRITICAL
+from utilities.metrics import REGISTRY
 
-# Command Constants
-CMD_BLOCK_HEIGHT = "ruskquery block-height"
-CMD_PEERS = "ruskquery peers"
-CMD_WALLET_PROFILES = "rusk-wallet --password {password} profiles"
-CMD_WALLET_BALANCE = "rusk-wallet --password {password} balance --spendable --address {address}"
-CMD_STAKE_INFO = "rusk-wallet --password {password} stake-info"
-CMD_WITHDRAW = "rusk-wallet --password {password} withdraw"
-CMD_UNSTAKE = "rusk-wallet --password {password} unstake"
-CMD_STAKE = "rusk-wallet --password {password} stake --amt {amount}"
+# Command Constants (argv templates, executed without a shell)
+CMD_BLOCK_HEIGHT = ["ruskquery", "block-height"]
+CMD_PEERS = ["ruskquery", "peers"]
+CMD_WALLET_PROFILES = ["rusk-wallet", "--password", "{password}", "profiles"]
+CMD_WALLET_BALANCE = ["rusk-wallet", "--password", "{password}", "balance", "--spendable", "--address", "{address}"]
+CMD_STAKE_INFO = ["rusk-wallet", "--password", "{password}", "stake-info"]
+CMD_WITHDRAW = ["rusk-wallet", "--password", "{password}", "withdraw"]
+CMD_UNSTAKE = ["rusk-wallet", "--password", "{password}", "unstake"]
+CMD_STAKE = ["rusk-wallet", "--password", "{password}", "stake", "--amt", "{amount}"]
+
+# Command deadlines in seconds (wallet reads use the runner default, command_timeout)
+TIMEOUT_QUERY = 30
+TIMEOUT_TRANSACTION = 300
+
+# Command metrics, by command name ("block-height", "stake-info", ...) and how it was run ("cli" or "http")
+COMMAND_SECONDS = REGISTRY.histogram(
+    "duskman_command_seconds", "Duration of node and wallet commands", ("command", "via")
+)
+COMMANDS = REGISTRY.counter(
+    "duskman_commands_total", "Node and wallet commands run, by result (ok, failed, timeout, error)",
+    ("command", "via", "result")
+)
+
+def command_name(command: List[str]) -> str:
+    """
+    The subcommand an argv runs, e.g. "stake-info" for `[sudo] rusk-wallet --password X stake-info`.
+    
+    Args:
+        command: Argument vector built from one of the CMD_* templates
+        
+    Returns:
+        Subcommand name (the program name if there is none)
+    """
+    args = command[1:] if command and command[0] == "sudo" else command
+    index = 1
+    while index < len(args):
+        if args[index] == "--password":
+            index += 2
+        elif args[index].startswith("-"):
+            index += 1
+        else:
+            return args[index]
+    return args[0] if args else "unknown"
+
+def record_command(name: str, via: str, result: str, started: float) -> None:
+    """Count a finished command and observe its duration (started is a perf_counter() value)."""
+    COMMAND_SECONDS.labels(name, via).observe(time.perf_counter() - started)
+    COMMANDS.labels(name, via, result).inc()
 
 class BlockchainClient:
     """
@@ -20,7 +69,16 @@ class BlockchainClient:
     Handles command execution, balance fetching, and stake information parsing.
     """
     
-    def __init__(self, use_sudo: bool, password: str, log_action_func=None):
+    def __init__(
+        self,
+        use_sudo: bool,
+        password: str,
+        log_action_func=None,
+        node_client: Optional[RuskNodeClient] = None,
+        wallet_workers: int = 4,
+        runner: Optional[CommandRunner] = None,
+        address_index: Optional[AddressIndex] = None
+    ):
         """
         Initialize the blockchain client.
         
@@ -28,59 +86,123 @@ class BlockchainClient:
             use_sudo: Whether to use sudo for commands
             password: Wallet password
             log_action_func: Function to call for logging
+            node_client: Optional HTTP client for node queries (falls back to ruskquery when unreachable)
+            wallet_workers: Number of rusk-wallet commands allowed to run at the same time
+            runner: Command runner to execute commands with (a default one is created if omitted)
+            address_index: Persisted wallet address index (an in-memory one is created if omitted)
         """
-        self.use_sudo = "sudo" if use_sudo else ""
+        self.use_sudo = ["sudo"] if use_sudo else []
         self.password = password
         self.log_action = log_action_func or (lambda *args, **kwargs: None)
+        self.node_client = node_client
+        self.runner = runner or CommandRunner(log_action_func=self.log_action)
+        
+        # Wallet reads are cached per block height and shared between concurrent callers
+        self.cache = BlockCache()
+        self.address_index = address_index or AddressIndex(path="", log_action_func=self.log_action)
+        
+        # Retry policies and per-endpoint circuit breakers
+        self.node_breaker = CircuitBreaker("node", log_action_func=self.log_action)
+        self.wallet_breaker = CircuitBreaker("wallet", log_action_func=self.log_action)
+        self.query_policy = RetryPolicy(max_attempts=2, base_delay=1.0, max_delay=5.0, log_action_func=self.log_action)
+        self.wallet_policy = RetryPolicy(max_attempts=4, base_delay=2.0, max_delay=30.0, log_action_func=self.log_action)
+        # Transactions are not idempotent: never retried. They are not gated by the wallet breaker
+        # either, which trips on read failures and would otherwise skip (or split) a claim/stake
+        self.transaction_policy = RetryPolicy(max_attempts=1, log_action_func=self.log_action)
+        
+        # All rusk-wallet commands are queued through the wallet worker (up to wallet_workers at once)
+        self.wallet = WalletWorker(self.execute_command, wallet_workers, self.log_action)
+        
+    def build_command(self, template: List[str], **kwargs) -> List[str]:
+        """
+        Build an argv list from a command template, prefixed with sudo if enabled.
+        
+        Args:
+            template: One of the CMD_* argv templates
+            **kwargs: Values for the template placeholders (password is filled in automatically)
+            
+        Returns:
+            Argument vector ready to execute
+        """
+        kwargs.setdefault("password", self.password)
+        return self.use_sudo + [part.format(**kwargs) for part in template]
         
-    async def execute_command(self, command: str, log_output: bool = True) -> Optional[str]:
+    async def execute_command(self, command: List[str], log_output: bool = True, timeout: Optional[float] = None) -> Optional[str]:
         """
-        Execute a shell command asynchronously and return its output (stdout).
+        Execute a command asynchronously and return its output (stdout).
         
         Args:
-            command: Command to execute
+            command: Argument vector to execute
             log_output: Whether to log the command and its output
+            timeout: Deadline in seconds (defaults to the runner's default)
             
         Returns:
-            Command output as string, or None if the command failed
+            Command output as string, or None if the command failed or timed out
         """
+        cmd_str = " ".join(command).replace(self.password, '#####')
+        name = command_name(command)
+        started = time.perf_counter()
         try:
             if log_output:
-                cmd2 = command
-                self.log_action("Executing Command", cmd2.replace(self.password, '#####'), "debug")
+                self.log_action("Executing Command", cmd_str, "debug")
                 
-            process = await asyncio.create_subprocess_shell(
-                command,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            stdout, stderr = await process.communicate()
-            stdout_str = stdout.decode().strip()
-            stderr_str = stderr.decode().strip()
+            result = await self.runner.run(command, timeout, mask=(self.password,))
+            if result.timed_out:
+                record_command(name, "cli", "timeout", started)
+                return None
 
-            if process.returncode != 0:
+            if result.returncode != 0:
+                record_command(name, "cli", "failed", started)
                 self.log_action(
-                    f"Command failed with return code {process.returncode}:\n {command.replace(self.password, '#####')}",
-                    stderr_str.replace(self.password, '#####'),
+                    f"Command failed with return code {result.returncode}:\n {cmd_str}",
+                    result.stderr.replace(self.password, '#####'),
                     "error"
                 )
                 return None
             else:
-                if log_output and stdout_str:
+                record_command(name, "cli", "ok", started)
+                if log_output and result.stdout:
                     self.log_action(
-                        f"Command output",
-                        stdout_str.replace(self.password, '#####'),
+                        f"Command output ({result.duration:.2f}s)",
+                        result.stdout.replace(self.password, '#####'),
                         'debug'
                     )
-                return stdout_str.replace(self.password, '#####')
+                return result.stdout.replace(self.password, '#####')
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
+            record_command(name, "cli", "error", started)
             self.log_action(
-                f"Error executing command: {command.replace(self.password, '#####')}",
+                f"Error executing command: {cmd_str}",
                 str(e),
                 "error"
             )
             return None
             
+    async def _query_node(self, method: str, command: List[str]) -> Any:
+        """
+        Query the node over HTTP, falling back to ruskquery if the endpoint is unreachable.
+        
+        Args:
+            method: Name of the RuskNodeClient method to call
+            command: ruskquery argv template used as fallback
+            
+        Returns:
+            Raw value from the node, or None if the query failed
+        """
+        if self.node_client:
+            started = time.perf_counter()
+            try:
+                value = await getattr(self.node_client, method)()
+            except NodeUnreachableError as e:
+                record_command(command_name(command), "http", "error", started)
+                self.log_action("Node HTTP unreachable", f"{e} - falling back to ruskquery", "debug")
+            else:
+                record_command(command_name(command), "http", "ok" if value is not None else "failed", started)
+                return value
+
+        return await self.execute_command(self.build_command(command), False, TIMEOUT_QUERY)
+        
     async def get_block_height(self) -> Optional[int]:
         """
         Get the current block height from the blockchain.
@@ -88,16 +210,12 @@ class BlockchainClient:
         Returns:
             Current block height as integer, or None if the command failed
         """
-        block_height_str = await self.execute_command(f"{self.use_sudo} {CMD_BLOCK_HEIGHT}", False)
-        if not block_height_str:
-            self.log_action("Failed to fetch block height", "Could not retrieve block height", "error")
-            return None
-        
-        try:
-            return int(block_height_str)
-        except ValueError:
-            self.log_action("Invalid block height", f"Could not parse block height: {block_height_str}", "error")
-            return None
+        return await self.query_policy.call(
+            lambda: self._query_node("get_block_height", CMD_BLOCK_HEIGHT),
+            int,
+            self.node_breaker,
+            "block height"
+        )
             
     async def get_peer_count(self) -> Optional[int]:
         """
@@ -106,20 +224,17 @@ class BlockchainClient:
         Returns:
             Current peer count as integer, or None if the command failed
         """
-        peer_count_str = await self.execute_command(f"{self.use_sudo} {CMD_PEERS}", False)
-        if not peer_count_str:
-            self.log_action("Failed to fetch peers", "Could not retrieve peer count", "error")
-            return None
-        
-        try:
-            return int(peer_count_str)
-        except ValueError:
-            self.log_action("Invalid peer count", f"Could not parse peer count: {peer_count_str}", "error")
-            return None
+        return await self.query_policy.call(
+            lambda: self._query_node("get_peer_count", CMD_PEERS),
+            int,
+            self.node_breaker,
+            "peers"
+        )
             
     async def get_wallet_balances(self, shared_state: Dict[str, Any], monitor_wallet: bool, first_run: bool = False) -> Tuple[float, float]:
         """
         Fetches the wallet balances for public and shielded addresses.
+        Balances are cached per block height; concurrent callers share one fetch.
         
         Args:
             shared_state: Shared state dictionary to update
@@ -129,17 +244,60 @@ class BlockchainClient:
         Returns:
             Tuple of (public_balance, shielded_balance)
         """
+        totals = await self.cache.get("balances", shared_state.get("block_height"), self._fetch_wallet_balances)
+        if totals is None:
+            return 0.0, 0.0
+        new_public_total, new_shielded_total = totals
+
+        # Check for balance changes
+        old_public_total = shared_state.get("balances", {}).get("public", 0.0)
+        old_shielded_total = shared_state.get("balances", {}).get("shielded", 0.0)
+
+        if (float(format_float(old_public_total + old_shielded_total)) != 
+            float(format_float(new_public_total + new_shielded_total))) and monitor_wallet and not first_run:
+            if new_public_total != old_public_total:
+                self.log_action(
+                    "Balance Change Detected",
+                    f"Public balance changed from {format_float(old_public_total)} → {format_float(new_public_total)} DUSK.",
+                    "info",
+                    category=CATEGORY_BALANCE
+                )
+
+            if new_shielded_total != old_shielded_total:
+                self.log_action(
+                    "Balance Change Detected",
+                    f"Shielded balance changed from {format_float(old_shielded_total)} → {format_float(new_shielded_total)} DUSK.",
+                    "info",
+                    category=CATEGORY_BALANCE
+                )
+
+        # Update shared_state
+        shared_state["balances"]["public"] = new_public_total
+        shared_state["balances"]["shielded"] = new_shielded_total
+
+        return new_public_total, new_shielded_total
+        
+    async def _refresh_address_index(self) -> bool:
+        """
+        Rebuild the address index from 'rusk-wallet profiles'.
+        
+        Returns:
+            True if the index was refreshed, False if the profiles could not be fetched
+        """
         try:
-            # Fetch address from 'rusk-wallet profiles'
             addresses = {
                 "public": [],
                 "shielded": []
             }
 
-            cmd_profiles = f"{self.use_sudo} {CMD_WALLET_PROFILES.format(password=self.password)}"
-            output_profiles = await self.execute_command(cmd_profiles)
+            cmd_profiles = self.build_command(CMD_WALLET_PROFILES)
+            output_profiles = await self.wallet_policy.call(
+                lambda: self.wallet.submit(cmd_profiles),
+                breaker=self.wallet_breaker,
+                description="wallet profiles"
+            )
             if not output_profiles:
-                return 0.0, 0.0
+                return False
 
             # Parse addresses
             for line in output_profiles.splitlines():
@@ -158,125 +316,51 @@ class BlockchainClient:
                 str(e).replace(self.password, '#####'),
                 "error"
             )
-            await asyncio.sleep(5)
-            return 0.0, 0.0
+            return False
 
-        # Track if we've encountered the specific error before
-        error_logged = False
-        error_fixed = False
+        self.address_index.update(addresses)
+        return True
+        
+    async def _fetch_wallet_balances(self) -> Optional[Tuple[float, float]]:
+        """
+        Fetch the spendable totals of all public and shielded addresses from the wallet.
+        Addresses come from the address index; all balances are fetched in one gather,
+        bounded by the wallet worker's concurrency.
+        
+        Returns:
+            Tuple of (public_total, shielded_total), or None if the addresses could not be fetched
+        """
+        if self.address_index.is_stale():
+            await self._refresh_address_index()
+        addresses = self.address_index.addresses
+        if not addresses["public"] and not addresses["shielded"]:
+            return None
+
+        def parse_balance(output: str) -> float:
+            return float(output.replace("Total: ", ""))
         
         async def get_spendable_for_address(addr):
             """
             Fetches the spendable balance for the given address
             """
-            nonlocal error_logged, error_fixed
-            
-            cmd_balance = f"{self.use_sudo} {CMD_WALLET_BALANCE.format(password=self.password, address=addr)}"
-            max_retries = 5  # Maximum number of retries
-            retry_count = 0
-            encountered_error = False
-            
-            while retry_count < max_retries:
-                try:
-                    out = await self.execute_command(cmd_balance)
-                    if out:
-                        total_str = out.replace("Total: ", "")
-                        result = float(total_str)
-                        
-                        # If we previously encountered the error and now it's fixed, log it
-                        if encountered_error and not error_fixed:
-                            self.log_action(
-                                "Balance parsing fixed",
-                                f"Successfully parsed balance after previous failures",
-                                "info"
-                            )
-                            error_fixed = True
-                            
-                        return result
-                        
-                except Exception as e:
-                    # Only log connection errors immediately
-                    if 'Connection to Rusk Failed' in str(e):
-                        self.log_action(
-                            f"Error in get_spendable_for_address() reaching Node",
-                            f"{str(e).replace(self.password, '#####')}",
-                            "error"
-                        )
-                    # For parsing errors (like '\x1b[?25h'), log once and retry
-                    elif '\x1b[?25h' in str(e):
-                        encountered_error = True
-                        # Only log the error once per session until fixed
-                        if not error_logged:
-                            self.log_action(
-                                f"Error in get_spendable_for_address()",
-                                f"Could not convert string to float: '\\x1b[?25h' - will retry after 15 seconds",
-                                "error"
-                            )
-                            error_logged = True
-                            error_fixed = False
-                            
-                        # Wait 15 seconds before retrying
-                        await asyncio.sleep(15)
-                        retry_count += 1
-                        continue
-                    else:
-                        # For other errors, log and retry
-                        self.log_action(
-                            f"Error in get_spendable_for_address()",
-                            f"{str(e).replace(self.password, '#####')}",
-                            "error"
-                        )
-                
-                # If we reach here, either there was no output or an error that's not the specific '\x1b[?25h' error
-                # Wait 5 seconds before retrying
-                await asyncio.sleep(5)
-                retry_count += 1
-            
-            # If we've exhausted all retries and encountered the specific error
-            if encountered_error and not error_logged:
-                self.log_action(
-                    f"Error in get_spendable_for_address() after {max_retries} retries",
-                    f"Could not convert string to float: '\\x1b[?25h'",
-                    "error"
-                )
-                error_logged = True
-                error_fixed = False
-                
-            return 0.0
-        error_logged = False
-        error_fixed = True
-        tasks_public = [get_spendable_for_address(addr) for addr in addresses["public"]]
-        tasks_shielded = [get_spendable_for_address(addr) for addr in addresses["shielded"]]
+            cmd_balance = self.build_command(CMD_WALLET_BALANCE, address=addr)
+            return await self.wallet_policy.call(
+                lambda: self.wallet.submit(cmd_balance),
+                parse_balance,
+                self.wallet_breaker,
+                f"balance for {addr[:12]}..."
+            )
 
-        results_public = await asyncio.gather(*tasks_public)
-        results_shielded = await asyncio.gather(*tasks_shielded)
+        all_addresses = addresses["public"] + addresses["shielded"]
+        results = await asyncio.gather(*[get_spendable_for_address(addr) for addr in all_addresses])
 
-        new_public_total = sum(results_public)
-        new_shielded_total = sum(results_shielded)
+        # A balance call that keeps failing may mean the address is no longer known to the wallet
+        if any(result is None for result in results):
+            self.address_index.invalidate()
 
-        # Check for balance changes
-        old_public_total = shared_state.get("balances", {}).get("public", 0.0)
-        old_shielded_total = shared_state.get("balances", {}).get("shielded", 0.0)
-
-        if (float(format_float(old_public_total + old_shielded_total)) != 
-            float(format_float(new_public_total + new_shielded_total))) and monitor_wallet and not first_run:
-            if new_public_total != old_public_total:
-                self.log_action(
-                    "Balance Change Detected",
-                    f"Public balance changed from {format_float(old_public_total)} → {format_float(new_public_total)} DUSK.",
-                    "info"
-                )
-
-            if new_shielded_total != old_shielded_total:
-                self.log_action(
-                    "Balance Change Detected",
-                    f"Shielded balance changed from {format_float(old_shielded_total)} → {format_float(new_shielded_total)} DUSK.",
-                    "info"
-                )
-
-        # Update shared_state
-        shared_state["balances"]["public"] = new_public_total
-        shared_state["balances"]["shielded"] = new_shielded_total
+        results = [result or 0.0 for result in results]
+        new_public_total = sum(results[:len(addresses["public"])])
+        new_shielded_total = sum(results[len(addresses["public"]):])
 
         return new_public_total, new_shielded_total
         
@@ -336,6 +420,7 @@ class BlockchainClient:
     async def get_stake_info(self, shared_state: Dict[str, Any]) -> Tuple[Optional[float], Optional[float], float]:
         """
         Get stake information from the blockchain.
+        The wallet output is cached per block height; concurrent callers share one fetch.
         
         Args:
             shared_state: Shared state dictionary to update
@@ -343,7 +428,15 @@ class BlockchainClient:
         Returns:
             Tuple of (eligible_stake, reclaimable_slashed_stake, accumulated_rewards)
         """
-        stake_output = await self.execute_command(f"{self.use_sudo} {CMD_STAKE_INFO.format(password=self.password)}")
+        stake_output = await self.cache.get(
+            "stake_info",
+            shared_state.get("block_height"),
+            lambda: self.wallet_policy.call(
+                lambda: self.wallet.submit(self.build_command(CMD_STAKE_INFO)),
+                breaker=self.wallet_breaker,
+                description="stake-info"
+            )
+        )
         if not stake_output:
             self.log_action("Error", "Failed to fetch stake-info.", "error")
             return None, None, 0.0
@@ -357,10 +450,14 @@ class BlockchainClient:
         Returns:
             True if successful, False otherwise
         """
-        cmd = f"{self.use_sudo} {CMD_WITHDRAW.format(password=self.password)}"
-        cmd_success = await self.execute_command(cmd)
+        cmd = self.build_command(CMD_WITHDRAW)
+        cmd_success = await self.transaction_policy.call(
+            lambda: self.wallet.submit(cmd, coalesce=False, timeout=TIMEOUT_TRANSACTION),
+            description="withdraw"
+        )
+        self.cache.invalidate()
         if not cmd_success:
-            self.log_action("Withdraw Failed", "Command execution failed", 'error')
+            self.log_action("Withdraw Failed", "Command execution failed", 'error', event=EVENT_STAKE_ACTION, severity=SEVERITY_CRITICAL)
             return False
         if 'Withdrawing 0 reward is not allowed' in cmd_success:
             self.log_action("Withdraw Notice", "No rewards to withdraw", 'info')
@@ -374,10 +471,14 @@ class BlockchainClient:
         Returns:
             True if successful, False otherwise
         """
-        cmd = f"{self.use_sudo} {CMD_UNSTAKE.format(password=self.password)}"
-        cmd_success = await self.execute_command(cmd)
+        cmd = self.build_command(CMD_UNSTAKE)
+        cmd_success = await self.transaction_policy.call(
+            lambda: self.wallet.submit(cmd, coalesce=False, timeout=TIMEOUT_TRANSACTION),
+            description="unstake"
+        )
+        self.cache.invalidate()
         if not cmd_success or 'rror' in cmd_success:
-            self.log_action("Unstake Failed", "Command execution failed", 'error')
+            self.log_action("Unstake Failed", "Command execution failed", 'error', event=EVENT_STAKE_ACTION, severity=SEVERITY_CRITICAL)
             return False
         return True
         
@@ -391,9 +492,13 @@ class BlockchainClient:
         Returns:
             True if successful, False otherwise
         """
-        cmd = f"{self.use_sudo} {CMD_STAKE.format(password=self.password, amount=amount)}"
-        cmd_success = await self.execute_command(cmd)
+        cmd = self.build_command(CMD_STAKE, amount=amount)
+        cmd_success = await self.transaction_policy.call(
+            lambda: self.wallet.submit(cmd, coalesce=False, timeout=TIMEOUT_TRANSACTION),
+            description="stake"
+        )
+        self.cache.invalidate()
         if not cmd_success or 'rror' in cmd_success:
-            self.log_action("Stake Failed", f"Command execution failed", 'error')
+            self.log_action("Stake Failed", f"Command execution failed", 'error', event=EVENT_STAKE_ACTION, severity=SEVERITY_CRITICAL)
             return False
         return True
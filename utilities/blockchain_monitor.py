@@ -1,8 +1,22 @@
 import asyncio
+import time
 from typing import Dict, Any, Optional, Callable
 
 from utilities.blockchain_client import BlockchainClient
 from utilities.market_data import MarketDataClient
+from utilities.block_time import BlockTimeEstimator
+from utilities.block_events import BlockEventSubscriber
+from utilities.timeseries import TimeSeriesStore
+from utilities.notification_router import EVENT_NODE_HEALTH, EVENT_STAKE_ACTION, SEVERITY_CRITICAL, SEVERITY_WARNING
+
+STALL_THRESHOLD = 100           # Seconds without a new block before warning
+LOW_PEERS_THRESHOLD = 2400      # Seconds of low peer count before warning (40 minutes)
+BALANCE_INTERVAL = 200          # Seconds between balance/stake-info/market refreshes
+PEER_INTERVAL = 10              # Seconds between peer checks while polling
+PEER_INTERVAL_EVENTS = 60       # Seconds between peer checks while blocks are pushed
+EVENT_IDLE_TIMEOUT = 30         # Seconds without a pushed block before confirming with a poll
+MIN_POLL_INTERVAL = 5           # Bounds for the adaptive polling interval
+MAX_POLL_INTERVAL = 30
 
 class BlockchainMonitor:
     """
@@ -16,7 +30,11 @@ class BlockchainMonitor:
         market_data_client: MarketDataClient,
         shared_state: Dict[str, Any],
         config: Dict[str, Any],
-        log_action_func: Callable = None
+        log_action_func: Callable = None,
+        block_time: Optional[BlockTimeEstimator] = None,
+        on_slash: Optional[Callable[[str], None]] = None,
+        events: Optional[BlockEventSubscriber] = None,
+        history: Optional[TimeSeriesStore] = None
     ):
         """
         Initialize the blockchain monitor.
@@ -27,63 +45,111 @@ class BlockchainMonitor:
             shared_state: Shared state dictionary
             config: Configuration dictionary
             log_action_func: Function to call for logging
+            block_time: Block time estimator fed with every height sample
+            on_slash: Called with a reason when new reclaimable slashed stake is detected
+            events: Node event stream subscriber; blocks are polled while it is disconnected
+            history: Time-series store every sample is recorded to
         """
         self.blockchain = blockchain_client
         self.market_data = market_data_client
         self.shared_state = shared_state
         self.config = config
         self.log_action = log_action_func or (lambda *args, **kwargs: None)
+        self.block_time = block_time or BlockTimeEstimator()
+        self.on_slash = on_slash or (lambda *args, **kwargs: None)
+        self.events = events
+        self.history = history
         
         # Extract configuration values
         self.min_peers = config.get('min_peers', 10)
         self.monitor_wallet = config.get('monitor_wallet', False)
         self.password = config.get('password', '')
         
+    def _poll_interval(self) -> float:
+        """Polling interval while the event stream is down: follows the measured block time."""
+        return min(max(self.block_time.block_time, MIN_POLL_INTERVAL), MAX_POLL_INTERVAL)
+        
+    async def _next_block_height(self, last_known_block_height: Optional[int]) -> Optional[int]:
+        """
+        Wait for the next block height: pushed by the event stream when it is connected,
+        otherwise polled at roughly the measured block time.
+        """
+        if self.events is not None and self.events.connected:
+            block_height = await self.events.wait_for_block(EVENT_IDLE_TIMEOUT, last_known_block_height)
+            if block_height is not None:
+                return block_height
+            # Nothing pushed for a while: confirm with a poll in case the stream went quiet
+            return await self.blockchain.get_block_height()
+        
+        if last_known_block_height is not None:
+            await asyncio.sleep(self._poll_interval())
+        return await self.blockchain.get_block_height()
+        
+    def _record(self, samples: Dict[str, Any]) -> None:
+        """Record samples to the history store, if one is configured."""
+        if self.history is not None:
+            self.history.record_many(samples)
+        
+    def _record_balances(self) -> None:
+        """Record the current wallet balances and stake info."""
+        balances = self.shared_state["balances"]
+        stake_info = self.shared_state["stake_info"]
+        self._record({
+            "balance_public": balances.get("public"),
+            "balance_shielded": balances.get("shielded"),
+            "stake_amount": stake_info.get("stake_amount"),
+            "rewards_amount": stake_info.get("rewards_amount"),
+            "reclaimable_slashed_stake": stake_info.get("reclaimable_slashed_stake"),
+        })
+        
     async def frequent_update_loop(self) -> None:
         """
-        Update the block height and balances every 20 seconds.
+        Track the block height (pushed by the node event stream, or polled when it is down),
+        and refresh peers, balances and stake info on their own intervals.
         Checks if the block height changes to ensure node responsiveness.
         """
         stake_checking = False
-        loopcnt = 0
-        consecutive_no_change = 0  # Counter for consecutive no-change in block height
         last_known_block_height = None  # Track the last block height
-        consecutive_low_peers = 0  # Track loops of low peer counts
+        last_height_change = time.monotonic()  # When the block height last changed
+        last_balance_update = time.monotonic()  # When balances/stake-info were last refreshed
+        last_peer_update = 0.0  # When peers were last refreshed
+        low_peers_since = None  # When the peer count dropped below the minimum
+        last_known_slashed = None  # Track reclaimable slashed stake to detect new slashes
         
         while True:
             try:
-                # 1) Fetch block height
-                block_height = await self.blockchain.get_block_height()
+                # 1) Wait for the next block height
+                block_height = await self._next_block_height(last_known_block_height)
                 if block_height is None:
-                    self.log_action("Failed to fetch block height.", ' Retrying in 10s...', "error")
+                    self.log_action("Failed to fetch block height.", ' Retrying in 10s...', "error", event=EVENT_NODE_HEALTH)
                     await asyncio.sleep(10)
                     continue
                 
+                now = time.monotonic()
+                
                 # Compare with last known block height
-                if last_known_block_height is not None:
-                    if block_height == last_known_block_height:
-                        consecutive_no_change += 1
-                    else:
-                        consecutive_no_change = 0  # Reset counter if block height changes
-                else:
-                    consecutive_no_change = 0  # Reset counter on first valid block height
+                if block_height != last_known_block_height:
+                    last_height_change = now
                 
-                # Log and notify if block height hasn't changed for 10 loops (100 seconds)
-                if consecutive_no_change >= 10:
-                    message = f"WARNING! Block height has not changed for {consecutive_no_change * 10} seconds.\nLast height: {last_known_block_height}"
-                    self.log_action("Block Height Error!", message, "error")
+                # Log and notify if block height hasn't changed for 100 seconds
+                stalled_for = now - last_height_change
+                if stalled_for >= STALL_THRESHOLD:
+                    message = f"WARNING! Block height has not changed for {int(stalled_for)} seconds.\nLast height: {last_known_block_height}"
+                    self.log_action("Block Height Error!", message, "error", event=EVENT_NODE_HEALTH)
                     
-                    consecutive_no_change = 0  # Reset after notifying to avoid spamming
-                    await asyncio.sleep(1)
+                    last_height_change = now  # Reset after notifying to avoid spamming
                     continue
 
                 # Update last known block height and shared state
                 last_known_block_height = block_height
                 self.shared_state["block_height"] = block_height
+                self.block_time.add_sample(block_height)
+                self.shared_state["block_time"] = self.block_time.block_time
+                self._record({"block_height": block_height, "block_time": self.block_time.block_time})
                 
-                # Perform balance and stake-info updates every X loops (e.g., 30 is 5 minutes)
-                if loopcnt >= 20 and not stake_checking:
-                    self.log_action("Frequent Update (>=20 Loops)", f"Block height: {self.shared_state['block_height']}", "debug")
+                # Perform balance and stake-info updates every BALANCE_INTERVAL seconds
+                if now - last_balance_update >= BALANCE_INTERVAL and not stake_checking:
+                    self.log_action("Frequent Update", f"Block height: {self.shared_state['block_height']}", "debug")
                     
                     # Update wallet balances
                     await self.blockchain.get_wallet_balances(self.shared_state, self.monitor_wallet)
@@ -91,39 +157,48 @@ class BlockchainMonitor:
                     # Update stake info
                     e_stake, r_slashed, a_rewards = await self.blockchain.get_stake_info(self.shared_state)
                     if e_stake is not None and r_slashed is not None:
+                        if last_known_slashed is not None and r_slashed > last_known_slashed:
+                            message = f"Reclaimable slashed stake increased to {r_slashed} DUSK"
+                            self.log_action("Slash Detected", message, "error", event=EVENT_STAKE_ACTION, severity=SEVERITY_CRITICAL)
+                            self.on_slash(message)
+                        last_known_slashed = r_slashed
                         self.shared_state["stake_info"]["stake_amount"] = e_stake
                         self.shared_state["stake_info"]["reclaimable_slashed_stake"] = r_slashed
                         self.shared_state["stake_info"]["rewards_amount"] = a_rewards or 0.0
                     
+                    self._record_balances()
+                    
                     # Update market data
                     await self.market_data.fetch_dusk_data(self.shared_state)
                         
-                    loopcnt = 0  # Reset loop count after update
+                    last_balance_update = now
+                
+                # Update peer count (less often while blocks are being pushed to us)
+                peer_interval = PEER_INTERVAL_EVENTS if self.events is not None and self.events.connected else PEER_INTERVAL
+                if now - last_peer_update < peer_interval:
+                    continue
+                last_peer_update = now
                 
-                # Update peer count
                 peer_count = await self.blockchain.get_peer_count()
                 if peer_count is not None:
                     self.shared_state["peer_count"] = peer_count
+                    self._record({"peer_count": peer_count})
                     
                     # Check peer count
                     if peer_count < self.min_peers or peer_count <= 0:
-                        consecutive_low_peers += 1
+                        low_peers_since = low_peers_since or now
                     else:
-                        consecutive_low_peers = 0  # Reset counter if peer count is good
+                        low_peers_since = None  # Reset if peer count is good
                 
                     # Log and notify if low count for too long
-                    if consecutive_low_peers >= 240:  # 240 loops * 10 seconds = 40 minutes
-                        message = f"WARNING! Low peer count for {consecutive_low_peers * 10} seconds.\nCurrent Count: {peer_count}"
-                        self.log_action("Low peer count!", message, "error")
+                    if low_peers_since is not None and now - low_peers_since >= LOW_PEERS_THRESHOLD:
+                        message = f"WARNING! Low peer count for {int(now - low_peers_since)} seconds.\nCurrent Count: {peer_count}"
+                        self.log_action("Low peer count!", message, "error", event=EVENT_NODE_HEALTH, severity=SEVERITY_WARNING)
                         
-                        consecutive_low_peers = 0  # Reset after notifying to avoid spamming
+                        low_peers_since = now  # Reset after notifying to avoid spamming
                 else:
-                    self.log_action("Failed to fetch peers.", "Retrying in 10s...", "error")
-                    await asyncio.sleep(10)
-                    continue
-
-                loopcnt += 1
-                await asyncio.sleep(10)  # Wait 10 seconds before the next loop
+                    self.log_action("Failed to fetch peers.", "Retrying in 10s...", "error", event=EVENT_NODE_HEALTH)
+                    last_peer_update = now - peer_interval + 10
                 
             except Exception as e:
                 stake_checking = False
@@ -141,6 +216,11 @@ class BlockchainMonitor:
         block_height = await self.blockchain.get_block_height()
         if block_height is not None:
             self.shared_state["block_height"] = block_height
+            self.block_time.add_sample(block_height)
             
         # Fetch wallet balances
         await self.blockchain.get_wallet_balances(self.shared_state, self.monitor_wallet, True)
+        self._record({
+            "balance_public": self.shared_state["balances"].get("public"),
+            "balance_shielded": self.shared_state["balances"].get("shielded"),
+        })
@@ -0,0 +1,145 @@
+import asyncio
+import os
+import signal
+import time
+from typing import Optional, Sequence, Iterable
+
+
+class CommandResult:
+    """
+    Structured result of a single command execution.
+    """
+
+    def __init__(
+        self,
+        argv: Sequence[str],
+        returncode: Optional[int],
+        stdout: str,
+        stderr: str,
+        duration: float,
+        timed_out: bool = False
+    ):
+        """
+        Initialize the command result.
+
+        Args:
+            argv: Argument vector that was executed
+            returncode: Process exit code (negative when killed by a signal, None if it never started)
+            stdout: Decoded and stripped standard output
+            stderr: Decoded and stripped standard error
+            duration: Wall-clock duration in seconds
+            timed_out: Whether the command was killed for exceeding its deadline
+        """
+        self.argv = list(argv)
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        self.duration = duration
+        self.timed_out = timed_out
+
+    @property
+    def ok(self) -> bool:
+        """True if the command completed with exit code 0."""
+        return self.returncode == 0 and not self.timed_out
+
+
+class CommandRunner:
+    """
+    Runs external commands without a shell.
+    Every command gets a deadline, runs in its own process group so the whole
+    group can be killed on timeout or cancellation, and a global semaphore bounds
+    how many commands may run at once.
+    """
+
+    def __init__(self, max_concurrency: int = 4, default_timeout: float = 120.0, log_action_func=None):
+        """
+        Initialize the command runner.
+
+        Args:
+            max_concurrency: Maximum number of commands running at the same time
+            default_timeout: Deadline in seconds used when a command doesn't specify one
+            log_action_func: Function to call for logging
+        """
+        self.default_timeout = default_timeout
+        self.log_action = log_action_func or (lambda *args, **kwargs: None)
+        self._semaphore = asyncio.Semaphore(max(1, int(max_concurrency)))
+        self.kill_grace = 2.0  # Seconds between SIGTERM and SIGKILL
+
+    async def run(
+        self,
+        argv: Sequence[str],
+        timeout: Optional[float] = None,
+        mask: Iterable[str] = ()
+    ) -> CommandResult:
+        """
+        Execute a command and wait for it to finish or hit its deadline.
+
+        Args:
+            argv: Argument vector, argv[0] is the program to run
+            timeout: Deadline in seconds (defaults to default_timeout)
+            mask: Secrets to hide when the command line is logged
+
+        Returns:
+            CommandResult describing the outcome. Cancelling the caller kills the
+            process group and re-raises CancelledError.
+        """
+        timeout = self.default_timeout if timeout is None else timeout
+
+        async with self._semaphore:
+            start = time.monotonic()
+            process = await asyncio.create_subprocess_exec(
+                *argv,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True
+            )
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+            except asyncio.TimeoutError:
+                await self._kill(process)
+                duration = time.monotonic() - start
+                self.log_action(
+                    "Command timed out",
+                    f"Killed after {duration:.1f}s: {self._masked(argv, mask)}",
+                    "error"
+                )
+                return CommandResult(argv, process.returncode, "", "", duration, timed_out=True)
+            except asyncio.CancelledError:
+                await self._kill(process)
+                raise
+
+            return CommandResult(
+                argv,
+                process.returncode,
+                stdout.decode(errors="replace").strip(),
+                stderr.decode(errors="replace").strip(),
+                time.monotonic() - start
+            )
+
+    async def _kill(self, process: asyncio.subprocess.Process) -> None:
+        """Terminate the process group, escalating to SIGKILL after the grace period."""
+        for sig in (signal.SIGTERM, getattr(signal, "SIGKILL", signal.SIGTERM)):
+            if process.returncode is not None:
+                return
+            try:
+                if hasattr(os, "killpg"):
+                    os.killpg(process.pid, sig)
+                else:
+                    process.kill()
+            except (ProcessLookupError, PermissionError):
+                # Already gone, or owned by root under sudo (sudo relays the signal)
+                pass
+            try:
+                await asyncio.wait_for(asyncio.shield(process.wait()), self.kill_grace)
+            except asyncio.TimeoutError:
+                continue
+
+    @staticmethod
+    def _masked(argv: Sequence[str], mask: Iterable[str]) -> str:
+        """Render argv as a single string with secrets replaced."""
+        line = " ".join(argv)
+        for secret in mask:
+            if secret:
+                line = line.replace(secret, '#####')
+        return line
@@ -32,6 +32,8 @@ def initialize_config():
     status_bar_config = load_config('STATUSBAR')
     web_dashboard_config = load_config('WEB_DASHBOARD')
     logs_config = load_config('LOG_FILES')
+    node_config = load_config('NODE')
+    history_config = load_config('HISTORY')
     
     # Initialize parser for command line arguments
     parser = argparse.ArgumentParser(description="Process command line arguments")
@@ -55,12 +57,35 @@ def initialize_config():
         'pwd_var': general_config.get('pwd_var_name', 'MY_WALLET_VARIABLE'),
         'display_options': general_config.get('display_options', True),
         'use_sudo': 'sudo' if general_config.get('use_sudo', False) else '',
+        'wallet_workers': general_config.get('wallet_workers', 4),
+        'command_timeout': general_config.get('command_timeout', 120),
+        'max_concurrent_commands': general_config.get('max_concurrent_commands', 4),
+        'loop_watchdog': general_config.get('loop_watchdog', True),
+        'loop_lag_threshold': general_config.get('loop_lag_threshold', 0.5),
+        'address_index_file': general_config.get('address_index_file', 'duskman_addresses.json'),
+        'address_index_ttl': general_config.get('address_index_ttl', 86400),
+        
+        # Node settings
+        'node_url': node_config.get('node_url', 'http://127.0.0.1:8080'),
+        'node_timeout': node_config.get('node_timeout', 5),
+        'node_connect_timeout': node_config.get('node_connect_timeout', 2),
+        'rusk_version': node_config.get('rusk_version'),
+        'node_events': node_config.get('node_events', True),
+        
+        # History settings
+        'enable_history': history_config.get('enable_history', True),
+        'history_file': history_config.get('history_file', 'duskman_history.db'),
+        'history_raw_days': history_config.get('raw_days', 2),
+        'history_minute_days': history_config.get('minute_days', 30),
+        'history_hour_days': history_config.get('hour_days', 1825),
+        'history_flush_interval': history_config.get('flush_interval', 10),
         
         # Web dashboard settings
         'enable_dashboard': web_dashboard_config.get('enable_dashboard', True),
         'dash_port': web_dashboard_config.get('dash_port', '5000'),
         'dash_ip': web_dashboard_config.get('dash_ip', '0.0.0.0'),
         'include_rendered': web_dashboard_config.get('include_rendered', False),
+        'enable_metrics': web_dashboard_config.get('enable_metrics', True),
         
         # Logs settings
         'isDebug': logs_config.get('debug', False),
@@ -68,6 +93,13 @@ def initialize_config():
         'INFO_LOG_FILE': logs_config.get("action_log", "duskman_actions.log"),
         'ERROR_LOG_FILE': logs_config.get("error_log", "duskman_errors.log"),
         'DEBUG_LOG_FILE': logs_config.get("debug_log", "duskman_tmp_debug.log"),
+        'JSON_LOG_FILE': logs_config.get("json_log"),
+        'log_max_size': logs_config.get('max_size', 10),
+        'log_max_age': logs_config.get('max_age', 7),
+        'log_backups': logs_config.get('backups', 5),
+        'compress_logs': logs_config.get('compress', True),
+        'log_queue_size': logs_config.get('queue_size', 10000),
+        'log_history_size': logs_config.get('history_size', 16),
         
         # Notification settings
         'monitor_wallet': notification_config.get('monitor_balance', False),
@@ -85,6 +117,8 @@ def initialize_config():
     config['status_bar_config'] = status_bar_config
     config['web_dashboard_config'] = web_dashboard_config
     config['logs_config'] = logs_config
+    config['node_config'] = node_config
+    config['history_config'] = history_config
     
     # Get wallet password from environment
     config['password'] = get_env_variable(
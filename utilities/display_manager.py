@@ -1,5 +1,6 @@
 import asyncio
 import subprocess
+import time
 
 
 from datetime import datetime, timedelta
@@ -9,8 +10,22 @@ from rich.live import Live
 from rich.text import Text
 from rich.console import Console
 
-from utilities.utils import format_float, format_hms, remove_ansi, convert_timestamp, display_wallet_distribution_bar, format_number
+from utilities.utils import format_float, format_hms, remove_ansi, convert_timestamp, display_wallet_distribution_bar, format_number, remaining_seconds
 from utilities.colors import *
+from utilities.block_time import BlockTimeEstimator, EPOCH_BLOCKS
+from utilities.metrics import REGISTRY
+
+TMUX_TIMEOUT = 5  # Seconds a tmux status bar update may take before it is killed
+
+RENDER_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+RENDER_SECONDS = REGISTRY.histogram(
+    "duskman_display_render_seconds", "Time to build and draw the console display",
+    buckets=RENDER_BUCKETS
+)
+TMUX_SECONDS = REGISTRY.histogram(
+    "duskman_tmux_update_seconds", "Time to update the tmux status bar",
+    buckets=RENDER_BUCKETS
+)
 
 class DisplayManager:
     """
@@ -24,7 +39,8 @@ class DisplayManager:
         status_bar_config: Dict[str, Any],
         display_gui: bool = True,
         enable_tmux: bool = False,
-        log_action_func: Callable = None
+        log_action_func: Callable = None,
+        block_time: Optional[BlockTimeEstimator] = None
     ):
         """
         Initialize the display manager.
@@ -35,6 +51,7 @@ class DisplayManager:
             display_gui: Whether to display the GUI
             enable_tmux: Whether to enable TMUX integration
             log_action_func: Function to call for logging
+            block_time: Block time estimator used to predict when blocks arrive
         """
         self.shared_state = shared_state
         self.status_bar_config = status_bar_config
@@ -42,6 +59,7 @@ class DisplayManager:
         self.enable_tmux = enable_tmux
         self.log_action = log_action_func or (lambda *args, **kwargs: None)
         self.console = Console()
+        self.block_time = block_time or BlockTimeEstimator()
         self.byline = self.shared_state.get("options", "DuskMan Stake Management System: by Wolfrage")
         
     async def realtime_display_loop(self) -> None:
@@ -59,7 +77,7 @@ class DisplayManager:
                     st_info = self.shared_state["stake_info"]
                     b = self.shared_state["balances"]
                     last_act = self.shared_state["last_action_taken"]
-                    remain_seconds = self.shared_state["remain_time"]
+                    remain_seconds = remaining_seconds(self.shared_state)
                     disp_time = format_hms(remain_seconds) if remain_seconds > 0 else "0s"
                     donetime = self.shared_state["completion_time"]
                     
@@ -67,6 +85,7 @@ class DisplayManager:
                         await asyncio.sleep(2)
                         continue
                         
+                    started = time.perf_counter()
                     tot_bal = b["public"] + b["shielded"]
                     price = self.shared_state["price"]
                     
@@ -92,16 +111,16 @@ class DisplayManager:
                     )
 
                     currenttime = datetime.now().strftime('%H:%M:%S')
-                    epoch_num = int(blk / 2160)
+                    epoch_num = int(blk / EPOCH_BLOCKS)
                     
                     # Check if stake is active
-                    active_block = self.shared_state.get("active_blk", 2160)
+                    active_block = self.shared_state.get("active_blk", EPOCH_BLOCKS)
                     if int(blk) - active_block >= 0:
                         is_active = str() 
                     else:
-                        active_secs = (active_block - blk) * 10
+                        active_secs = self.block_time.seconds_until(active_block, blk)
                         when_active = (datetime.now() + timedelta(seconds=active_secs)).strftime('%H:%M')
-                        is_active = f"{LIGHT_RED}\n\tActive @ {when_active} - #{active_block} (E: {int(active_block/2160)}){DEFAULT}\n"               
+                        is_active = f"{LIGHT_RED}\n\tActive @ {when_active} - #{active_block} (E: {int(active_block/EPOCH_BLOCKS)}){DEFAULT}\n"               
                     
                     # Get price change percentages
                     chg7d = self.shared_state["price_change_percentage_7d_in_currency"]
@@ -179,10 +198,12 @@ class DisplayManager:
                     # Update the Live display
                     if self.display_gui:
                         live.update(Text(realtime_content), refresh=True)
+                    RENDER_SECONDS.observe(time.perf_counter() - started)
 
                     # Update TMUX status bar
                     if self.enable_tmux:
-                        self._update_tmux_status_bar()
+                        with TMUX_SECONDS.time():
+                            await self._update_tmux_status_bar()
 
                     await asyncio.sleep(1)
 
@@ -190,8 +211,8 @@ class DisplayManager:
                     self.log_action(f"Error in real-time display", str(e), "error")
                     await asyncio.sleep(5)
                     
-    def _update_tmux_status_bar(self) -> None:
-        """Update the TMUX status bar with current information."""
+    async def _update_tmux_status_bar(self) -> None:
+        """Update the TMUX status bar with current information, without blocking the event loop."""
         try:
             # Get current state
             blk = self.shared_state["block_height"]
@@ -242,7 +263,7 @@ class DisplayManager:
             peercnt = f"Peers: {self.shared_state['peer_count']}"
             splitter = " | "
             usd = f"$USD: {format_float(self.shared_state['price'],3)} | "
-            timer = f"Next: {format_hms(self.shared_state['remain_time'])} "
+            timer = f"Next: {format_hms(remaining_seconds(self.shared_state))} "
             
             # Build the complete status bar
             tmux_status = (
@@ -251,10 +272,24 @@ class DisplayManager:
             )
 
             # Update TMUX status bar
-            subprocess.check_call(["tmux", "set-option", "-g", "status-left", remove_ansi(tmux_status)])
+            process = await asyncio.create_subprocess_exec(
+                "tmux", "set-option", "-g", "status-left", remove_ansi(tmux_status),
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL
+            )
+            try:
+                returncode = await asyncio.wait_for(process.wait(), TMUX_TIMEOUT)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                raise
+            if returncode != 0:
+                raise subprocess.CalledProcessError(returncode, "tmux")
         except subprocess.CalledProcessError:
             self.log_action("tmux Error", "Failed to update tmux status bar. Is tmux running?", "debug")
             self.enable_tmux = False
+        except asyncio.TimeoutError:
+            self.log_action("tmux Error", f"tmux did not respond within {TMUX_TIMEOUT}s, skipping this update.", "debug")
         except Exception as e:
             self.log_action("tmux Error", f"Error updating tmux status bar: {str(e)}", "debug")
             self.enable_tmux = False
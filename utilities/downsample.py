@@ -0,0 +1,108 @@
+import numpy as np
+
+# Downsampling methods
+METHOD_LTTB = "lttb"
+METHOD_MINMAX = "minmax"
+METHODS = (METHOD_LTTB, METHOD_MINMAX)
+
+
+def to_array(rows) -> np.ndarray:
+    """
+    Convert (timestamp, avg, min, max) rows to an (n, 4) float array.
+
+    Args:
+        rows: Points as returned by TimeSeriesStore.query
+
+    Returns:
+        Array with one row per point
+    """
+    return np.asarray(rows, dtype=np.float64).reshape(-1, 4)
+
+
+def minmax_buckets(points: np.ndarray, n: int) -> np.ndarray:
+    """
+    Reduce points to at most n equal-width time buckets, keeping each bucket's average and
+    its true minimum and maximum, so spikes survive however far the series is reduced.
+
+    Args:
+        points: (k, 4) array of (timestamp, avg, min, max), oldest first
+        n: Largest number of points to return
+
+    Returns:
+        (m, 4) array with m <= n; each bucket is stamped with its mean timestamp (empty buckets are left out)
+    """
+    k = len(points)
+    if k <= n or n < 1:
+        return points
+    ts = points[:, 0]
+    bounds = np.linspace(ts[0], ts[-1], n + 1)[:-1]
+    starts = np.unique(np.searchsorted(ts, bounds, side="left"))
+    starts = starts[starts < k]
+    counts = np.diff(np.append(starts, k))
+    return np.column_stack((
+        np.add.reduceat(ts, starts) / counts,
+        np.add.reduceat(points[:, 1], starts) / counts,
+        np.minimum.reduceat(points[:, 2], starts),
+        np.maximum.reduceat(points[:, 3], starts),
+    ))
+
+
+def lttb(points: np.ndarray, n: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: pick n of the original points (by average value) that keep
+    the visual shape of the series. The first and last points are always kept.
+
+    Args:
+        points: (k, 4) array of (timestamp, avg, min, max), oldest first
+        n: Number of points to return
+
+    Returns:
+        (n, 4) array of selected rows (all points if there are no more than n)
+    """
+    k = len(points)
+    if k <= n or n < 3:
+        return points
+    x = points[:, 0]
+    y = points[:, 1]
+
+    # n - 2 buckets over the points between the first and the last
+    bounds = np.linspace(1, k - 1, n - 1).astype(np.int64)
+    starts, ends = bounds[:-1], bounds[1:]
+
+    # Every bucket's mean point at once, from cumulative sums
+    cum_x = np.concatenate(([0.0], np.cumsum(x)))
+    cum_y = np.concatenate(([0.0], np.cumsum(y)))
+    sizes = ends - starts
+    mean_x = (cum_x[ends] - cum_x[starts]) / sizes
+    mean_y = (cum_y[ends] - cum_y[starts]) / sizes
+    # The third vertex for each bucket is the next bucket's mean (the last point for the last bucket)
+    next_x = np.append(mean_x[1:], x[-1])
+    next_y = np.append(mean_y[1:], y[-1])
+
+    selected = np.empty(n, dtype=np.int64)
+    selected[0], selected[-1] = 0, k - 1
+    a = 0
+    for i in range(n - 2):
+        s, e = starts[i], ends[i]
+        ax, ay = x[a], y[a]
+        area = np.abs((ax - next_x[i]) * (y[s:e] - ay) - (ax - x[s:e]) * (next_y[i] - ay))
+        a = s + int(np.argmax(area))
+        selected[i + 1] = a
+    return points[selected]
+
+
+def downsample(points: np.ndarray, n: int, method: str = METHOD_LTTB) -> np.ndarray:
+    """
+    Reduce a series to about n points for charting.
+
+    Args:
+        points: (k, 4) array of (timestamp, avg, min, max), oldest first
+        n: Target number of points
+        method: METHOD_LTTB or METHOD_MINMAX
+
+    Returns:
+        Downsampled (m, 4) array
+    """
+    if method == METHOD_MINMAX:
+        return minmax_buckets(points, n)
+    return lttb(points, n)
@@ -0,0 +1,135 @@
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+# Log entry categories
+CATEGORY_ACTION = "action"
+CATEGORY_BALANCE = "balance"
+CATEGORY_ERROR = "error"
+CATEGORY_STATUS = "status"
+CATEGORIES = (CATEGORY_ACTION, CATEGORY_BALANCE, CATEGORY_ERROR, CATEGORY_STATUS)
+
+
+class LogHistory:
+    """
+    Fixed-capacity ring buffer of recent log entries shown on the dashboard.
+
+    Every entry gets an increasing sequence number, which clients use as a cursor to
+    fetch only what is new. Each category also keeps its own ring of the same capacity,
+    so a burst of one kind of entry (e.g. balance changes) can't push the others out.
+    Iterating yields the entry texts, oldest first.
+    """
+
+    def __init__(self, capacity: int = 16):
+        """
+        Initialize the log history.
+
+        Args:
+            capacity: Entries kept overall, and per category
+        """
+        self.capacity = max(int(capacity), 1)
+        self._entries: Deque[Dict[str, Any]] = deque(maxlen=self.capacity)
+        self._by_category: Dict[str, Deque[Dict[str, Any]]] = {
+            category: deque(maxlen=self.capacity) for category in CATEGORIES
+        }
+        self.last_seq = 0
+
+    def append(self, text: str, category: str = CATEGORY_ACTION) -> int:
+        """
+        Add an entry, evicting the oldest one when full.
+
+        Args:
+            text: Formatted log entry
+            category: One of CATEGORIES
+
+        Returns:
+            The entry's sequence number
+        """
+        if category not in self._by_category:
+            category = CATEGORY_ACTION
+        self.last_seq += 1
+        entry = {"seq": self.last_seq, "category": category, "text": text}
+        self._entries.append(entry)
+        self._by_category[category].append(entry)
+        return self.last_seq
+
+    def _newest_first(self, category: Optional[str]) -> List[Dict[str, Any]]:
+        """Entries of one category, or of all category rings merged, newest first."""
+        if category:
+            return list(reversed(self._by_category.get(category, ())))
+        merged = [entry for entries in self._by_category.values() for entry in entries]
+        merged.sort(key=lambda entry: entry["seq"], reverse=True)
+        return merged
+
+    def since(self, cursor: int = 0, category: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Entries newer than a cursor, newest first.
+
+        Args:
+            cursor: Sequence number the client already has (0 for everything)
+            category: Restrict to one category (all categories' rings otherwise)
+            limit: Return at most this many (the newest)
+
+        Returns:
+            List of {"seq", "category", "text"} entries
+        """
+        result = []
+        for entry in self._newest_first(category):
+            if entry["seq"] <= cursor or (limit is not None and len(result) >= limit):
+                break
+            result.append(entry)
+        return result
+
+    def before(self, cursor: int, category: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Entries older than a cursor, newest first, for paging back through history.
+
+        Args:
+            cursor: Sequence number of the oldest entry the client has
+            category: Restrict to one category (all categories' rings otherwise)
+            limit: Return at most this many
+
+        Returns:
+            List of {"seq", "category", "text"} entries
+        """
+        older = [entry for entry in self._newest_first(category) if entry["seq"] < cursor]
+        return older[:limit]
+
+    def response(self, cursor: int = 0) -> Dict[str, Any]:
+        """
+        Log section of a dashboard API response: only the entries newer than the client's cursor.
+
+        Args:
+            cursor: Value of "log_cursor" from the client's previous response (0 for everything)
+
+        Returns:
+            Dict with "log_entries" (texts, newest first), "log_items" (entries with seq and
+            category), "log_cursor" (to send next time) and "log_reset" (the history restarted,
+            so the client should drop what it has)
+        """
+        reset = cursor > self.last_seq
+        items = self.since(0 if reset else cursor)
+        return {
+            "log_entries": [entry["text"] for entry in items],
+            "log_items": items,
+            "log_cursor": self.last_seq,
+            "log_reset": reset,
+        }
+
+    def texts(self, category: Optional[str] = None) -> List[str]:
+        """
+        Entry texts, newest first.
+
+        Args:
+            category: Restrict to one category
+
+        Returns:
+            List of formatted entries
+        """
+        entries = self._by_category.get(category, ()) if category else self._entries
+        return [entry["text"] for entry in reversed(entries)]
+
+    def __iter__(self) -> Iterator[str]:
+        return (entry["text"] for entry in self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
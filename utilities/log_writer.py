@@ -0,0 +1,210 @@
+import gzip
+import logging
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+_STOP = object()
+
+
+class _Segment:
+    """An open log file and when it was started, for rotation."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.handle = open(path, "a", encoding="utf-8")
+        self.size = self.handle.tell()
+        self.started = time.time()
+
+
+class LogWriter:
+    """
+    Queue-backed log sink. Callers enqueue lines without blocking; a background thread
+    batches them, writes through file handles it keeps open, and rotates files by size
+    or age, gzip-compressing the old segments.
+
+    When the queue is full new lines are dropped rather than blocking the caller; the
+    number dropped is counted and written to the affected log once there is room again.
+    """
+
+    def __init__(
+        self,
+        max_queue: int = 10000,
+        batch_size: int = 256,
+        flush_interval: float = 1.0,
+        max_bytes: int = 10 * 1024 * 1024,
+        max_age: Optional[float] = 7 * 86400,
+        backups: int = 5,
+        compress: bool = True,
+        error_func: Callable = None
+    ):
+        """
+        Initialize the log writer.
+
+        Args:
+            max_queue: Lines that may be waiting before new ones are dropped
+            batch_size: Lines written per batch before flushing
+            flush_interval: Longest a line waits before being flushed to disk
+            max_bytes: Rotate a file once it reaches this size (0 disables)
+            max_age: Rotate a file after this many seconds (None disables)
+            backups: Rotated segments kept per log file
+            compress: Gzip rotated segments
+            error_func: Called with a message when the writer itself fails (logging.error by default)
+        """
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.backups = backups
+        self.compress = compress
+        self.error_func = error_func or logging.error
+
+        self._queue: "queue.Queue" = queue.Queue(max_queue)
+        self._segments: Dict[str, _Segment] = {}
+        self._dropped: Dict[str, int] = {}
+        self._dropped_lock = threading.Lock()
+        self.dropped_total = 0
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the background writer thread."""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+            self._thread.start()
+
+    def write(self, path: str, line: str) -> bool:
+        """
+        Enqueue a line for the given file. Never blocks.
+
+        Args:
+            path: Log file path
+            line: Line to append (without newline)
+
+        Returns:
+            True if queued, False if it was dropped because the queue is full
+        """
+        try:
+            self._queue.put_nowait((path, line))
+            return True
+        except queue.Full:
+            with self._dropped_lock:
+                self._dropped[path] = self._dropped.get(path, 0) + 1
+                self.dropped_total += 1
+            return False
+
+    @property
+    def queue_depth(self) -> int:
+        """Lines waiting to be written."""
+        return self._queue.qsize()
+
+    def close(self, timeout: float = 5) -> None:
+        """
+        Write everything queued so far, close the files and stop the thread.
+
+        Args:
+            timeout: Seconds to wait for the writer to drain
+        """
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch: List[Tuple[str, str]] = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                self.error_func(f"Error writing log batch: {e}")
+
+        for segment in self._segments.values():
+            segment.handle.close()
+        self._segments.clear()
+
+    def _write_batch(self, batch: List[Tuple[str, str]]) -> None:
+        with self._dropped_lock:
+            dropped, self._dropped = self._dropped, {}
+
+        lines: Dict[str, List[str]] = {}
+        for path, count in dropped.items():
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
+            lines.setdefault(path, []).append(f"{timestamp} - Log Writer: {count} messages dropped (queue full)")
+        for path, line in batch:
+            lines.setdefault(path, []).append(line)
+
+        for path, entries in lines.items():
+            segment = self._segment(path)
+            data = "\n".join(entries) + "\n"
+            segment.handle.write(data)
+            segment.handle.flush()
+            segment.size += len(data)
+            if self._should_rotate(segment):
+                self._rotate(segment)
+
+        # Age-based rotation also applies to files that are currently quiet
+        if self.max_age:
+            for segment in list(self._segments.values()):
+                if segment.size and self._should_rotate(segment):
+                    self._rotate(segment)
+
+    def _segment(self, path: str) -> _Segment:
+        segment = self._segments.get(path)
+        if segment is None:
+            segment = self._segments[path] = _Segment(path)
+        return segment
+
+    def _should_rotate(self, segment: _Segment) -> bool:
+        if self.max_bytes and segment.size >= self.max_bytes:
+            return True
+        return bool(self.max_age) and time.time() - segment.started >= self.max_age
+
+    def _rotate(self, segment: _Segment) -> None:
+        """Move the current file aside (compressing it) and start a new one."""
+        segment.handle.close()
+        del self._segments[segment.path]
+
+        rotated = base = f"{segment.path}.{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+        suffix = 1
+        while os.path.exists(rotated) or os.path.exists(rotated + ".gz"):
+            rotated = f"{base}-{suffix}"
+            suffix += 1
+        os.replace(segment.path, rotated)
+        if self.compress:
+            with open(rotated, "rb") as src, gzip.open(rotated + ".gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(rotated)
+
+        self._prune(segment.path)
+
+    def _prune(self, path: str) -> None:
+        """Delete the oldest rotated segments beyond the configured number of backups."""
+        directory = os.path.dirname(path) or "."
+        # Only names _rotate() produces: <file>.<YYYYmmdd-HHMMSS>[-N][.gz]
+        pattern = re.compile(re.escape(os.path.basename(path)) + r"\.\d{8}-\d{6}(?:-\d+)?(?:\.gz)?")
+        rotated = sorted(
+            (os.path.join(directory, name) for name in os.listdir(directory) if pattern.fullmatch(name)),
+            key=os.path.getmtime
+        )
+        for name in rotated[:max(len(rotated) - self.backups, 0)]:
+            os.remove(name)
@@ -1,7 +1,76 @@
+import json
+import time
 from datetime import datetime
-from typing import Dict, Any, Optional, List, Callable
+from typing import Dict, Any, Optional, List, Callable, Tuple
 
-from utilities.utils import write_to_log
+from utilities.log_writer import LogWriter
+from utilities.metrics import REGISTRY, COUNTER, GAUGE, MetricsRegistry
+from utilities.log_history import LogHistory, CATEGORY_ACTION, CATEGORY_BALANCE, CATEGORY_ERROR, CATEGORY_STATUS
+from utilities.notifications import PRIORITY_HIGH, PRIORITY_NORMAL
+from utilities.notification_router import (
+    EVENT_BALANCE_CHANGE, EVENT_ERROR, EVENT_STAKE_ACTION, EVENT_STATUS, SEVERITY_CRITICAL, SEVERITY_ERROR, SEVERITY_INFO
+)
+
+LOG_TYPES = ('info', 'error', 'debug')
+
+# Notification event type for each log history category, unless a call names one
+CATEGORY_EVENTS = {
+    CATEGORY_ACTION: EVENT_STAKE_ACTION,
+    CATEGORY_BALANCE: EVENT_BALANCE_CHANGE,
+    CATEGORY_ERROR: EVENT_ERROR,
+    CATEGORY_STATUS: EVENT_STATUS,
+}
+
+class LogRecord:
+    """
+    A single log call. Creating one is cheap: the timestamp, text and JSON forms are only
+    built (and the password masked) the first time a sink asks for them.
+    """
+    __slots__ = ('action', 'details', 'type', 'category', 'event', 'severity', 'created', 'mask', '_text')
+    
+    def __init__(
+        self,
+        action: str,
+        details: str,
+        type: str,
+        category: Optional[str],
+        mask: str = '',
+        event: Optional[str] = None,
+        severity: Optional[str] = None
+    ):
+        self.action = action
+        self.details = details
+        self.type = type
+        self.category = category or (CATEGORY_ERROR if type == 'error' else CATEGORY_ACTION)
+        self.event = event or CATEGORY_EVENTS.get(self.category, EVENT_STAKE_ACTION)
+        self.severity = severity or (SEVERITY_ERROR if type == 'error' else SEVERITY_INFO)
+        self.created = time.time()
+        self.mask = mask
+        self._text = None
+        
+    def _masked(self, value: Any) -> str:
+        value = str(value)
+        return value.replace(self.mask, '#####') if self.mask else value
+        
+    @property
+    def text(self) -> str:
+        """Plain-text form: "YYYY-MM-DD HH:MM - action: details", password masked."""
+        if self._text is None:
+            timestamp = datetime.fromtimestamp(self.created).strftime("%Y-%m-%d %H:%M")
+            self._text = self._masked(f"{timestamp} - {self.action}: {self.details}")
+        return self._text
+        
+    def to_json(self) -> str:
+        """JSON-lines form, password masked."""
+        return json.dumps({
+            "ts": datetime.fromtimestamp(self.created).astimezone().isoformat(timespec="milliseconds"),
+            "level": self.type,
+            "category": self.category,
+            "event": self.event,
+            "severity": self.severity,
+            "action": self._masked(self.action),
+            "details": self._masked(self.details),
+        }, ensure_ascii=False)
 
 class Logger:
     """
@@ -33,49 +102,116 @@ class Logger:
         self.info_log_file = config.get('INFO_LOG_FILE', 'duskman_actions.log')
         self.error_log_file = config.get('ERROR_LOG_FILE', 'duskman_errors.log')
         self.debug_log_file = config.get('DEBUG_LOG_FILE', 'duskman_tmp_debug.log')
+        self.json_log_file = config.get('JSON_LOG_FILE')
         self.password = config.get('password', '')
         
-        # Log format
-        self.log_format = "{timestamp} - {message}"
+        # Background writer so logging never blocks the event loop on disk I/O
+        self.writer = None
+        if self.enable_logging:
+            self.writer = LogWriter(
+                max_queue=config.get('log_queue_size', 10000),
+                max_bytes=int(config.get('log_max_size', 10) * 1024 * 1024),
+                max_age=config.get('log_max_age', 7) * 86400 or None,
+                backups=config.get('log_backups', 5),
+                compress=config.get('compress_logs', True)
+            )
+            self.writer.start()
+        
+        # Each log type maps straight to the sinks that accept it, so a dropped record costs one lookup
+        self._routes: Dict[str, Tuple[Callable[[LogRecord], None], ...]] = self._build_routes()
+        
+    def _build_routes(self) -> Dict[str, Tuple[Callable[[LogRecord], None], ...]]:
+        """
+        Decide once, from the configuration, which sinks receive each log type.
+        
+        Returns:
+            Dict of log type to the sink functions that accept it
+        """
+        sinks: List[Tuple[Tuple[str, ...], Callable[[LogRecord], None]]] = []
+        
+        if self.enable_logging:
+            if self.is_debug:
+                sinks.append((('debug', 'error'), lambda record: self.writer.write(self.debug_log_file, record.text)))
+            sinks.append((('error',), lambda record: self.writer.write(self.error_log_file, record.text)))
+            sinks.append((('info',), lambda record: self.writer.write(self.info_log_file, record.text)))
+            sinks.append((('info', 'error'), self._to_history))
+            if self.json_log_file:
+                json_types = LOG_TYPES if self.is_debug else ('info', 'error')
+                sinks.append((json_types, lambda record: self.writer.write(self.json_log_file, record.to_json())))
+        
+        # Debug lines are never sent as notifications; errors may be deduplicated and coalesced
+        if self.notifier:
+            sinks.append((('info', 'error'), self._to_notifier))
         
-    def log_action(self, action: str = "Action", details: str = "No Details", type: str = 'info') -> None:
+        return {
+            log_type: tuple(sink for types, sink in sinks if log_type in types)
+            for log_type in LOG_TYPES
+        }
+        
+    def _to_notifier(self, record: LogRecord) -> None:
+        """
+        Queue a record as a notification. Actions, staking failures and critical alerts go out
+        immediately and are never deduplicated; other errors may be coalesced, and repeats are
+        recognised by event type and action, since the details often carry changing numbers.
         """
-        Write log messages to specific files based on type.
+        urgent = record.type != 'error' or record.severity == SEVERITY_CRITICAL or record.event == EVENT_STAKE_ACTION
+        priority = PRIORITY_HIGH if urgent else PRIORITY_NORMAL
+        self.notifier.notify(
+            record.text, self.shared_state, priority, record.event, record.severity,
+            key=f"{record.event}:{record.action}"
+        )
+        
+    def _to_history(self, record: LogRecord) -> None:
+        """Add a record to the recent entries shown on the dashboard."""
+        log_entries: LogHistory = self.shared_state["log_entries"]
+        log_entries.append(record.text, record.category)
+        
+    def log_action(
+        self,
+        action: str = "Action",
+        details: str = "No Details",
+        type: str = 'info',
+        category: Optional[str] = None,
+        event: Optional[str] = None,
+        severity: Optional[str] = None
+    ) -> None:
+        """
+        Send a log message to every sink that accepts its type (log files, JSON log,
+        dashboard history, notifications). Nothing is formatted unless a sink takes it.
         
         Args:
             action: Action being logged
             details: Details of the action
             type: Type of log message (info, error, debug)
+            category: Log history category (defaults to error for errors, action otherwise)
+            event: Notification event type for routing (derived from the category if omitted)
+            severity: Notification severity for routing (error for errors, info otherwise, if omitted)
         """
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-        formatted_message = self.log_format.format(timestamp=timestamp, message=f"{action}: {details}")
-        
-        # Mask password
-        formatted_message = formatted_message.replace(self.password, '#####')
+        sinks = self._routes.get(type, self._routes['info'])
+        if not sinks:
+            return
         
-        # Manage log entries in shared state
-        log_entries = self.shared_state.get("log_entries", [])
-        if len(log_entries) > 15:  # TODO: Make configurable
-            log_entries.pop(0)
+        record = LogRecord(action, details, type, category, self.password, event, severity)
+        for sink in sinks:
+            sink(record)
+
+    def register_metrics(self, registry: MetricsRegistry = REGISTRY) -> None:
+        """
+        Export the log writer's queue depth and dropped lines, read when metrics are collected.
         
-        # Write to the appropriate log file
-        if type == 'debug' and self.enable_logging:
-            if self.is_debug:
-                write_to_log(self.debug_log_file, formatted_message)
-                return
-        elif type == 'error' and self.enable_logging:
-            if self.is_debug:
-                write_to_log(self.debug_log_file, formatted_message)
-                
-            log_entries.append(formatted_message)    
-            write_to_log(self.error_log_file, formatted_message)
-        elif self.enable_logging:
-            write_to_log(self.info_log_file, formatted_message)
-            log_entries.append(formatted_message)
-            
-        # Update shared state
-        self.shared_state["log_entries"] = log_entries
-        
-        # Send notification if notifier is available
-        if self.notifier:
-            self.notifier.notify(formatted_message, self.shared_state)
+        Args:
+            registry: Registry to add the metrics to
+        """
+        registry.register_callback(
+            "duskman_log_lines_dropped_total", "Log lines dropped because the writer queue was full", COUNTER,
+            lambda: self.writer.dropped_total if self.writer else None
+        )
+        registry.register_callback(
+            "duskman_log_queue_depth", "Log lines waiting to be written", GAUGE,
+            lambda: self.writer.queue_depth if self.writer else None
+        )
+
+    def close(self) -> None:
+        """Flush queued log lines to disk and stop the background writer."""
+        if self.writer:
+            self.writer.close()
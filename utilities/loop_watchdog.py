@@ -0,0 +1,187 @@
+import asyncio
+import collections
+import sys
+import threading
+import time
+import traceback
+from typing import Dict, Optional
+
+from utilities.metrics import REGISTRY, GAUGE, MetricsRegistry
+
+HEARTBEAT_INTERVAL = 0.25  # Seconds between heartbeats on the event loop
+LAG_THRESHOLD = 0.5        # Seconds late a heartbeat may be before the loop counts as blocked
+LAG_SAMPLES = 2400         # Recent lag measurements kept for percentiles (10 minutes of heartbeats)
+STACK_LIMIT = 30           # Innermost frames captured from a blocked loop
+QUANTILES = (0.5, 0.9, 0.99, 1.0)
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+LOOP_LAG = REGISTRY.histogram(
+    "duskman_event_loop_lag_seconds",
+    "How late the event loop ran a scheduled heartbeat",
+    buckets=LAG_BUCKETS
+)
+STALLS = REGISTRY.counter(
+    "duskman_event_loop_stalls_total",
+    "Times the event loop was blocked for longer than the lag threshold"
+)
+
+
+async def measure_loop_lag(interval: float = HEARTBEAT_INTERVAL) -> None:
+    """
+    Heartbeat that only records event loop lag in the LOOP_LAG histogram, for when
+    metrics are served without the watchdog (no watching thread, no stall reports).
+
+    Args:
+        interval: Seconds between heartbeats
+    """
+    while True:
+        due = time.monotonic() + interval
+        await asyncio.sleep(interval)
+        LOOP_LAG.observe(max(time.monotonic() - due, 0.0))
+
+
+class Stall:
+    """What the event loop was running when a watchdog found it blocked."""
+    __slots__ = ("detected", "blocked", "task", "stack")
+
+    def __init__(self, detected: float, blocked: float, task: str, stack: str):
+        self.detected = detected
+        self.blocked = blocked
+        self.task = task
+        self.stack = stack
+
+
+class LoopWatchdog:
+    """
+    Measures event loop lag continuously and catches whatever blocks the loop.
+
+    A heartbeat coroutine sleeps for a fixed interval and records how much later than that
+    the loop woke it (the lag, exported as a histogram and as recent percentiles). A
+    background thread checks the heartbeat; once it is more than the threshold late, the
+    thread captures the event loop thread's stack and the running task, so the blocking
+    call is caught in the act. The report is logged from the loop when it runs again,
+    with how long it was blocked in total.
+    """
+
+    def __init__(
+        self,
+        threshold: float = LAG_THRESHOLD,
+        interval: float = HEARTBEAT_INTERVAL,
+        log_action_func=None,
+        samples: int = LAG_SAMPLES
+    ):
+        """
+        Initialize the watchdog.
+
+        Args:
+            threshold: Seconds late a heartbeat may be before the loop counts as blocked
+            interval: Seconds between heartbeats
+            log_action_func: Function to call for logging
+            samples: Recent lag measurements kept for percentiles
+        """
+        self.threshold = threshold
+        self.interval = interval
+        self.log_action = log_action_func or (lambda *args, **kwargs: None)
+        self.lags: "collections.deque[float]" = collections.deque(maxlen=max(int(samples), 1))
+        self.stalls = 0
+        self.last_stall: Optional[Stall] = None
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._due = 0.0                  # monotonic time the next heartbeat should run
+        self._pending: Optional[Stall] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def percentiles(self) -> Dict[float, float]:
+        """
+        Lag percentiles over the recent heartbeats.
+
+        Returns:
+            Quantile (0.5, 0.9, 0.99, 1.0 = max) -> lag in seconds (empty before the first heartbeat)
+        """
+        lags = sorted(self.lags)
+        if not lags:
+            return {}
+        return {q: lags[min(int(q * len(lags)), len(lags) - 1)] for q in QUANTILES}
+
+    def register_metrics(self, registry: MetricsRegistry = REGISTRY) -> None:
+        """
+        Export the recent lag percentiles, computed when metrics are collected.
+
+        Args:
+            registry: Registry to add the metrics to
+        """
+        registry.register_callback(
+            "duskman_event_loop_lag_quantile_seconds",
+            f"Event loop lag percentiles over the last {self.lags.maxlen} heartbeats",
+            GAUGE,
+            lambda: {str(q): lag for q, lag in self.percentiles().items()},
+            ("quantile",)
+        )
+
+    async def run(self) -> None:
+        """Send heartbeats (and start the watching thread) until cancelled."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._due = time.monotonic() + self.interval
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        try:
+            while True:
+                self._due = time.monotonic() + self.interval
+                await asyncio.sleep(self.interval)
+                lag = max(time.monotonic() - self._due, 0.0)
+                LOOP_LAG.observe(lag)
+                self.lags.append(lag)
+                stall, self._pending = self._pending, None
+                if stall is not None:
+                    self._report(stall, lag)
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Stop the watching thread."""
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(1)
+        self._thread = None
+
+    def _watch(self) -> None:
+        """Watching thread: capture the loop's stack once per stall."""
+        reported_due = None
+        while not self._stop.wait(min(self.threshold, self.interval) / 2):
+            due = self._due
+            late = time.monotonic() - due
+            if late >= self.threshold and due != reported_due:
+                reported_due = due
+                self._pending = self._capture(late)
+
+    def _capture(self, late: float) -> Stall:
+        """Stack of the event loop thread and the task it is running, taken from the watching thread."""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = "".join(traceback.format_stack(frame, limit=STACK_LIMIT)) if frame is not None else ""
+        task = None
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:
+            pass
+        if task is not None:
+            coro = task.get_coro()
+            description = f"{task.get_name()} ({getattr(coro, '__qualname__', coro)})"
+        else:
+            description = "no task (callback or loop internals)"
+        return Stall(time.time(), late, description, stack)
+
+    def _report(self, stall: Stall, lag: float) -> None:
+        """Count and log a stall once the loop runs again; `lag` is how late it resumed in total."""
+        stall.blocked = max(stall.blocked, lag)
+        self.stalls += 1
+        self.last_stall = stall
+        STALLS.inc()
+        self.log_action(
+            "Event Loop Blocked",
+            f"{stall.blocked:.2f}s in {stall.task}\n{stall.stack.rstrip()}",
+            "debug"
+        )
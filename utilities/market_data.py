@@ -1,20 +1,30 @@
+import time
 import aiohttp
 from typing import Dict, Any, Optional
 
+from utilities.timeseries import TimeSeriesStore
+from utilities.metrics import REGISTRY
+
+# CoinGecko request metrics
+FETCH_SECONDS = REGISTRY.histogram("duskman_market_fetch_seconds", "Duration of CoinGecko market data fetches")
+FETCHES = REGISTRY.counter("duskman_market_fetches_total", "CoinGecko market data fetches, by result", ("result",))
+
 class MarketDataClient:
     """
     Client for fetching cryptocurrency market data from external APIs.
     Currently supports CoinGecko for DUSK Network data.
     """
     
-    def __init__(self, log_action_func=None):
+    def __init__(self, log_action_func=None, history: Optional[TimeSeriesStore] = None):
         """
         Initialize the market data client.
         
         Args:
             log_action_func: Function to call for logging
+            history: Time-series store price, market cap and volume samples are recorded to
         """
         self.log_action = log_action_func or (lambda *args, **kwargs: None)
+        self.history = history
         
     async def fetch_dusk_data(self, shared_state: Dict[str, Any]) -> bool:
         """
@@ -38,6 +48,7 @@ class MarketDataClient:
             "locale": "en",
         }
 
+        started = time.perf_counter()
         try:
             async with aiohttp.ClientSession() as session:
                 async with session.get(url, params=params) as response:
@@ -49,14 +60,29 @@ class MarketDataClient:
                             
                         # Update shared_state directly
                         self._update_shared_state(shared_state, dusk_data)
+                        if self.history is not None and dusk_data:
+                            self.history.record_many({
+                                "price": dusk_data.get("current_price"),
+                                "market_cap": dusk_data.get("market_cap"),
+                                "volume": dusk_data.get("total_volume"),
+                            })
+                        self._record_fetch("ok", started)
                         return True
                     else:
+                        self._record_fetch(f"http_{response.status}", started)
                         self.log_action("Failed to fetch DUSK data", f"HTTP Status: {response.status}", 'debug')
                         return False
         except Exception as e:
+            self._record_fetch("error", started)
             self.log_action("Error while fetching DUSK data", str(e), 'debug')
             return False
             
+    @staticmethod
+    def _record_fetch(result: str, started: float) -> None:
+        """Count a fetch and observe its duration (started is a perf_counter() value)."""
+        FETCH_SECONDS.observe(time.perf_counter() - started)
+        FETCHES.labels(result).inc()
+            
     def _update_shared_state(self, shared_state: Dict[str, Any], dusk_data: Dict[str, Any]) -> None:
         """
         Update shared state with market data.
@@ -0,0 +1,365 @@
+import bisect
+import logging
+import math
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"  # Prometheus text exposition format
+
+# Histogram buckets in seconds, from fast node queries to slow wallet transactions
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# Metric types
+COUNTER = "counter"
+GAUGE = "gauge"
+HISTOGRAM = "histogram"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if value != value:
+        return "NaN"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels_text(pairs: Iterable[Tuple[str, str]]) -> str:
+    text = ",".join(f'{name}="{_escape(value)}"' for name, value in pairs)
+    return f"{{{text}}}" if text else ""
+
+
+class _CounterValue:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        """Add to the counter (never negative)."""
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        self.value += amount
+
+
+class _GaugeValue:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+
+class _Timer:
+    """Context manager that observes its duration in a histogram."""
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram: "_HistogramValue"):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # per bucket (not cumulative); the last is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """Record one observation (e.g. a duration in seconds)."""
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def time(self) -> _Timer:
+        """Time a block: `with histogram.time(): ...`"""
+        return _Timer(self)
+
+
+class Metric:
+    """
+    A named metric, optionally split by labels. Each combination of label values gets its
+    own value object, created on first use and kept, so recording a measurement is a dict
+    lookup (or nothing, when the caller keeps the `labels()` result) plus an addition.
+
+    Values are updated from the event loop thread without locking.
+    """
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        """
+        Args:
+            name: Metric name, e.g. "duskman_commands_total"
+            documentation: Help text
+            labelnames: Names of the labels the metric is split by
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], Any] = {}
+
+    def _new_value(self) -> Any:
+        raise NotImplementedError
+
+    def labels(self, *values: Any) -> Any:
+        """
+        The value for one combination of label values.
+
+        Args:
+            *values: One value per label name, in order
+
+        Returns:
+            The value object to record on
+        """
+        key = tuple(str(value) for value in values)
+        value = self._values.get(key)
+        if value is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            value = self._values[key] = self._new_value()
+        return value
+
+    def _unlabelled(self) -> Any:
+        if self.labelnames:
+            raise ValueError(f"{self.name} has labels {self.labelnames}; use labels()")
+        return self.labels()
+
+    def samples(self) -> Iterable[Tuple[str, Tuple[Tuple[str, str], ...], float]]:
+        """(name suffix, label pairs, value) for every sample."""
+        for key, value in list(self._values.items()):
+            yield "", tuple(zip(self.labelnames, key)), value.value
+
+    def render(self) -> List[str]:
+        """The metric in Prometheus text format, one line per entry."""
+        lines = [f"# HELP {self.name} {_escape(self.documentation)}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, pairs, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_labels_text(pairs)} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    """A count that only goes up (requests made, messages sent, ...)."""
+    kind = COUNTER
+
+    def _new_value(self) -> _CounterValue:
+        return _CounterValue()
+
+    def inc(self, amount: float = 1) -> None:
+        self._unlabelled().inc(amount)
+
+
+class Gauge(Metric):
+    """A value that goes up and down (queue depth, block height, ...)."""
+    kind = GAUGE
+
+    def _new_value(self) -> _GaugeValue:
+        return _GaugeValue()
+
+    def set(self, value: float) -> None:
+        self._unlabelled().set(value)
+
+    def inc(self, amount: float = 1) -> None:
+        self._unlabelled().inc(amount)
+
+    def dec(self, amount: float = 1) -> None:
+        self._unlabelled().dec(amount)
+
+
+class Histogram(Metric):
+    """Observations counted into buckets (latencies), with their sum and count."""
+    kind = HISTOGRAM
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        """
+        Args:
+            name: Metric name, e.g. "duskman_command_seconds"
+            documentation: Help text
+            labelnames: Names of the labels the metric is split by
+            buckets: Upper bounds of the buckets (+Inf is added)
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(bound) for bound in buckets if bound != math.inf))
+
+    def _new_value(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._unlabelled().observe(value)
+
+    def time(self) -> _Timer:
+        return self._unlabelled().time()
+
+    def samples(self):
+        for key, value in list(self._values.items()):
+            pairs = tuple(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), value.counts):
+                cumulative += count
+                yield "_bucket", pairs + (("le", _format_value(bound)),), cumulative
+            yield "_sum", pairs, value.sum
+            yield "_count", pairs, value.count
+
+
+class CallbackMetric(Metric):
+    """
+    A counter or gauge whose values are read from the application when metrics are collected,
+    for numbers the application already keeps (queue depths, delivery counts, the shared state).
+    It costs nothing between scrapes.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        kind: str,
+        func: Callable[[], Any],
+        labelnames: Sequence[str] = ()
+    ):
+        """
+        Args:
+            name: Metric name
+            documentation: Help text
+            kind: COUNTER or GAUGE
+            func: Returns the value, or for labelled metrics a dict of label value(s) -> value;
+                None values are left out
+            labelnames: Names of the labels the metric is split by
+        """
+        super().__init__(name, documentation, labelnames)
+        self.kind = kind
+        self.func = func
+
+    def samples(self):
+        try:
+            result = self.func()
+        except Exception as e:
+            logging.debug(f"Collecting metric {self.name} failed: {e}")
+            return
+        if not self.labelnames:
+            result = {(): result}
+        for key, value in (result or {}).items():
+            if value is None:
+                continue
+            key = key if isinstance(key, tuple) else (key,)
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                continue
+            yield "", tuple(zip(self.labelnames, (str(part) for part in key))), value
+
+
+class MetricsRegistry:
+    """
+    The metrics of the application, rendered in the Prometheus text format for `/metrics`.
+
+    Asking for a metric that already exists returns it, so modules can declare the metrics
+    they record at import time without coordinating. Callback metrics are replaced when
+    registered again (e.g. for a new instance of the object they read from).
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def _get_or_add(self, metric: Metric) -> Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is None:
+            self._metrics[metric.name] = metric
+            return metric
+        if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+            raise ValueError(f"Metric {metric.name} is already registered with a different type or labels")
+        return existing
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Get or create a counter."""
+        return self._get_or_add(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Get or create a gauge."""
+        return self._get_or_add(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """Get or create a histogram."""
+        return self._get_or_add(Histogram(name, documentation, labelnames, buckets))
+
+    def register_callback(
+        self,
+        name: str,
+        documentation: str,
+        kind: str,
+        func: Callable[[], Any],
+        labelnames: Sequence[str] = ()
+    ) -> CallbackMetric:
+        """
+        Add (or replace) a metric whose values are read from `func` at collection time.
+
+        Args:
+            name: Metric name
+            documentation: Help text
+            kind: COUNTER or GAUGE
+            func: See CallbackMetric
+            labelnames: Names of the labels the metric is split by
+
+        Returns:
+            The metric
+        """
+        metric = CallbackMetric(name, documentation, kind, func, labelnames)
+        existing = self._metrics.get(name)
+        if existing is not None and not isinstance(existing, CallbackMetric):
+            raise ValueError(f"Metric {name} is already registered")
+        self._metrics[name] = metric
+        return metric
+
+    def unregister(self, name: str) -> None:
+        """Remove a metric (ignored if it doesn't exist)."""
+        self._metrics.pop(name, None)
+
+    def get(self, name: str) -> Optional[Metric]:
+        """A registered metric, or None."""
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Every metric in the Prometheus text exposition format."""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Metrics recorded anywhere in the application; served at /metrics by the dashboard
+REGISTRY = MetricsRegistry()
@@ -0,0 +1,163 @@
+import asyncio
+import random
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    channel TEXT NOT NULL,
+    message TEXT NOT NULL,
+    state TEXT,
+    priority INTEGER NOT NULL,
+    created REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (next_attempt);
+"""
+
+# (id, channel, message, state, priority, created, attempts)
+OutboxRow = Tuple[int, str, str, Optional[str], int, float, int]
+
+
+class NotificationOutbox:
+    """
+    Durable SQLite outbox for notifications. Every notification is stored (one row per
+    channel) before it is dispatched and only deleted once that channel accepted it, so
+    failed deliveries can be retried with backoff and nothing queued is lost on restart.
+    All database work happens on a single background thread.
+    """
+
+    def __init__(
+        self,
+        path: str = "duskman_outbox.db",
+        base_delay: float = 30,
+        max_delay: float = 3600,
+        max_age: float = 86400
+    ):
+        """
+        Initialize the outbox.
+
+        Args:
+            path: SQLite database file
+            base_delay: Seconds before the first retry (doubles on each attempt)
+            max_delay: Longest wait between retries
+            max_age: Seconds after which an undeliverable notification is given up on
+        """
+        self.path = path
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_age = max_age
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="outbox")
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _add(self, channels: List[str], message: str, state: Optional[str], priority: int) -> Dict[str, int]:
+        conn = self._connect()
+        now = time.time()
+        ids = {}
+        with conn:
+            for channel in channels:
+                cursor = conn.execute(
+                    "INSERT INTO outbox (channel, message, state, priority, created, next_attempt) VALUES (?, ?, ?, ?, ?, ?)",
+                    (channel, message, state, priority, now, now)
+                )
+                ids[channel] = cursor.lastrowid
+        return ids
+
+    def _remove(self, ids: List[int]) -> None:
+        conn = self._connect()
+        with conn:
+            conn.executemany("DELETE FROM outbox WHERE id = ?", [(i,) for i in ids])
+
+    def _reschedule(self, ids: List[int]) -> int:
+        """Push failed rows back with exponential backoff; drop those past max_age. Returns how many were dropped."""
+        conn = self._connect()
+        now = time.time()
+        expired = []
+        with conn:
+            for row_id in ids:
+                row = conn.execute("SELECT attempts, created FROM outbox WHERE id = ?", (row_id,)).fetchone()
+                if row is None:
+                    continue
+                attempts, created = row[0] + 1, row[1]
+                if now - created >= self.max_age:
+                    expired.append(row_id)
+                    continue
+                delay = min(self.base_delay * 2 ** (attempts - 1), self.max_delay)
+                delay *= random.uniform(0.8, 1.2)
+                conn.execute(
+                    "UPDATE outbox SET attempts = ?, next_attempt = ? WHERE id = ?",
+                    (attempts, now + delay, row_id)
+                )
+            conn.executemany("DELETE FROM outbox WHERE id = ?", [(i,) for i in expired])
+        return len(expired)
+
+    def _due(self, until: float, exclude: Iterable[int]) -> List[OutboxRow]:
+        conn = self._connect()
+        exclude = set(exclude)
+        rows = conn.execute(
+            "SELECT id, channel, message, state, priority, created, attempts FROM outbox WHERE next_attempt <= ? ORDER BY id",
+            (until,)
+        ).fetchall()
+        return [row for row in rows if row[0] not in exclude]
+
+    def _pending(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def add(self, channels: List[str], message: str, state: Optional[str], priority: int) -> "asyncio.Future":
+        """
+        Store a notification for each channel, without blocking the caller.
+
+        Returns:
+            Future resolving to {channel: row id}
+        """
+        return asyncio.get_running_loop().run_in_executor(self._executor, self._add, channels, message, state, priority)
+
+    async def remove(self, ids: List[int]) -> None:
+        """Delete delivered rows."""
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._remove, ids)
+
+    async def reschedule(self, ids: List[int]) -> int:
+        """
+        Schedule failed rows for another attempt.
+
+        Returns:
+            Number of rows given up on because they exceeded max_age
+        """
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._reschedule, ids)
+
+    async def due(self, until: Optional[float] = None, exclude: Iterable[int] = ()) -> List[OutboxRow]:
+        """
+        Rows whose next attempt is due.
+
+        Args:
+            until: Time limit (defaults to now; use float("inf") to get everything)
+            exclude: Row ids already queued in memory
+
+        Returns:
+            List of (id, channel, message, state, priority, created, attempts)
+        """
+        until = time.time() if until is None else until
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._due, until, list(exclude))
+
+    async def pending(self) -> int:
+        """Number of notifications not yet delivered."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._pending)
+
+    async def close(self) -> None:
+        """Close the database."""
+        if self._conn is not None:
+            await asyncio.get_running_loop().run_in_executor(self._executor, self._conn.close)
+            self._conn = None
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,99 @@
+import logging
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Tuple
+
+# Event types carried by every notification
+EVENT_BALANCE_CHANGE = "balance_change"
+EVENT_STAKE_ACTION = "stake_action"
+EVENT_NODE_HEALTH = "node_health"
+EVENT_ERROR = "error"
+EVENT_STATUS = "status"
+EVENT_TYPES = (EVENT_BALANCE_CHANGE, EVENT_STAKE_ACTION, EVENT_NODE_HEALTH, EVENT_ERROR, EVENT_STATUS)
+
+# Severities
+SEVERITY_INFO = "info"
+SEVERITY_WARNING = "warning"
+SEVERITY_ERROR = "error"
+SEVERITY_CRITICAL = "critical"
+SEVERITIES = (SEVERITY_INFO, SEVERITY_WARNING, SEVERITY_ERROR, SEVERITY_CRITICAL)
+
+
+class NotificationRouter:
+    """
+    Maps (event type, severity) to the channels a notification goes to.
+
+    Rules come from the NOTIFICATIONS `routes` config and are compiled once into a lookup
+    table, so routing an event is a single dict lookup. Rules are checked in order and the
+    first one matching an event decides its channels; events no rule matches go to the
+    default channels (every built-in channel, unless `default_channels` is set).
+
+    Example rule:
+        {"types": ["balance_change"], "severities": ["info"], "channels": ["balances_discord"]}
+    Omitting `types` or `severities` matches all of them; an empty `channels` list mutes the event.
+    """
+
+    def __init__(
+        self,
+        rules: Optional[Iterable[Dict[str, Any]]],
+        channel_names: Iterable[str],
+        default_channels: Optional[Iterable[str]] = None
+    ):
+        """
+        Compile the routing table.
+
+        Args:
+            rules: Routing rules from the configuration
+            channel_names: Names of all configured channels
+            default_channels: Channels for events no rule matches (all channels if None)
+        """
+        self.channel_names = tuple(channel_names)
+        self.default: Tuple[str, ...] = self._known(
+            default_channels if default_channels is not None else self.channel_names, "default_channels"
+        )
+        self._table: Dict[Tuple[str, str], Tuple[str, ...]] = self._compile(rules or [])
+
+    def _known(self, names: Iterable[str], where: str) -> Tuple[str, ...]:
+        """Keep the channel names that exist, warning about the rest."""
+        known = []
+        for name in names or ():
+            if name in self.channel_names:
+                if name not in known:
+                    known.append(name)
+            else:
+                logging.error(f"Notification routing: unknown channel '{name}' in {where}, ignored.")
+        return tuple(known)
+
+    @staticmethod
+    def _values(rule: Dict[str, Any], key: str, allowed: Tuple[str, ...]) -> FrozenSet[str]:
+        values = rule.get(key)
+        if values is None:
+            return frozenset(allowed)
+        if isinstance(values, str):
+            values = [values]
+        unknown = [value for value in values if value not in allowed]
+        if unknown:
+            logging.error(f"Notification routing: unknown {key} {unknown}, ignored.")
+        return frozenset(value for value in values if value in allowed)
+
+    def _compile(self, rules: Iterable[Dict[str, Any]]) -> Dict[Tuple[str, str], Tuple[str, ...]]:
+        table: Dict[Tuple[str, str], Tuple[str, ...]] = {}
+        for index, rule in enumerate(rules):
+            types = self._values(rule, "types", EVENT_TYPES)
+            severities = self._values(rule, "severities", SEVERITIES)
+            channels = self._known(rule.get("channels", []), f"route {index + 1}")
+            for event in types:
+                for severity in severities:
+                    table.setdefault((event, severity), channels)
+        return table
+
+    def route(self, event: str, severity: str) -> Tuple[str, ...]:
+        """
+        Channels an event should be sent to.
+
+        Args:
+            event: One of EVENT_TYPES
+            severity: One of SEVERITIES
+
+        Returns:
+            Channel names (empty if the event is muted)
+        """
+        return self._table.get((event, severity), self.default)
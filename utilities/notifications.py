@@ -1,9 +1,189 @@
-import requests
-import logging
+import asyncio
+import functools
 import json
+import logging
+import re
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional
+
+import aiohttp
+
+from utilities.token_bucket import TokenBucket
+from utilities.metrics import REGISTRY, COUNTER, GAUGE
+from utilities.notification_outbox import NotificationOutbox
+from utilities.notification_router import NotificationRouter, EVENT_STATUS, SEVERITY_INFO
+from utilities.state_snapshot import (
+    StateSnapshot, CONTENT_TYPES, FORMAT_JSON, encode, state_delta, usable_format
+)
+
+PUSHBULLET_URL = "https://api.pushbullet.com/v2/pushes"
+TELEGRAM_URL = "https://api.telegram.org/bot{token}/sendMessage"
+PUSHOVER_URL = "https://api.pushover.net/1/messages.json"
+
+SEPARATOR = "=" * 44
+
+# Priority classes: high goes out as soon as the provider allows; normal is deduplicated
+# and bursts are coalesced into one digest message
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+
+# Provider rate limits (messages per minute) and message size limits, by channel kind
+CHANNEL_RATE_LIMITS = {
+    "discord": 30,
+    "pushbullet": 30,
+    "telegram": 20,
+    "pushover": 10,
+    "webhook": 60,
+    "slack": 60,
+}
+CHANNEL_MAX_LENGTH = {
+    "discord": 2000,
+    "telegram": 4096,
+    "pushover": 1024,
+}
+DEFAULT_RETRY_AFTER = 30  # Seconds to back off after a 429 without a usable Retry-After
+RETRY_INTERVAL = 5        # Seconds between checks of the outbox for deliveries due a retry
+
+# Delivery outcomes
+DELIVERED = "delivered"
+FAILED = "failed"
+RATE_LIMITED = "rate_limited"
+
+# Time each provider takes to accept a notification, by channel and outcome
+SEND_SECONDS = REGISTRY.histogram(
+    "duskman_notification_send_seconds", "Duration of notification deliveries", ("channel", "outcome")
+)
+
+# Leading "YYYY-MM-DD HH:MM - " of log lines, ignored when comparing messages for duplicates
+TIMESTAMP_PREFIX = re.compile(r"^\s*\d{4}-\d{2}-\d{2} \d{2}:\d{2} - ")
+
+
+def retry_after(headers, default=DEFAULT_RETRY_AFTER):
+    """
+    Seconds to wait from a 429 response's Retry-After header (delay in seconds or an HTTP date).
+
+    Args:
+        headers: Response headers.
+        default (float): Used when the header is missing or unreadable.
+
+    Returns:
+        float: Seconds to wait.
+    """
+    value = (headers or {}).get("Retry-After")
+    if not value:
+        return default
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0)
+    except (TypeError, ValueError):
+        return default
+
+
+class Notification:
+    """
+    A queued notification: the message, its priority, the shared state at the time for the
+    webhook, and (with an outbox) a future resolving to its outbox row id per channel.
+
+    The state is carried as JSON text (what the outbox stores) and, when queued from a live
+    state, as the cached StateSnapshot view and its other encodings, so webhooks never have
+    to parse and re-encode it.
+    """
+    __slots__ = ("message", "state", "priority", "created", "stored", "view", "encoded")
+
+    def __init__(self, message, state=None, priority=PRIORITY_HIGH, created=None, stored=None, view=None, encoded=None):
+        self.message = message
+        self.state = state
+        self.priority = priority
+        self.created = created if created is not None else time.monotonic()
+        self.stored = stored
+        self.view = view
+        self.encoded = encoded or {}
+
+    async def outbox_id(self, channel_name):
+        """Outbox row id for a channel, or None if it isn't stored."""
+        if self.stored is None:
+            return None
+        try:
+            ids = await self.stored
+        except Exception:
+            return None
+        return ids.get(channel_name)
+
+
+class NotificationChannel:
+    """
+    One configured destination with its own queue and worker, so a slow or failing
+    service never delays the others.
+    """
+
+    def __init__(self, name, send, timeout=10, max_queue=1000, rate_per_minute=None, burst=5, kind=None):
+        """
+        Args:
+            name (str): Channel name, e.g. "Discord".
+            send (callable): async send(session, notification), raising on failure.
+            kind (str): Service type ("discord", "telegram", ...) for its limits; defaults to the name.
+            timeout (float): Seconds a single delivery may take.
+            max_queue (int): Notifications that may wait before new ones are dropped.
+            rate_per_minute (float): Messages per minute (provider default if None).
+            burst (int): Messages that may be sent back to back.
+        """
+        self.name = name
+        self.send = send
+        self.timeout = timeout
+        self.queue: asyncio.PriorityQueue = asyncio.PriorityQueue(max_queue)
+        self.kind = (kind or name).lower()
+        self.max_length = CHANNEL_MAX_LENGTH.get(self.kind)
+        self.bucket = TokenBucket((rate_per_minute or CHANNEL_RATE_LIMITS.get(self.kind, 30)) / 60, burst)
+        self.blocked_until = 0.0
+        self._seq = 0
+
+        # Metrics
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.rate_limited = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self.total_latency = 0.0
+
+    def metrics(self):
+        """Queue depth, delivery counts and latency (seconds from notify() to delivered)."""
+        return {
+            "queue_depth": self.queue.qsize(),
+            "sent": self.sent,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "rate_limited": self.rate_limited,
+            "last_latency": self.last_latency,
+            "max_latency": self.max_latency,
+            "avg_latency": self.total_latency / self.sent if self.sent else 0.0,
+        }
+
+    def put(self, notification):
+        """Queue a notification, highest priority (then oldest) first. Raises asyncio.QueueFull."""
+        self._seq += 1
+        self.queue.put_nowait((notification.priority, self._seq, notification))
+
+    def ready_in(self):
+        """Seconds until this channel may send again (provider back-off and rate limit)."""
+        return max(self.blocked_until - time.monotonic(), self.bucket.delay(), 0)
+
+    def block_for(self, seconds):
+        """Stop sending for a while after the provider rate limited us (429)."""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.bucket.drain()
+
 
 class NotificationService:
-    def __init__(self, config, sharedinfo=None):
+    def __init__(self, config, sharedinfo=None, timeout=10, limit_per_host=2, max_queue=1000, api_urls=None,
+                 snapshot=None):
         """
         Initialize the notification service with configuration.
 
@@ -16,6 +196,27 @@ class NotificationService:
                 - pushover_user_key (str): Pushover user key.
                 - pushover_app_token (str): Pushover app token.
                 - slack_webhook (str): Slack webhook URL.
+                - webhook_delta (bool): Send the webhook only what changed since its last delivery.
+                - webhook_format (str): Webhook body encoding, "json" or "msgpack".
+                - notify_timeout (float): Seconds a single delivery may take.
+                - notify_rate_per_minute (float): Messages per minute per channel (provider defaults if unset).
+                - notify_burst (int): Messages a channel may send back to back.
+                - notify_dedup_window (float): Seconds identical normal-priority messages are suppressed.
+                - notify_coalesce_window (float): Seconds normal-priority bursts are collected into one digest.
+                - notify_outbox_file (str): SQLite outbox for retries and restarts (blank disables).
+                - notify_retry_max_age (float): Seconds a failing notification is retried before it is dropped.
+                - channels (dict): Extra named channels with their own destination, e.g.
+                  {"balances": {"type": "discord", "webhook": "https://..."}}. Types: discord,
+                  slack, webhook (key "webhook"/"url", optional "delta" and "format"), telegram
+                  ("bot_token", "chat_id").
+                - routes (list): Routing rules, see NotificationRouter.
+                - default_channels (list): Channels for events no route matches (built-in ones if unset).
+            timeout (float): Default per-delivery timeout.
+            limit_per_host (int): Concurrent connections allowed to any one host.
+            max_queue (int): Notifications each channel may have waiting.
+            api_urls (dict): Overrides for the Pushbullet/Telegram/Pushover API URLs.
+            snapshot (StateSnapshot): Serializer for the shared state sent to webhooks (one is
+                created for the state passed to notify() if not given).
         """
         self.discord_webhook = config.get('discord_webhook')
         self.pushbullet_token = config.get('pushbullet_token')
@@ -25,154 +226,502 @@ class NotificationService:
         self.pushover_app_token = config.get('pushover_app_token')
         self.webhook_url = config.get('webhook_url')
         self.slack_webhook = config.get('slack_webhook')
+        self.webhook_delta = config.get('webhook_delta', False)
+        self.webhook_format = usable_format(config.get('webhook_format'))
+        # Encodings (besides JSON) that full-snapshot webhooks need, captured when a notification is queued
+        self._encoded_formats = set()
+        if self.webhook_url and not self.webhook_delta and self.webhook_format != FORMAT_JSON:
+            self._encoded_formats.add(self.webhook_format)
+
+        self.snapshot = snapshot
+        self._webhook_views = {}  # webhook URL -> state view it last received (delta webhooks)
+
+        api_urls = api_urls or {}
+        self.pushbullet_url = api_urls.get('pushbullet', PUSHBULLET_URL)
+        self.telegram_url = api_urls.get('telegram', TELEGRAM_URL)
+        self.pushover_url = api_urls.get('pushover', PUSHOVER_URL)
 
-    def notify(self, message, shared_state=None):
-        """
-        Send notifications to all enabled services.
-        """
-        separator = "=" * 44
-        if self.discord_webhook:
-            self.send_discord_notification(message)
-            
-        if self.pushbullet_token:
-            self.send_pushbullet_notification(message.replace(separator, ''))
-            
-        if self.telegram_bot_token and self.telegram_chat_id:
-            self.send_telegram_notification(message.replace(separator, ''))
-            
-        if self.pushover_user_key and self.pushover_app_token:
-            self.send_pushover_notification(message.replace(separator, ''))
-        
-        if self.webhook_url:
-            self.send_shared_state_webhook(shared_state)
-        
-        if self.slack_webhook:
-            self.send_slack_notification(message.replace(separator, ''))
-
-    def send_shared_state_webhook(self, shared_state):
-        """
-        Sends the shared_state object as a JSON payload to the specified webhook URL.
+        self.limit_per_host = limit_per_host
+        self._session: Optional[aiohttp.ClientSession] = None
+
+        self.dedup_window = config.get('notify_dedup_window', 300)
+        self.coalesce_window = config.get('notify_coalesce_window', 5)
+        self._recent: Dict[str, List[float]] = {}  # dedup key -> [first sent, suppressed repeats]
+
+        # Durable outbox: notifications are stored before dispatch and removed once delivered
+        self.outbox = None
+        outbox_file = config.get('notify_outbox_file', 'duskman_outbox.db')
+        if outbox_file:
+            self.outbox = NotificationOutbox(outbox_file, max_age=config.get('notify_retry_max_age', 86400))
+        self._in_flight = set()  # outbox row ids currently queued in memory
+
+        timeout = config.get('notify_timeout', timeout)
+        rate_per_minute = config.get('notify_rate_per_minute')
+        burst = config.get('notify_burst', 5)
+        channel_specs = [
+            ("Discord", "discord", functools.partial(self.send_discord_notification, webhook=self.discord_webhook),
+                self.discord_webhook),
+            ("PushBullet", "pushbullet", self.send_pushbullet_notification, self.pushbullet_token),
+            ("Telegram", "telegram", functools.partial(
+                self.send_telegram_notification, bot_token=self.telegram_bot_token, chat_id=self.telegram_chat_id
+            ), self.telegram_bot_token and self.telegram_chat_id),
+            ("Pushover", "pushover", self.send_pushover_notification, self.pushover_user_key and self.pushover_app_token),
+            ("Webhook", "webhook", functools.partial(
+                self.send_shared_state_webhook, url=self.webhook_url, delta=self.webhook_delta, fmt=self.webhook_format
+            ), self.webhook_url),
+            ("Slack", "slack", functools.partial(self.send_slack_notification, webhook=self.slack_webhook),
+                self.slack_webhook),
+        ]
+        builtin = [name for name, _, _, enabled in channel_specs if enabled]
+        channel_specs.extend(self._extra_channels(config.get('channels') or {}))
+
+        self.channels: List[NotificationChannel] = [
+            NotificationChannel(name, send, timeout, max_queue, rate_per_minute, burst, kind)
+            for name, kind, send, enabled in channel_specs if enabled
+        ]
+        self._channels_by_name = {channel.name: channel for channel in self.channels}
+        self.router = NotificationRouter(
+            config.get('routes'),
+            self._channels_by_name,
+            builtin if config.get('default_channels') is None else config['default_channels']
+        )
+
+    def _extra_channels(self, channels):
+        """
+        Channel specs for the extra named channels in the config.
 
         Args:
-            shared_state (dict): The shared state object to send.
+            channels (dict): Channel name -> {"type": ..., destination keys}.
 
         Returns:
-            bool: True if the webhook was sent successfully, False otherwise.
+            list: (name, kind, send, enabled) tuples.
         """
-        try:
-            headers = {'Content-Type': 'application/json'}
-            payload = json.dumps(shared_state, indent=2)
-            
-            logging.debug(f"Sending shared state to webhook URL: {self.webhook_url}")
-            response = requests.post(self.webhook_url, headers=headers, data=payload)
-            
-            if response.status_code == 200:
-                logging.debug("Webhook sent successfully.")
-                return True
+        specs = []
+        for name, options in channels.items():
+            options = options or {}
+            kind = str(options.get('type', 'discord')).lower()
+            url = options.get('webhook') or options.get('url')
+            if kind == 'discord':
+                send = functools.partial(self.send_discord_notification, webhook=url)
+            elif kind == 'slack':
+                send = functools.partial(self.send_slack_notification, webhook=url)
+            elif kind == 'webhook':
+                delta, fmt = options.get('delta', False), usable_format(options.get('format'))
+                send = functools.partial(self.send_shared_state_webhook, url=url, delta=delta, fmt=fmt)
+                if url and not delta and fmt != FORMAT_JSON:
+                    self._encoded_formats.add(fmt)
+            elif kind == 'telegram':
+                url = options.get('bot_token') and options.get('chat_id')
+                send = functools.partial(
+                    self.send_telegram_notification, bot_token=options.get('bot_token'), chat_id=options.get('chat_id')
+                )
             else:
-                logging.error(f"Failed to send webhook. Status Code: {response.status_code}, Response: {response.text}")
-                return False
-        except Exception as e:
-            logging.error(f"Error sending webhook: {e}")
-            return False
+                logging.error(f"Notification channel '{name}': unsupported type '{kind}', ignored.")
+                continue
+            if not url:
+                logging.error(f"Notification channel '{name}': no destination configured, ignored.")
+                continue
+            specs.append((name, kind, send, True))
+        return specs
 
+    def notify(self, message, shared_state=None, priority=PRIORITY_HIGH, event=EVENT_STATUS, severity=SEVERITY_INFO, key=None):
+        """
+        Queue a notification for the channels its event routes to. Never blocks: delivery happens in run().
 
-    def send_shared_state_webhook(self,shared_state):
+        Args:
+            message (str): Message text.
+            shared_state (dict): State sent to the webhook.
+            priority (int): PRIORITY_HIGH goes out as soon as the provider allows. PRIORITY_NORMAL
+                repeats within the dedup window are suppressed (and counted), and bursts are
+                coalesced into one digest message.
+            event (str): Event type (see notification_router.EVENT_TYPES), used for routing.
+            severity (str): Severity (see notification_router.SEVERITIES), used for routing.
+            key (str): Identifies repeats of the same notification for deduplication, e.g.
+                "<event>:<action>". Defaults to the message text without its timestamp.
         """
-        Sends the shared_state object as a JSON payload to the specified webhook URL.
+        channels = [self._channels_by_name[name] for name in self.router.route(event, severity)]
+        if not channels:
+            return
+        if priority != PRIORITY_HIGH:
+            message = self._deduplicate(message, key)
+            if message is None:
+                return
+        state = view = encoded = None
+        if shared_state is not None and any(channel.kind == "webhook" for channel in channels):
+            snapshot = self._snapshot_for(shared_state)
+            state = snapshot.to_json()
+            view = snapshot.view()
+            encoded = {fmt: snapshot.encode(fmt) for fmt in self._encoded_formats}
+        notification = Notification(message, state, priority, view=view, encoded=encoded)
+        if self.outbox:
+            try:
+                notification.stored = self.outbox.add(
+                    [channel.name for channel in channels], message, notification.state, priority
+                )
+                notification.stored.add_done_callback(self._track_stored)
+            except RuntimeError as e:
+                logging.error(f"Notification outbox unavailable: {e}")
+        for channel in channels:
+            try:
+                channel.put(notification)
+            except asyncio.QueueFull:
+                channel.dropped += 1
+                if notification.stored is not None:
+                    # Still in the outbox: leave it to the retry loop
+                    notification.stored.add_done_callback(
+                        lambda future, name=channel.name: self._release_stored(future, name)
+                    )
+                logging.error(f"{channel.name} notification queue full, message deferred to the outbox.")
+
+    def _snapshot_for(self, shared_state):
+        """The snapshot serializer for a state, reusing (and caching by version) the current one."""
+        if self.snapshot is None or self.snapshot.shared_state is not shared_state:
+            self.snapshot = StateSnapshot(shared_state)
+        return self.snapshot
+
+    def _track_stored(self, future):
+        if not future.cancelled() and future.exception() is None:
+            self._in_flight.update(future.result().values())
+
+    def _release_stored(self, future, channel_name):
+        if not future.cancelled() and future.exception() is None:
+            self._in_flight.discard(future.result().get(channel_name))
+
+    def _deduplicate(self, message, key=None):
+        """
+        Suppress a message with the same key as one sent within the dedup window.
 
         Args:
-            shared_state (dict): The shared state object to send.
-            webhook_url (str): The destination webhook URL.
+            message (str): Message text.
+            key (str): Dedup key; the message without its timestamp if None. Messages that embed
+                changing numbers (durations, counts) need a stable key to be recognised as repeats.
 
         Returns:
-            bool: True if the webhook was sent successfully, False otherwise.
+            str: The message to send, noting how many repeats were suppressed, or None to drop it.
+        """
+        key = key if key is not None else TIMESTAMP_PREFIX.sub("", message)
+        now = time.monotonic()
+        recent = self._recent.get(key)
+        if recent is not None and now - recent[0] < self.dedup_window:
+            recent[1] += 1
+            return None
+
+        if recent is not None and recent[1]:
+            message += f"\n(repeated {int(recent[1])} more times in the previous {int(self.dedup_window)}s)"
+        self._recent[key] = [now, 0]
+
+        # Forget keys whose window has passed without repeats
+        if len(self._recent) > 1000:
+            self._recent = {
+                k: v for k, v in self._recent.items() if now - v[0] < self.dedup_window or v[1]
+            }
+        return message
+
+    def metrics(self):
+        """
+        Per-channel queue depth, delivery counts and latency.
+
+        Returns:
+            dict: Channel name -> metrics.
+        """
+        return {channel.name: channel.metrics() for channel in self.channels}
+
+    def register_metrics(self, registry=REGISTRY):
+        """
+        Export the per-channel delivery counts and queue depths, read from the channels when
+        metrics are collected.
+
+        Args:
+            registry (MetricsRegistry): Registry to add the metrics to.
+        """
+        def per_channel(key):
+            return lambda: {channel.name: getattr(channel, key) for channel in self.channels}
+
+        for key, help_text in (
+            ("sent", "Notifications delivered"),
+            ("failed", "Notification deliveries that failed"),
+            ("dropped", "Notifications dropped because the channel queue was full"),
+            ("coalesced", "Notifications merged into a digest message"),
+            ("rate_limited", "Deliveries refused by the provider's rate limit (429)"),
+        ):
+            registry.register_callback(
+                f"duskman_notifications_{key}_total", help_text, COUNTER, per_channel(key), ("channel",)
+            )
+        registry.register_callback(
+            "duskman_notification_queue_depth", "Notifications waiting to be sent", GAUGE,
+            lambda: {channel.name: channel.queue.qsize() for channel in self.channels}, ("channel",)
+        )
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit_per_host=self.limit_per_host),
+                raise_for_status=True
+            )
+        return self._session
+
+    def _digest(self, channel, batch):
+        """Combine a burst of notifications into one message that fits the channel."""
+        header = f"{len(batch)} notifications:"
+        parts = [header]
+        length = len(header)
+        for index, notification in enumerate(batch):
+            text = notification.message.replace(SEPARATOR, '').strip()
+            if channel.max_length and length + len(text) + 2 > channel.max_length - 40:
+                parts.append(f"... and {len(batch) - index} more")
+                break
+            parts.append(text)
+            length += len(text) + 2
+        return Notification(
+            "\n\n".join(parts),
+            batch[-1].state,
+            PRIORITY_NORMAL,
+            created=min(notification.created for notification in batch),
+            view=batch[-1].view,
+            encoded=batch[-1].encoded
+        )
+
+    async def _next_batch(self, channel):
+        """
+        Wait for the next thing to send: a single high-priority notification, or the normal-priority
+        notifications that arrive within the coalesce window (and while the channel is rate limited).
+        """
+        priority, _, notification = await channel.queue.get()
+        if priority == PRIORITY_HIGH:
+            return [notification]
+
+        batch = [notification]
+        deadline = time.monotonic() + max(self.coalesce_window, channel.ready_in())
+        while True:
+            remaining = max(deadline - time.monotonic(), channel.ready_in() if len(batch) > 1 else 0)
+            if remaining <= 0:
+                break
+            try:
+                priority, _, notification = await asyncio.wait_for(channel.queue.get(), remaining)
+            except asyncio.TimeoutError:
+                continue
+            if priority == PRIORITY_HIGH:
+                # Send what we have now so the high-priority one goes next
+                channel.queue.task_done()
+                channel.put(notification)
+                break
+            batch.append(notification)
+        return batch
+
+    async def _deliver(self, channel, notification):
+        """
+        Send one notification once the channel's rate limit allows it.
+
+        Returns:
+            str: DELIVERED, FAILED, or RATE_LIMITED (429: send it again once the channel allows).
+        """
+        while channel.ready_in() > 0:
+            await asyncio.sleep(channel.ready_in())
+        channel.bucket.try_acquire()
+
+        started = time.perf_counter()
+        outcome = await self._send(channel, notification)
+        SEND_SECONDS.labels(channel.name, outcome).observe(time.perf_counter() - started)
+        if outcome != DELIVERED:
+            return outcome
+
+        latency = time.monotonic() - notification.created
+        channel.sent += 1
+        channel.last_latency = latency
+        channel.max_latency = max(channel.max_latency, latency)
+        channel.total_latency += latency
+        logging.debug(f"{channel.name} notification sent successfully.")
+        return DELIVERED
+
+    async def _send(self, channel, notification):
+        """
+        Make one delivery attempt, counting failures and handling the provider's rate limit.
+
+        Returns:
+            str: DELIVERED, FAILED, or RATE_LIMITED.
         """
-        webhook_url = self.webhook_url
         try:
-            headers = {'Content-Type': 'application/json'}
-            payload = json.dumps(shared_state, indent=2)
-            
-            logging.debug(f"Sending shared state to webhook URL: {webhook_url}")
-            response = requests.post(webhook_url, headers=headers, data=payload)
-            
-            if response.status_code == 200:
-                logging.debug("Webhook sent successfully.")
-                return True
+            await asyncio.wait_for(channel.send(self._get_session(), notification), channel.timeout)
+        except asyncio.TimeoutError:
+            channel.failed += 1
+            logging.error(f"{channel.name} notification timed out after {channel.timeout}s.")
+            return FAILED
+        except aiohttp.ClientResponseError as e:
+            if e.status == 429:
+                wait = retry_after(e.headers)
+                channel.rate_limited += 1
+                channel.block_for(wait)
+                logging.warning(f"{channel.name} rate limited us, retrying in {wait:.0f}s.")
+                return RATE_LIMITED
+            channel.failed += 1
+            logging.error(f"Error sending {channel.name} notification: {e}")
+            return FAILED
+        except Exception as e:
+            channel.failed += 1
+            logging.error(f"Error sending {channel.name} notification: {e}")
+            return FAILED
+        return DELIVERED
+
+    async def _channel_worker(self, channel):
+        while True:
+            batch = await self._next_batch(channel)
+            try:
+                notification = batch[0] if len(batch) == 1 else self._digest(channel, batch)
+                outcome = await self._deliver(channel, notification)
+                if outcome == RATE_LIMITED:
+                    # Nothing is lost, the batch goes back on the queue
+                    for item in batch:
+                        try:
+                            channel.put(item)
+                        except asyncio.QueueFull:
+                            channel.dropped += 1
+                else:
+                    if outcome == DELIVERED:
+                        channel.coalesced += len(batch) - 1
+                    await self._settle(channel, batch, outcome)
+            finally:
+                for _ in batch:
+                    channel.queue.task_done()
+
+    async def _settle(self, channel, batch, outcome):
+        """Remove delivered notifications from the outbox, or schedule failed ones for a retry."""
+        if not self.outbox:
+            return
+        ids = [row_id for row_id in [await item.outbox_id(channel.name) for item in batch] if row_id is not None]
+        if not ids:
+            return
+        try:
+            if outcome == DELIVERED:
+                await self.outbox.remove(ids)
             else:
-                logging.error(f"Failed to send webhook. Status Code: {response.status_code}, Response: {response.text}")
-                return False
+                expired = await self.outbox.reschedule(ids)
+                if expired:
+                    logging.error(f"{channel.name}: giving up on {expired} notification(s) after repeated failures.")
         except Exception as e:
-            logging.error(f"Error sending webhook: {e}")
-            return False
+            logging.error(f"Notification outbox error: {e}")
+        finally:
+            self._in_flight.difference_update(ids)
+
+    async def _retry_loop(self):
+        """Queue outbox rows that are due a retry; the first pass re-sends everything left from the last run."""
+        channels = self._channels_by_name
+        until = float("inf")
+        while True:
+            try:
+                rows = await self.outbox.due(until)
+                for row_id, name, message, state, priority, created, attempts in rows:
+                    channel = channels.get(name)
+                    if channel is None or row_id in self._in_flight:
+                        continue
+                    stored = asyncio.get_running_loop().create_future()
+                    stored.set_result({name: row_id})
+                    try:
+                        channel.put(Notification(message, state, priority, stored=stored))
+                    except asyncio.QueueFull:
+                        continue
+                    self._in_flight.add(row_id)
+            except Exception as e:
+                logging.error(f"Notification outbox error: {e}")
+            until = None
+            await asyncio.sleep(RETRY_INTERVAL)
+
+    async def run(self):
+        """Deliver queued notifications: one worker per channel, all sharing one HTTP session."""
+        if not self.channels:
+            return
+        workers = [self._channel_worker(channel) for channel in self.channels]
+        if self.outbox:
+            workers.append(self._retry_loop())
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            await self.close()
 
-        
-    def send_discord_notification(self, message):
+    async def flush(self, timeout=10):
         """
-        Send a notification to Discord using a webhook.
+        Wait (up to timeout seconds) for every queued notification to be attempted.
         """
         try:
-            payload = {"content": message}
-            response = requests.post(self.discord_webhook, json=payload)
-            response.raise_for_status()
-            logging.debug("Discord notification sent successfully.")
-        except Exception as e:
-            logging.error(f"Error sending Discord notification: {e}")
+            await asyncio.wait_for(
+                asyncio.gather(*(channel.queue.join() for channel in self.channels)),
+                timeout
+            )
+        except asyncio.TimeoutError:
+            pass
 
-    def send_pushbullet_notification(self, message):
+    async def close(self):
+        """Close the shared HTTP session and the outbox. Undelivered notifications stay in the outbox."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        if self.outbox:
+            await self.outbox.close()
+
+    async def send_shared_state_webhook(self, session, notification, url, delta=False, fmt=FORMAT_JSON):
+        """
+        Sends the shared state (as it was when queued) to the webhook URL. Delta webhooks get
+        only the fields that changed since the last state they received (a full snapshot first).
+        """
+        if notification.state is None:
+            return
+        logging.debug(f"Sending shared state to webhook URL: {url}")
+        body = notification.state if fmt == FORMAT_JSON else notification.encoded.get(fmt)
+        view = None
+        if delta or body is None:
+            # Only notifications reloaded from the outbox lack the view and have to be parsed
+            view = notification.view if notification.view is not None else json.loads(notification.state)
+            body = encode(state_delta(self._webhook_views.get(url), view) if delta else view, fmt)
+        headers = {'Content-Type': CONTENT_TYPES.get(fmt, CONTENT_TYPES[FORMAT_JSON])}
+        async with session.post(url, headers=headers, data=body):
+            pass
+        if delta:
+            self._webhook_views[url] = view
+
+    async def send_discord_notification(self, session, notification, webhook):
+        """
+        Send a notification to Discord using a webhook.
+        """
+        payload = {"content": notification.message}
+        async with session.post(webhook, json=payload):
+            pass
+
+    async def send_pushbullet_notification(self, session, notification):
         """
         Send a notification to Pushbullet.
         """
-        try:
-            headers = {
-                'Access-Token': self.pushbullet_token,
-                'Content-Type': 'application/json'
-            }
-            message = message.replace('Dusk (', 'Dusk\n\t(')
-            payload = {"type": "note", "title": "Dusk Alert", "body": message}
-            response = requests.post("https://api.pushbullet.com/v2/pushes", json=payload, headers=headers)
-            response.raise_for_status()
-            logging.debug("Pushbullet notification sent successfully.")
-        except Exception as e:
-            logging.error(f"Error sending Pushbullet notification: {e}")
+        headers = {
+            'Access-Token': self.pushbullet_token,
+            'Content-Type': 'application/json'
+        }
+        message = notification.message.replace(SEPARATOR, '').replace('Dusk (', 'Dusk\n\t(')
+        payload = {"type": "note", "title": "Dusk Alert", "body": message}
+        async with session.post(self.pushbullet_url, json=payload, headers=headers):
+            pass
 
-    def send_telegram_notification(self, message):
+    async def send_telegram_notification(self, session, notification, bot_token, chat_id):
         """
         Send a notification to Telegram.
         """
-        try:
-            url = f"https://api.telegram.org/bot{self.telegram_bot_token}/sendMessage"
-            payload = {"chat_id": self.telegram_chat_id, "text": message}
-            response = requests.post(url, json=payload)
-            response.raise_for_status()
-            logging.debug("Telegram notification sent successfully.")
-        except Exception as e:
-            logging.error(f"Error sending Telegram notification: {e}")
+        url = self.telegram_url.format(token=bot_token)
+        payload = {"chat_id": chat_id, "text": notification.message.replace(SEPARATOR, '')}
+        async with session.post(url, json=payload):
+            pass
 
-    def send_pushover_notification(self, message):
+    async def send_pushover_notification(self, session, notification):
         """
         Send a notification to Pushover.
         """
-        try:
-            payload = {
-                "token": self.pushover_app_token,
-                "user": self.pushover_user_key,
-                "message": message
-            }
-            response = requests.post("https://api.pushover.net/1/messages.json", data=payload)
-            response.raise_for_status()
-            logging.debug("Pushover notification sent successfully.")
-        except Exception as e:
-            logging.error(f"Error sending Pushover notification: {e}")
+        payload = {
+            "token": self.pushover_app_token,
+            "user": self.pushover_user_key,
+            "message": notification.message.replace(SEPARATOR, '')
+        }
+        async with session.post(self.pushover_url, data=payload):
+            pass
 
-    def send_slack_notification(self, message):
+    async def send_slack_notification(self, session, notification, webhook):
         """
         Send a notification to Slack using a webhook.
         """
-        try:
-            payload = {"text": message}
-            response = requests.post(self.slack_webhook, json=payload)
-            response.raise_for_status()
-            logging.debug("Slack notification sent successfully.")
-        except Exception as e:
-            logging.error(f"Error sending Slack notification: {e}")
+        payload = {"text": notification.message.replace(SEPARATOR, '')}
+        async with session.post(webhook, json=payload):
+            pass
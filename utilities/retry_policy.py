@@ -0,0 +1,236 @@
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from utilities.utils import remove_ansi
+from utilities.notification_router import EVENT_NODE_HEALTH
+
+# Error classes
+ERROR_CONNECTION = "connection"  # Node unreachable ('Connection to Rusk Failed', refused, timed out)
+ERROR_GARBAGE = "garbage"        # Terminal control output instead of a value (e.g. '\x1b[?25h')
+ERROR_PARSE = "parse"            # Output present but not in the expected format
+ERROR_COMMAND = "command"        # Command failed, timed out or produced no output
+
+# Error classes that count against an endpoint's circuit breaker
+ENDPOINT_ERRORS = (ERROR_CONNECTION, ERROR_COMMAND)
+
+CONNECTION_MARKERS = ("Connection to Rusk Failed", "Connection refused")
+
+
+def classify_output(output: Optional[str]) -> Optional[str]:
+    """
+    Classify raw command output.
+
+    Args:
+        output: Command output, or None if the command failed
+
+    Returns:
+        The error class, or None if the output looks usable
+    """
+    if output is None or (isinstance(output, str) and not output.strip()):
+        return ERROR_COMMAND
+    if not isinstance(output, str):
+        return None
+    if any(marker in output for marker in CONNECTION_MARKERS):
+        return ERROR_CONNECTION
+    if '\x1b[' in output and not remove_ansi(output).strip():
+        return ERROR_GARBAGE
+    return None
+
+
+def classify_error(error: BaseException, output: Optional[str] = None) -> str:
+    """
+    Classify an exception raised while fetching or parsing a value.
+
+    Args:
+        error: The exception that was raised
+        output: Raw output that was being parsed, if any
+
+    Returns:
+        The error class
+    """
+    if output is not None:
+        if isinstance(output, str) and any(marker in output for marker in CONNECTION_MARKERS):
+            return ERROR_CONNECTION
+        if isinstance(output, str) and '\x1b[' in output:
+            return ERROR_GARBAGE
+    if '\x1b[' in str(error):
+        return ERROR_GARBAGE
+    if isinstance(error, (ConnectionError, asyncio.TimeoutError)):
+        return ERROR_CONNECTION
+    if isinstance(error, (ValueError, TypeError, KeyError, IndexError)):
+        return ERROR_PARSE
+    return ERROR_COMMAND
+
+
+class CircuitBreaker:
+    """
+    Per-endpoint circuit breaker.
+    After failure_threshold consecutive endpoint failures the circuit opens and calls
+    are short-circuited until reset_timeout has passed; then a single probe is let
+    through, which closes the circuit on success or re-opens it on failure.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 60.0, log_action_func=None):
+        """
+        Initialize the circuit breaker.
+
+        Args:
+            name: Endpoint name used in log messages
+            failure_threshold: Consecutive failures before the circuit opens
+            reset_timeout: Seconds to wait before probing an open circuit
+            log_action_func: Function to call for logging
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.log_action = log_action_func or (lambda *args, **kwargs: None)
+        self.failures = 0
+        self.opened_at = 0.0
+        self._state = self.CLOSED
+
+    @property
+    def state(self) -> str:
+        """Current state, moving from open to half-open once the reset timeout passed."""
+        if self._state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+        return self._state
+
+    def allow(self) -> bool:
+        """True if a call may go through."""
+        state = self.state
+        if state == self.HALF_OPEN:
+            # Let exactly one probe through; it re-opens the circuit unless it succeeds
+            self._state = self.OPEN
+            self.opened_at = time.monotonic()
+            return True
+        return state == self.CLOSED
+
+    def record_success(self) -> None:
+        """Record a successful call."""
+        if self._state != self.CLOSED:
+            self.log_action(f"{self.name.capitalize()} recovered", "Resuming normal requests", "info", event=EVENT_NODE_HEALTH)
+        self._state = self.CLOSED
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        """Record an endpoint failure."""
+        self.failures += 1
+        if self._state == self.CLOSED and self.failures >= self.failure_threshold:
+            self.log_action(
+                f"{self.name.capitalize()} marked down",
+                f"{self.failures} consecutive failures; pausing requests for {self.reset_timeout:.0f}s",
+                "error",
+                event=EVENT_NODE_HEALTH
+            )
+        if self.failures >= self.failure_threshold:
+            self._state = self.OPEN
+            self.opened_at = time.monotonic()
+
+
+class RetryPolicy:
+    """
+    Retry policy with capped exponential backoff and jitter.
+    Errors are classified before deciding whether to retry, and endpoint failures
+    are reported to the circuit breaker guarding that endpoint.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        base_delay: float = 2.0,
+        max_delay: float = 30.0,
+        jitter: float = 0.5,
+        retry_on: Iterable[str] = (ERROR_CONNECTION, ERROR_GARBAGE, ERROR_PARSE, ERROR_COMMAND),
+        log_action_func=None
+    ):
+        """
+        Initialize the retry policy.
+
+        Args:
+            max_attempts: Total attempts including the first one
+            base_delay: Delay in seconds before the first retry
+            max_delay: Upper bound for any single delay
+            jitter: Fraction of the delay to randomize (0.5 means +/-50%)
+            retry_on: Error classes that are worth retrying
+            log_action_func: Function to call for logging
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.retry_on = frozenset(retry_on)
+        self.log_action = log_action_func or (lambda *args, **kwargs: None)
+
+    def delay(self, attempt: int) -> float:
+        """
+        Backoff delay after the given (1-based) failed attempt.
+        """
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return max(0.0, delay * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+    async def call(
+        self,
+        fetch: Callable[[], Awaitable[Any]],
+        parse: Optional[Callable[[Any], Any]] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        description: str = "command"
+    ) -> Any:
+        """
+        Fetch (and optionally parse) a value, retrying according to the policy.
+
+        Args:
+            fetch: Coroutine function returning raw output (None means the command failed)
+            parse: Function turning the raw output into a value; may raise on bad output
+            breaker: Circuit breaker of the endpoint being called
+            description: What is being fetched, for log messages
+
+        Returns:
+            The parsed value, or None if every attempt failed or the circuit is open
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            if breaker is not None and not breaker.allow():
+                self.log_action("Skipped request", f"{description}: {breaker.name} is marked down", "debug")
+                return None
+
+            output = None
+            try:
+                output = await fetch()
+                category = classify_output(output)
+                if category is None:
+                    value = parse(output) if parse else output
+                    if breaker is not None:
+                        breaker.record_success()
+                    return value
+                error = "no output" if not output else f"unexpected output {str(output)[:60]!r}"
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                category = classify_error(e, output)
+                error = str(e)
+
+            if breaker is not None and category in ENDPOINT_ERRORS:
+                breaker.record_failure()
+
+            if attempt < self.max_attempts and category in self.retry_on:
+                wait = self.delay(attempt)
+                self.log_action(
+                    f"Retrying {description}",
+                    f"Attempt {attempt}/{self.max_attempts} failed ({category}): {error} - retrying in {wait:.1f}s",
+                    "debug"
+                )
+                await asyncio.sleep(wait)
+                continue
+
+            self.log_action(
+                f"Failed to fetch {description}",
+                f"Gave up after {attempt} attempt(s) ({category}): {error}",
+                "error"
+            )
+            return None
+        return None
@@ -0,0 +1,123 @@
+import asyncio
+import json
+from typing import Optional, Dict, Any
+
+import aiohttp
+
+# Rusk HTTP endpoints (the same ones ruskquery wraps with curl)
+ENDPOINT_GRAPHQL = "/on/graphql/query"
+ENDPOINT_PEERS = "/on/network/peers_location"
+
+QUERY_BLOCK_HEIGHT = "query { block(height: -1) { header { height } } }"
+
+
+class NodeUnreachableError(Exception):
+    """Raised when the Rusk node HTTP endpoint cannot be reached."""
+
+
+class RuskNodeClient:
+    """
+    Async client for the Rusk node HTTP API.
+    Keeps a single pooled, keep-alive session for all node queries so that
+    block height and peer polling does not need to spawn any processes.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "http://127.0.0.1:8080",
+        timeout: float = 5.0,
+        connect_timeout: float = 2.0,
+        rusk_version: Optional[str] = None,
+        log_action_func=None
+    ):
+        """
+        Initialize the Rusk node client.
+
+        Args:
+            base_url: Base URL of the node HTTP endpoint
+            timeout: Total timeout in seconds for a single request
+            connect_timeout: Timeout in seconds for establishing a connection
+            rusk_version: Optional value for the Rusk-Version request header
+            log_action_func: Function to call for logging
+        """
+        self.base_url = base_url.rstrip("/")
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+        self.headers = {"Rusk-Version": rusk_version} if rusk_version else {}
+        self.log_action = log_action_func or (lambda *args, **kwargs: None)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=4, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+                headers=self.headers
+            )
+        return self._session
+
+    async def close(self) -> None:
+        """Close the underlying HTTP session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _post(self, path: str, data: Optional[str] = None) -> Any:
+        """
+        POST to a node endpoint and return the decoded JSON body.
+
+        Raises:
+            NodeUnreachableError: If the endpoint could not be reached or timed out
+            ValueError: If the node answered with an error or a non-JSON body
+        """
+        try:
+            async with self._get_session().post(self.base_url + path, data=data) as response:
+                body = await response.text()
+                if response.status != 200:
+                    raise ValueError(f"HTTP Status: {response.status}")
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            raise NodeUnreachableError(f"{self.base_url}{path}: {e or type(e).__name__}") from e
+
+        try:
+            return json.loads(body)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON from {path}: {body[:80]}") from e
+
+    async def get_block_height(self) -> Optional[int]:
+        """
+        Get the current block height from the node.
+
+        Returns:
+            Current block height as integer, or None if the response could not be parsed
+
+        Raises:
+            NodeUnreachableError: If the endpoint could not be reached
+        """
+        try:
+            data = await self._post(ENDPOINT_GRAPHQL, QUERY_BLOCK_HEIGHT)
+            return int(data["block"]["header"]["height"])
+        except NodeUnreachableError:
+            raise
+        except (ValueError, KeyError, TypeError) as e:
+            self.log_action("Invalid block height", f"Could not parse node response: {e}", "debug")
+            return None
+
+    async def get_peer_count(self) -> Optional[int]:
+        """
+        Get the current peer count from the node.
+
+        Returns:
+            Current peer count as integer, or None if the response could not be parsed
+
+        Raises:
+            NodeUnreachableError: If the endpoint could not be reached
+        """
+        try:
+            data = await self._post(ENDPOINT_PEERS)
+            return len(data)
+        except NodeUnreachableError:
+            raise
+        except (ValueError, TypeError) as e:
+            self.log_action("Invalid peer count", f"Could not parse node response: {e}", "debug")
+            return None
@@ -1,9 +1,16 @@
 import asyncio
+import math
+import time
 from datetime import datetime
 from typing import Dict, Any, Optional, Tuple, Callable
 
 from utilities.utils import format_float, calculate_rewards_per_epoch, calculate_downtime_loss
 from utilities.blockchain_client import BlockchainClient
+from utilities.block_time import BlockTimeEstimator, EPOCH_BLOCKS
+from utilities.log_history import CATEGORY_STATUS
+
+REPLAN_INTERVAL = 60   # Seconds between re-planning a block-targeted sleep
+BLOCK_TOLERANCE = 2    # Wake once we are within this many blocks of the target
 
 class StakeManager:
     """
@@ -16,7 +23,8 @@ class StakeManager:
         blockchain_client: BlockchainClient,
         shared_state: Dict[str, Any],
         config: Dict[str, Any],
-        log_action_func: Callable = None
+        log_action_func: Callable = None,
+        block_time: Optional[BlockTimeEstimator] = None
     ):
         """
         Initialize the stake manager.
@@ -26,8 +34,10 @@ class StakeManager:
             shared_state: Shared state dictionary
             config: Configuration dictionary
             log_action_func: Function to call for logging
+            block_time: Block time estimator used to schedule epoch wake-ups
         """
         self.blockchain = blockchain_client
+        self.block_time = block_time or BlockTimeEstimator()
         self.shared_state = shared_state
         self.config = config
         self.log_action = log_action_func or (lambda *args, **kwargs: None)
@@ -40,6 +50,38 @@ class StakeManager:
         self.auto_stake_rewards = config.get('auto_stake_rewards', False)
         self.auto_reclaim_full_restakes = config.get('auto_reclaim_full_restakes', False)
         
+        # Set to end the current sleep early (slash detected, manual request, ...)
+        self._wake_event = asyncio.Event()
+        self._wake_reason: Optional[str] = None
+        self._force_claim = False
+        self._target_block: Optional[int] = None
+        
+    def on_block(self, block_height: int) -> None:
+        """
+        Block event listener: ends a block-targeted sleep as soon as its target block arrives.
+        
+        Args:
+            block_height: Height of the newly accepted block
+        """
+        if self._target_block is not None and block_height >= self._target_block - BLOCK_TOLERANCE:
+            self._wake_event.set()
+        
+    def wake(self, reason: str = "External event") -> None:
+        """
+        End the current sleep early so stake info is re-evaluated immediately.
+        
+        Args:
+            reason: Why the stake manager is being woken up
+        """
+        self.log_action("Stake Loop Wake-up", reason, "debug")
+        self._wake_reason = reason
+        self._wake_event.set()
+        
+    def request_claim(self) -> None:
+        """Force a claim/stake of the current rewards on the next evaluation, ignoring thresholds."""
+        self._force_claim = True
+        self.wake("Manual claim requested")
+        
     def should_unstake_and_restake(self, reclaimable_slashed_stake: float, downtime_loss: float) -> bool:
         """
         Determine if unstaking/restaking is worthwhile.
@@ -70,47 +112,107 @@ class StakeManager:
                 (rewards >= self.min_rewards and 
                     rewards >= incremental_threshold))
         
-    async def sleep_with_feedback(self, seconds: int, message: str = "") -> None:
+    def _set_completion(self, seconds: float) -> None:
+        """Publish the deadline of the current sleep; consumers compute the remaining time from it."""
+        completion_time = datetime.fromtimestamp(time.time() + seconds)
+        self.shared_state["completion_time"] = completion_time.strftime("%H:%M:%S")
+        self.shared_state["completion_timestamp"] = int(completion_time.timestamp() * 1000)  # Milliseconds since epoch
+        
+    async def sleep_with_feedback(self, seconds: int, message: str = "", target_block: Optional[int] = None) -> bool:
         """
-        Sleep for the specified number of seconds, updating the shared state with remaining time.
+        Sleep until a deadline the specified number of seconds from now, publishing the deadline
+        in the shared state. The wait is a single cancellable wait that ends early if wake() is called.
+        When a target block is given, the deadline is re-planned from the block time estimator
+        as new height samples arrive, and the sleep ends once the target is reached.
         
         Args:
             seconds: Number of seconds to sleep
             message: Message to log
+            target_block: Block height this sleep is waiting for, if any
+            
+        Returns:
+            True if the sleep was ended early by wake(), False otherwise
         """
         # Validate the input seconds
         if seconds <= 0:
             self.log_action("Sleep Countdown", "Invalid sleep duration provided. Must be greater than 0.", "error")
-            return  # Exit the function early
+            return False  # Exit the function early
 
-        # Calculate the completion time as a timestamp
-        from datetime import datetime, timedelta
-        now = datetime.now()
-        completion_time = now + timedelta(seconds=seconds)
-        
-        # Store both the formatted time and the timestamp
-        self.shared_state["completion_time"] = completion_time.strftime("%H:%M:%S")
-        self.shared_state["completion_timestamp"] = int(completion_time.timestamp() * 1000)  # Milliseconds since epoch
-        self.shared_state["remain_time"] = seconds  # Initialize the countdown
+        self._set_completion(seconds)
+        deadline = time.monotonic() + seconds
+        self._target_block = target_block
         
         if message:
             self.log_action("Sleep Countdown", f"{message} ({seconds}s)", "debug")
         
+        woken = False
         try:
-            # Sleep in 1-second increments, updating the remain_time each second
-            while self.shared_state["remain_time"] > 0:
-                await asyncio.sleep(1)
-                self.shared_state["remain_time"] -= 1
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                
+                timeout = min(remaining, REPLAN_INTERVAL) if target_block is not None else remaining
+                try:
+                    await asyncio.wait_for(self._wake_event.wait(), timeout)
+                    woken = True
+                    break
+                except asyncio.TimeoutError:
+                    pass
+                
+                if target_block is not None:
+                    if self.shared_state["block_height"] >= target_block - BLOCK_TOLERANCE:
+                        break
+                    remaining = self.block_time.seconds_until(target_block, self.shared_state["block_height"])
+                    deadline = time.monotonic() + remaining
+                    self._set_completion(remaining)
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             self.log_action("Sleep Countdown", f"Error during sleep: {str(e)}", "error")
         finally:
-            self.log_action("Sleep Countdown", "Sleep Finished", "debug")
+            self._wake_event.clear()
+            self._target_block = None
+            self.log_action(
+                "Sleep Countdown",
+                f"Woken early: {self._wake_reason or 'target block reached'}" if woken else "Sleep Finished",
+                "debug"
+            )
+        return woken
+            
+    async def sleep_until_block(self, target_block: int, msg: str = "") -> None:
+        """
+        Sleep until the chain is within a few blocks of target_block, using the measured
+        block time. If blocks come slower than predicted the sleep is extended, but never by
+        more than a handful of blocks' worth, so a stalled node can't hold the loop forever.
+        
+        Args:
+            target_block: Block height to wake up at
+            msg: Message to log
+        """
+        give_up_at = None
+        while True:
+            current = self.shared_state["block_height"]
+            if current >= target_block - BLOCK_TOLERANCE:
+                return
+            
+            seconds = int(math.ceil(self.block_time.seconds_until(target_block, current)))
+            if give_up_at is None:
+                give_up_at = time.time() + seconds + 30 * self.block_time.block_time
+            elif time.time() >= give_up_at:
+                self.log_action("Sleep Countdown", f"Target block #{target_block} not reached (at #{current}); continuing", "debug")
+                return
+            
+            if await self.sleep_with_feedback(max(seconds, int(math.ceil(self.block_time.block_time))), msg, target_block):
+                return
+            msg = ""
 
     async def sleep_until_next_epoch(self, block_height: int, buffer_blocks: int = 60, msg: Optional[str] = None) -> None:
         """
         Sleep until near the end of the current epoch.
-        Each epoch is 2160 blocks, 10s each. Subtract buffer_blocks from remainder.
-        If result <= 0, do a minimal sleep of buffer blocks * 11.
+        Each epoch is 2160 blocks. Wakes buffer_blocks before the boundary, using the
+        measured block time to predict when that block will arrive.
+        If the target is already passed, do a minimal sleep of about 1.1 x buffer blocks.
         
         Args:
             block_height: Current block height
@@ -120,20 +222,14 @@ class StakeManager:
         if not msg:
             msg = "until closer to next epoch..."
 
-        blocks_left = 2160 - (block_height % 2160) - buffer_blocks
-        sleep_time = blocks_left * 10  # 10s per block
+        target_block = (block_height // EPOCH_BLOCKS + 1) * EPOCH_BLOCKS - buffer_blocks
 
-        if sleep_time <= 0:
-            sleep_time = buffer_blocks * 11
+        if target_block <= block_height:
+            target_block = block_height + int(math.ceil(buffer_blocks * 1.1))
             msg = "Epoch boundary reached; forcing minimal sleep."
 
-        # Validate the sleep time
-        if sleep_time <= 0:
-            self.log_action("Sleep Countdown", "Invalid sleep duration calculated. Must be greater than 0.", "error")
-            return  # Exit the function early
-
         try:
-            await self.sleep_with_feedback(sleep_time, msg)
+            await self.sleep_until_block(target_block, msg)
         except Exception as e:
             self.log_action("Sleep Countdown", f"Error during sleep until next epoch: {str(e)}", "error")
         
@@ -255,11 +351,7 @@ class StakeManager:
         )
         
         # Add to log entries
-        log_entries = self.shared_state.get("log_entries", [])
-        if len(log_entries) > 15:  # TODO: Make configurable
-            log_entries.pop(0)
-        log_entries.append(log_info)
-        self.shared_state["log_entries"] = log_entries
+        self.shared_state["log_entries"].append(log_info, CATEGORY_STATUS)
         
         # Notify
         from utilities.notifications import NotificationService
@@ -287,8 +379,9 @@ class StakeManager:
 
                 self.shared_state["block_height"] = block_height
 
-                # If we already saw 'No Action' for this block, wait a bit
-                if self.shared_state["last_no_action_block"] == block_height:
+                # If we already saw 'No Action' for this block, wait a bit (unless we were woken for a reason)
+                woken_reason, self._wake_reason = self._wake_reason, None
+                if self.shared_state["last_no_action_block"] == block_height and not woken_reason:
                     msg = f"Already did 'No Action' at block {block_height}; sleeping 30s."
                     stake_checking = False
                     await self.sleep_with_feedback(30, msg)
@@ -334,7 +427,7 @@ class StakeManager:
                         rewards_per_epoch = 0
                         self.shared_state["rewards_per_epoch"] = rewards_per_epoch
                         # Sleep 2 epochs
-                        await self.sleep_until_next_epoch(block_height + 2160, msg="2-epoch wait after restaking...")
+                        await self.sleep_until_next_epoch(block_height + EPOCH_BLOCKS, msg="2-epoch wait after restaking...")
                         continue
                     else:
                         stake_checking = False
@@ -342,8 +435,10 @@ class StakeManager:
                         await self.sleep_with_feedback(300, "waiting after failed unstake/restake")
                         continue
 
-                elif self.should_claim_and_stake(rewards_amount, incremental_threshold) and not first_run:
+                elif ((self.should_claim_and_stake(rewards_amount, incremental_threshold) and not first_run) or
+                      (self._force_claim and rewards_amount > 0)):
                     # Claim & Stake
+                    self._force_claim = False
                     success = await self.perform_claim_stake(
                         block_height, stake_amount, rewards_amount, reclaimable_slashed_stake
                     )
@@ -351,7 +446,7 @@ class StakeManager:
                     if success:
                         stake_checking = False
                         self.log_action("Stake Loop", "Finished staking, now sleeping.", "debug")
-                        await self.sleep_with_feedback(2160 * 10, "1 epoch wait after claiming")
+                        await self.sleep_until_block(block_height + EPOCH_BLOCKS, "1 epoch wait after claiming")
                         self.log_action("Stake Loop", "Woke up from sleep.", "debug")
                         rewards_per_epoch = 0
                         self.shared_state["rewards_per_epoch"] = rewards_per_epoch
@@ -363,6 +458,9 @@ class StakeManager:
                         continue
                 else:
                     # No action
+                    if self._force_claim:
+                        self._force_claim = False
+                        self.log_action("Manual Claim Skipped", f"No rewards to claim @ Block {block_height}", "info")
                     self.shared_state["last_no_action_block"] = block_height
                     self.shared_state["last_action_taken"] = f"No Action @ Block {block_height}"
                     
@@ -0,0 +1,359 @@
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional: faster, compact JSON
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional: binary encoding for API/webhook consumers that want it
+    msgpack = None
+
+# Encodings
+FORMAT_JSON = "json"
+FORMAT_MSGPACK = "msgpack"
+CONTENT_TYPES = {
+    FORMAT_JSON: "application/json",
+    FORMAT_MSGPACK: "application/msgpack",
+}
+
+_MISSING = object()
+
+
+class _NestedState(dict):
+    """A dict inside the shared state; changing it counts as a change to the whole state."""
+
+    def __init__(self, root: "SharedState", values: Dict[str, Any]):
+        super().__init__()
+        self._root = root
+        for key, value in values.items():
+            dict.__setitem__(self, key, _wrap(root, value))
+
+    def __setitem__(self, key, value):
+        _set(self, self._root, key, value)
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        self._root._changed()
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return dict.__getitem__(self, key)
+
+    def pop(self, key, *default):
+        if key in self:
+            self._root._changed()
+        return dict.pop(self, key, *default)
+
+    def popitem(self):
+        item = dict.popitem(self)
+        self._root._changed()
+        return item
+
+    def clear(self):
+        if self:
+            self._root._changed()
+        dict.clear(self)
+
+
+class SharedState(_NestedState):
+    """
+    The shared state dictionary, with a version number that increases whenever anything in
+    it changes (including nested dicts such as `balances` and new log entries). Snapshots are
+    cached by version, so serializing a state that hasn't changed costs nothing.
+    Assigning a value equal to the current one is not a change.
+    """
+
+    def __init__(self, values: Optional[Dict[str, Any]] = None):
+        self._changes = 0
+        super().__init__(self, values or {})
+
+    def _changed(self) -> None:
+        self._changes += 1
+
+    @property
+    def version(self) -> int:
+        """Current state version; new log entries count as changes too."""
+        log_entries = dict.get(self, "log_entries")
+        return self._changes + getattr(log_entries, "last_seq", 0)
+
+
+def _wrap(root: SharedState, value: Any) -> Any:
+    if isinstance(value, dict) and not isinstance(value, _NestedState):
+        return _NestedState(root, value)
+    return value
+
+
+def _set(target: dict, root: SharedState, key: Any, value: Any) -> None:
+    current = dict.get(target, key, _MISSING)
+    if current is value:
+        return
+    try:
+        if current is not _MISSING and current == value and (type(current) is type(value) or isinstance(value, dict)):
+            return
+    except Exception:  # values that can't be compared (e.g. arrays) are always a change
+        pass
+    dict.__setitem__(target, key, _wrap(root, value))
+    root._changed()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# SCHEMA
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _float(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    result = float(value)
+    return result if result == result and result not in (float("inf"), float("-inf")) else None
+
+
+def _int(value: Any) -> Optional[int]:
+    return None if value is None else int(value)
+
+
+def _text(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def _bool(value: Any) -> bool:
+    return bool(value)
+
+
+def _log_texts(value: Any) -> list:
+    return [str(text) for text in value] if value is not None else []
+
+
+# Fields in the published state and how each is converted to a JSON-safe value.
+# Anything not listed here (the notifier, internal bookkeeping) is never serialized.
+STATE_SCHEMA: Dict[str, Any] = {
+    "block_height": _int,
+    "peer_count": _int,
+    "block_time": _float,
+    "last_claim_block": _int,
+    "last_no_action_block": _int,
+    "last_action_taken": _text,
+    "completion_time": _text,
+    "completion_timestamp": _int,
+    "active_blk": _int,
+    "rewards_per_epoch": _float,
+    "errored": _bool,
+    "stake_info": {
+        "stake_amount": _float,
+        "reclaimable_slashed_stake": _float,
+        "rewards_amount": _float,
+    },
+    "balances": {
+        "public": _float,
+        "shielded": _float,
+    },
+    "price": _float,
+    "usd_24h_change": _float,
+    "price_change_24h": _float,
+    "price_change_percentage_1h_in_currency": _float,
+    "price_change_percentage_24h_in_currency": _float,
+    "price_change_percentage_7d_in_currency": _float,
+    "price_change_percentage_14d_in_currency": _float,
+    "price_change_percentage_30d_in_currency": _float,
+    "price_change_percentage_200d_in_currency": _float,
+    "price_change_percentage_1y_in_currency": _float,
+    "high_24h": _float,
+    "low_24h": _float,
+    "volume": _float,
+    "market_cap": _float,
+    "market_cap_rank": _int,
+    "market_cap_change_24h": _float,
+    "market_cap_change_percentage_24h": _float,
+    "fully_diluted_valuation": _float,
+    "circulating_supply": _float,
+    "total_supply": _float,
+    "max_supply": _float,
+    "ath": _float,
+    "ath_change_percentage": _float,
+    "ath_date": _text,
+    "atl": _float,
+    "atl_date": _text,
+    "last_updated": _text,
+    "rendered": _text,
+    "log_entries": _log_texts,
+}
+
+
+def _convert(schema: Dict[str, Any], values: Any) -> Dict[str, Any]:
+    """Build the JSON-safe view of `values`; missing fields are left out, unconvertible ones are None."""
+    view = {}
+    if not isinstance(values, dict):
+        return view
+    for key, convert in schema.items():
+        value = values.get(key, _MISSING)
+        if value is _MISSING:
+            continue
+        if isinstance(convert, dict):
+            view[key] = _convert(convert, value)
+            continue
+        try:
+            view[key] = convert(value)
+        except (TypeError, ValueError):
+            view[key] = None
+    return view
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# ENCODING
+# ─────────────────────────────────────────────────────────────────────────────
+
+def to_json(value: Any) -> str:
+    """Compact JSON text (orjson when installed)."""
+    if orjson is not None:
+        return orjson.dumps(value).decode("utf-8")
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def usable_format(fmt: Optional[str]) -> str:
+    """The requested encoding if it is available, otherwise FORMAT_JSON (logging why)."""
+    fmt = str(fmt or FORMAT_JSON).lower()
+    if fmt not in CONTENT_TYPES:
+        logging.error(f"Unknown state encoding '{fmt}', using JSON.")
+        return FORMAT_JSON
+    if fmt == FORMAT_MSGPACK and msgpack is None:
+        logging.error("msgpack encoding requested but the msgpack package is not installed, using JSON.")
+        return FORMAT_JSON
+    return fmt
+
+
+def encode(value: Any, fmt: str = FORMAT_JSON) -> bytes:
+    """
+    Encode a JSON-safe value.
+
+    Args:
+        value: View or delta to encode
+        fmt: FORMAT_JSON, or FORMAT_MSGPACK (needs the msgpack package)
+
+    Returns:
+        Encoded bytes
+    """
+    if fmt == FORMAT_MSGPACK:
+        if msgpack is None:
+            raise ValueError("msgpack encoding requested but the msgpack package is not installed")
+        return msgpack.packb(value, use_bin_type=True)
+    if orjson is not None:
+        return orjson.dumps(value)
+    return to_json(value).encode("utf-8")
+
+
+def state_delta(old: Optional[Dict[str, Any]], new: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Changes between two views. Top-level fields that changed are sent whole (so a change to
+    `balances` sends both balances). Without an old view the result is a full snapshot.
+
+    Args:
+        old: View the consumer already has (None if it has nothing)
+        new: Current view
+
+    Returns:
+        {"version", "base", "changes", "removed"}, or {"version", "full": True, "state"}
+    """
+    version = new.get("version")
+    if old is None:
+        return {"version": version, "full": True, "state": new}
+    changes = {
+        key: value for key, value in new.items()
+        if key != "version" and old.get(key, _MISSING) != value
+    }
+    removed = [key for key in old if key not in new]
+    return {"version": version, "base": old.get("version"), "changes": changes, "removed": removed}
+
+
+class StateSnapshot:
+    """
+    Schema-defined, JSON-safe snapshots of the shared state, cached by state version.
+    Views of a versioned state carry a "version" field, which delta consumers use as a cursor.
+
+    The view, its encodings and recent views (for deltas) are kept per version, so repeated
+    requests for an unchanged state return the cached result. With a plain dict (no version)
+    every call builds a fresh view.
+    """
+
+    def __init__(self, shared_state: Dict[str, Any], schema: Optional[Dict[str, Any]] = None, history: int = 32):
+        """
+        Initialize the snapshot layer.
+
+        Args:
+            shared_state: Shared state dictionary (ideally a SharedState)
+            schema: Fields to publish and their converters (STATE_SCHEMA by default)
+            history: Recent views kept for computing deltas
+        """
+        self.shared_state = shared_state
+        self.schema = schema or STATE_SCHEMA
+        self.history = max(int(history), 1)
+        self._views: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._encoded: Dict[Tuple[int, str], Any] = {}
+
+    @property
+    def version(self) -> Optional[int]:
+        """Version of the shared state, or None if it isn't versioned."""
+        return getattr(self.shared_state, "version", None)
+
+    def view(self) -> Dict[str, Any]:
+        """The JSON-safe view of the current state (do not modify it)."""
+        version = self.version
+        if version is None:
+            return _convert(self.schema, self.shared_state)
+        view = self._views.get(version)
+        if view is None:
+            view = _convert(self.schema, self.shared_state)
+            view["version"] = version
+            self._views[version] = view
+            while len(self._views) > self.history:
+                self._views.popitem(last=False)
+            self._encoded = {key: value for key, value in self._encoded.items() if key[0] == version}
+        return view
+
+    def _cached(self, fmt: str, build: Callable[[Dict[str, Any]], Any]) -> Any:
+        view = self.view()
+        version = self.version
+        if version is None:
+            return build(view)
+        key = (version, fmt)
+        if key not in self._encoded:
+            self._encoded[key] = build(view)
+        return self._encoded[key]
+
+    def to_json(self) -> str:
+        """The current view as compact JSON text."""
+        return self._cached("text", to_json)
+
+    def encode(self, fmt: str = FORMAT_JSON) -> bytes:
+        """
+        The current view, encoded.
+
+        Args:
+            fmt: FORMAT_JSON or FORMAT_MSGPACK
+
+        Returns:
+            Encoded bytes
+        """
+        return self._cached(fmt, lambda view: encode(view, fmt))
+
+    def delta(self, since: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Changes since a version the consumer already has. If that version is no longer
+        remembered (or not given) the result is a full snapshot.
+
+        Args:
+            since: Version the consumer has
+
+        Returns:
+            Delta payload, see state_delta()
+        """
+        new = self.view()
+        return state_delta(self._views.get(since) if since is not None else None, new)
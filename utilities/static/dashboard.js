@@ -0,0 +1,590 @@
+// Fingerprinted stylesheet URLs for each theme, set on the page by the server
+const THEME_CSS = {
+  dark: document.documentElement.dataset.darkCss,
+  light: document.documentElement.dataset.lightCss,
+};
+
+function applyTheme(isDark) {
+  const link = document.getElementById('theme-style');
+  const href = isDark ? THEME_CSS.dark : THEME_CSS.light;
+  if (link.getAttribute('href') !== href) {
+    link.setAttribute('href', href);
+  }
+  localStorage.setItem('duskmanIsDark', isDark);
+  // The server renders the page with the theme from this cookie, so reloads don't flash
+  document.cookie = `duskman_theme=${isDark ? 'dark' : 'light'}; path=/; max-age=31536000; SameSite=Lax`;
+  updateThemeButton(isDark);
+}
+
+function updateThemeButton(isDark) {
+  const btn = document.getElementById("theme-toggle");
+  // Only show icons (sun or moon), no text
+  btn.textContent = isDark ? "☀️" : "🌙";
+}
+
+function toggleTheme() {
+  const current = localStorage.getItem('duskmanIsDark') === 'true';
+  applyTheme(!current);
+  
+  // Update timer color when theme changes
+  const timerElements = document.querySelectorAll('.stat-label');
+  for (let i = 0; i < timerElements.length; i++) {
+    if (timerElements[i].textContent === 'Next Check:') {
+      const timerValueElement = timerElements[i].nextElementSibling;
+      if (timerValueElement) {
+        const timerSpan = timerValueElement.querySelector('span');
+        if (timerSpan) {
+          // Get the current timer text and update its color
+          const timeString = timerSpan.textContent;
+          const timerColor = getTimerColor(lastKnownRemainingSeconds);
+          timerSpan.style.color = timerColor;
+        }
+      }
+      break;
+    }
+  }
+}
+
+// On load, check stored preference or use the theme the page was rendered with (dark by default)
+(function initTheme() {
+  let stored = localStorage.getItem('duskmanIsDark');
+  if (stored === null) {
+    stored = document.documentElement.dataset.theme !== 'light' ? 'true' : 'false';
+    localStorage.setItem('duskmanIsDark', stored);
+  }
+  applyTheme(stored === 'true');
+})();
+document.getElementById('theme-toggle').addEventListener('click', toggleTheme);
+
+// Utility functions
+function formatNumber(num, decimals = 4) {
+  if (!num || isNaN(num)) return num;
+  return new Intl.NumberFormat().format(parseFloat(num).toFixed(decimals));
+}
+
+function formatUSD(num) {
+  if (num >= 1000000) {
+    return new Intl.NumberFormat('en-US', { 
+      style: 'currency', 
+      currency: 'USD',
+      maximumFractionDigits: 2,
+      minimumFractionDigits: 2
+    }).format(num / 1000000) + 'M';
+  }
+  return new Intl.NumberFormat('en-US', { 
+    style: 'currency', 
+    currency: 'USD' 
+  }).format(num);
+}
+
+function formatPercent(num) {
+  return parseFloat(num).toFixed(2) + '%';
+}
+
+function formatHMS(seconds) {
+  if (!seconds || isNaN(seconds)) return seconds;
+  const h = Math.floor(seconds / 3600);
+  const r = seconds % 3600;
+  const m = Math.floor(r / 60);
+  const s = r % 60;
+  const parts = [];
+  if (h > 0) parts.push(h + "h");
+  if (m > 0) parts.push(m + "m");
+  parts.push(s + "s");
+  return parts.join(" ");
+}
+
+function parseLogEntry(rawText) {
+  // Convert multiple blank lines into a single blank line:
+  rawText = rawText.replace(/\n\s*\n+/g, '\n\n').trim();
+
+  let lines = rawText.split(/\r?\n/).map(l => l.trim());
+
+  // Filter out lines that are entirely '====' or empty
+  lines = lines.filter(l => l && !/^=+$/.test(l));
+  if (!lines.length) {
+    return '<div class="log-entry-card"><h5>Empty Log</h5></div>';
+  }
+
+  let activityLine = lines.shift();
+  let activityTitle = activityLine
+    .replace(/^====\s*Activity\s*@/i, "")
+    .replace(/====$/, "")
+    .trim()
+    .replace(/^\d{4}-/, "");  // remove leading year
+
+  let blockNumber = null;
+  const filtered = [];
+  lines.forEach(l => {
+    if (l.toLowerCase().startsWith("current block")) {
+      const parts = l.split(":", 2);
+      if (parts.length === 2) {
+        blockNumber = parts[1].trim();
+      }
+    } else {
+      filtered.push(l);
+    }
+  });
+
+  const itemLines = filtered.filter(l => l.includes(":"));
+
+  let itemsHtml = "";
+  itemLines.forEach(line => {
+    const [label, val] = line.split(":", 2);
+    if (val !== undefined) {
+      itemsHtml += `<li><span class="label-col">${label.trim()}:</span><span class="value-col">${val.trim()}</span></li>`;
+    }
+  });
+  if (!itemsHtml) {
+    itemsHtml = "<li> </li>"; // itemsHtml = "<li>[No valid lines in this entry]</li>";
+  }
+
+  const heading = blockNumber
+    ? `Activity @ Block ${blockNumber} - ${activityTitle}`
+    : `Activity @ ${activityTitle}`;
+
+  // Single-line return to avoid accidental extra whitespace:
+  return `<div class="log-entry-card"><h5>${heading}</h5><ul>${itemsHtml}</ul></div>`;
+}
+
+
+
+// This runs in a separate thread and won't be affected by UI events
+const timerWorkerCode = `
+  let timerEndTime = Date.now();
+  let timerCompletionTime = "--:--";
+  
+  // Function to update the timer
+  function updateTimer() {
+    const now = Date.now();
+    const remainingMs = Math.max(0, timerEndTime - now);
+    const remainingSeconds = Math.ceil(remainingMs / 1000);
+    
+    // Send the updated timer value to the main thread
+    self.postMessage({
+      type: 'timerUpdate',
+      remainingSeconds: remainingSeconds,
+      completionTime: timerCompletionTime
+    });
+    
+    // Schedule the next update in 1 second
+    setTimeout(updateTimer, 1000);
+  }
+  
+  // Listen for messages from the main thread
+  self.onmessage = function(e) {
+    if (e.data.type === 'updateTimerValues') {
+      timerCompletionTime = e.data.completionTime;
+      timerEndTime = Date.now() + (e.data.remainTime * 1000);
+      
+      // Force an immediate update
+      updateTimer();
+    }
+  };
+  
+  // Start the timer
+  updateTimer();
+`;
+
+// Create a Blob containing the worker code
+const timerWorkerBlob = new Blob([timerWorkerCode], { type: 'application/javascript' });
+const timerWorkerUrl = URL.createObjectURL(timerWorkerBlob);
+
+// Create the worker
+const timerWorker = new Worker(timerWorkerUrl);
+
+// Store the last known remaining seconds
+let lastKnownRemainingSeconds = 0;
+
+// Listen for messages from the worker
+timerWorker.onmessage = function(e) {
+  if (e.data.type === 'timerUpdate') {
+    // Store the last known remaining seconds
+    lastKnownRemainingSeconds = e.data.remainingSeconds;
+    
+    // Update the timer display in the DOM
+    updateTimerDisplay(e.data.remainingSeconds, e.data.completionTime);
+  }
+};
+
+// Function to update timer values from server data
+function updateTimerValues(remainTime, completionTime) {
+  console.log("Updating timer values with new data at " + new Date().toISOString());
+  
+  // Send the updated values to the worker
+  timerWorker.postMessage({
+    type: 'updateTimerValues',
+    remainTime: remainTime,
+    completionTime: completionTime
+  });
+}
+
+// Function to determine timer color based on remaining time
+function getTimerColor(remainingSeconds) {
+  // Check if we're in dark mode
+  const isDarkMode = localStorage.getItem('duskmanIsDark') === 'true';
+  
+  if (remainingSeconds <= 3600) {
+    return '#f87171'; // RED - less than or equal to 1 hour
+  } else if (remainingSeconds <= 7200) {
+    return '#fbbf24'; // YELLOW - between 1-2 hours
+  } else if (remainingSeconds <= 10800) {
+    return '#34d399'; // GREEN - between 2-3 hours
+  } else {
+    // Different default color based on theme
+    return isDarkMode ? '#e0e0e0' : '#333333'; // LIGHT_WHITE or DARK_GRAY
+  }
+}
+
+// Function to update the timer display in the DOM
+function updateTimerDisplay(remainingSeconds, completionTime) {
+  const timeString = formatHMS(remainingSeconds);
+  const timerColor = getTimerColor(remainingSeconds);
+  
+  // Find the timer element
+  const timerElements = document.querySelectorAll('.stat-label');
+  for (let i = 0; i < timerElements.length; i++) {
+    if (timerElements[i].textContent === 'Next Check:') {
+      const timerValueElement = timerElements[i].nextElementSibling;
+      if (timerValueElement) {
+        timerValueElement.innerHTML = `<span style="color:${timerColor}">${timeString}</span> <span style="opacity:0.7">(${completionTime})</span>`;
+      }
+      break;
+    }
+  }
+}
+
+// Log entries received so far (newest first); only newer ones are fetched each time
+const MAX_LOG_ITEMS = 50;
+let logCursor = 0;
+let logItems = [];
+
+function mergeLogs(jsonData) {
+  if (jsonData.log_reset) {
+    logItems = [];
+  }
+  logItems = (jsonData.log_items || []).concat(logItems).slice(0, MAX_LOG_ITEMS);
+  logCursor = jsonData.log_cursor || 0;
+}
+
+function renderLogSection(title, items, emptyText) {
+  let html = `<h4>${title}</h4>`;
+  if (items.length === 0) {
+    html += `
+      <div class="log-entry-card">
+        <h5>${emptyText}</h5>
+      </div>
+    `;
+  } else {
+    items.forEach(item => {
+      html += parseLogEntry(item.text);
+    });
+  }
+  return html;
+}
+
+// Dashboard data as last received, its state version, and the server clock offset (ms)
+let dashData = null;
+let dashVersion = null;
+let dashServer = null;
+let clockOffset = 0;
+
+function remainingTime(d) {
+  if (!d.completion_timestamp) {
+    return 0;
+  }
+  return Math.max(0, Math.round((d.completion_timestamp - Date.now() - clockOffset) / 1000));
+}
+
+// Render the cards from the current dashboard data
+function renderDashboard(d) {
+  try {
+    // Update timer values
+    updateTimerValues(remainingTime(d), d.completion_time);
+
+    // Update stats card
+    const statsCard = document.getElementById('stats-card');
+    const timeString = formatHMS(0);
+    
+    // Create stats HTML
+    statsCard.innerHTML = `
+      <div class="card-section">
+        <h4>Node Status</h4>
+        <div class="stat-grid">
+          <div class="stat-label">Block Height:</div>
+          <div class="stat-value highlight-value">#${d.block_height} <span style="opacity:0.7">(Epoch: ${d.current_epoch})</span></div>
+          <div class="stat-label">Peer Count:</div>
+          <div class="stat-value">${d.peer_count}</div>
+          <div class="stat-label">Last Action:</div>
+          <div class="stat-value">${d.last_action}</div>
+          <div class="stat-label">Next Check:</div>
+          <div class="stat-value">${timeString} <span style="opacity:0.7">(${d.completion_time})</span></div>
+        </div>
+      </div>
+      
+      <div class="card-section">
+        <h4>Wallet Status</h4>
+        <div class="section-content">
+          <div class="stat-row tree-parent">
+            <div class="stat-label">Balance:</div>
+            <div class="stat-value highlight-value">${formatNumber(d.balances_total)} DUSK <span style="opacity:0.7">(${formatUSD(d.balances_total * d.price)})</span></div>
+          </div>
+          <div class="stat-row tree-item">
+            <div class="stat-label">Public:</div>
+            <div class="stat-value">${formatNumber(d.balances_public)} DUSK <span style="opacity:0.7">(${formatUSD(d.balances_public * d.price)})</span></div>
+          </div>
+          <div class="stat-row tree-item">
+            <div class="stat-label">Shielded:</div>
+            <div class="stat-value">${formatNumber(d.balances_shielded)} DUSK <span style="opacity:0.7">(${formatUSD(d.balances_shielded * d.price)})</span></div>
+          </div>
+        </div>
+      </div>
+      
+      <div class="card-section">
+        <h4>Staking Status</h4>
+        <div class="section-content">
+          <div class="stat-row">
+            <div class="stat-label">Staked Amount:</div>
+            <div class="stat-value highlight-value">${formatNumber(d.stake_info.stake_amount)} <span class="usd-value">(${formatUSD(d.stake_info.stake_amount * d.price)})</span></div>
+          </div>
+          ${d.active_block > d.block_height ? `
+          <div class="stat-row">
+            <div class="stat-label">Active From:</div>
+            <div class="stat-value">Block #${d.active_block} <span class="usd-value">(Epoch: ${Math.floor(d.active_block/2160)})</span></div>
+          </div>` : ''}
+          <div class="stat-row tree-parent">
+            <div class="stat-label">Rewards:</div>
+            <div class="stat-value highlight-value">${formatNumber(d.stake_info.rewards_amount)} <span class="usd-value">(${formatPercent(d.reward_percent)})</span></div>
+          </div>
+          ${d.rewards_per_epoch > 0 ? `
+          <div class="stat-row tree-item last-tree-item">
+            <div class="stat-label">Per Epoch:</div>
+            <div class="stat-value">${formatNumber(d.rewards_per_epoch)}</div>
+          </div>` : ''}
+          <div class="stat-row">
+            <div class="stat-label">Reclaimable:</div>
+            <div class="stat-value">${formatNumber(d.stake_info.reclaimable_slashed_stake)} <span class="usd-value">(${formatUSD(d.stake_info.reclaimable_slashed_stake * d.price)})</span></div>
+          </div>
+        </div>
+      </div>
+    `;
+    
+    // Update market data card
+    const marketCard = document.getElementById('market-data');
+    marketCard.innerHTML = `
+      <div class="card-section">
+        <div class="section-content">
+          <div class="stat-row">
+            <div class="stat-label">Price:</div>
+            <div class="stat-value highlight-value">${formatUSD(d.price)} 
+              <span class="${d.usd_24h_change >= 0 ? 'positive-change' : 'negative-change'}">(${formatPercent(d.usd_24h_change)} 24h)</span>
+            </div>
+          </div>
+          
+          <div class="stat-compact">
+            <div class="stat-label">Price Change:</div>
+            <div class="stat-value">
+              <span class="${d.price_change_7d >= 0 ? 'positive-change' : 'negative-change'}">7d: ${formatPercent(d.price_change_7d)}</span> | 
+              <span class="${d.price_change_30d >= 0 ? 'positive-change' : 'negative-change'}">30d: ${formatPercent(d.price_change_30d)}</span> | 
+              <span class="${d.price_change_1y >= 0 ? 'positive-change' : 'negative-change'}">1y: ${formatPercent(d.price_change_1y)}</span>
+            </div>
+          </div>
+          
+          <div class="stat-compact">
+            <div class="stat-value">
+              24h Volume: ${formatUSD(d.volume)} | Market Cap: ${formatUSD(d.market_cap)}
+              <span class="${d.market_cap_change_24h >= 0 ? 'positive-change' : 'negative-change'}">(${formatPercent(d.market_cap_change_24h)})</span>
+            </div>
+          </div>
+          
+          <div class="stat-compact">
+            <div class="stat-value">
+              ATH: ${formatUSD(d.ath)} 
+              <span class="${d.ath_change >= 0 ? 'positive-change' : 'negative-change'}">(${formatPercent(d.ath_change)})</span> | 
+              ATL: ${formatUSD(d.atl)}
+            </div>
+          </div>
+        </div>
+      </div>
+    `;
+
+    // Build logs: balance changes are shown separately from actions
+    const balanceLogs = logItems.filter(item => item.category === 'balance');
+    let logsHtml = renderLogSection('Recent Logs', logItems.filter(item => item.category !== 'balance'), 'No log entries yet');
+    if (balanceLogs.length > 0) {
+      logsHtml += renderLogSection('Balance Changes', balanceLogs, '');
+    }
+    document.getElementById('logs-card').innerHTML = logsHtml;
+
+  } catch (e) {
+    console.error("Render error:", e);
+  }
+}
+
+// Apply a pushed message: a full snapshot, or the fields changed since the version we have
+function applyMessage(msg) {
+  if (msg.type === 'delta') {
+    if (dashData === null || msg.base !== dashVersion) {
+      return false;  // out of step: reconnect for a full snapshot
+    }
+    Object.assign(dashData, msg.changes);
+    (msg.removed || []).forEach(key => delete dashData[key]);
+  } else {
+    dashData = msg.data;
+  }
+  dashVersion = msg.version;
+  dashServer = msg.server;
+  if (msg.now) {
+    clockOffset = msg.now - Date.now();
+  }
+  mergeLogs(msg);
+  renderDashboard(dashData);
+  return true;
+}
+
+// Fallback while the push connection is down: poll the JSON API
+const POLL_INTERVAL = 10000;
+let pollTimer = null;
+
+async function pollDashboard() {
+  try {
+    const response = await fetch(`/api/data?cursor=${logCursor}`);
+    if (!response.ok) {
+      console.error("Error fetching data:", response.statusText);
+      return;
+    }
+    const jsonData = await response.json();
+    const d = jsonData.data;
+    const serverDate = Date.parse(response.headers.get('Date'));
+    clockOffset = isNaN(serverDate) ? 0 : serverDate - Date.now();
+    dashData = d;
+    dashVersion = d.version;
+    mergeLogs(jsonData);
+    renderDashboard(dashData);
+  } catch (e) {
+    console.error("Fetch error:", e);
+  }
+}
+
+function startPolling() {
+  if (pollTimer === null) {
+    pollDashboard();
+    pollTimer = setInterval(pollDashboard, POLL_INTERVAL);
+  }
+}
+
+function stopPolling() {
+  if (pollTimer !== null) {
+    clearInterval(pollTimer);
+    pollTimer = null;
+  }
+}
+
+// Push updates over a WebSocket; reconnects resume from the version and log cursor we have
+let reconnectDelay = 1000;
+
+function connect() {
+  const proto = location.protocol === 'https:' ? 'wss' : 'ws';
+  let url = `${proto}://${location.host}/ws?cursor=${logCursor}`;
+  if (dashVersion !== null && dashVersion !== undefined && dashServer) {
+    url += `&since=${dashVersion}&server=${dashServer}`;
+  }
+  const ws = new WebSocket(url);
+  ws.onopen = () => {
+    reconnectDelay = 1000;
+    stopPolling();
+  };
+  ws.onmessage = event => {
+    if (!applyMessage(JSON.parse(event.data))) {
+      dashVersion = null;
+      ws.close();
+    }
+  };
+  ws.onclose = () => {
+    startPolling();
+    setTimeout(connect, reconnectDelay);
+    reconnectDelay = Math.min(reconnectDelay * 2, 30000);
+  };
+}
+
+if ('WebSocket' in window) {
+  connect();
+} else {
+  startPolling();
+}
+
+// History chart: min/max band and average line, downsampled on the server
+const CHART_WIDTH = 600;
+const CHART_HEIGHT = 160;
+const HISTORY_REFRESH = 60000;
+
+function formatChartValue(value) {
+  if (Math.abs(value) >= 1000) {
+    return new Intl.NumberFormat('en-US', { maximumFractionDigits: 0 }).format(value);
+  }
+  return parseFloat(value.toPrecision(4)).toString();
+}
+
+function formatChartTime(ts, range) {
+  const date = new Date(ts * 1000);
+  return range <= 86400
+    ? date.toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' })
+    : date.toLocaleDateString([], { month: 'short', day: 'numeric' });
+}
+
+function renderChart(points, from, to, range) {
+  if (!points.length) {
+    return '<div class="chart-empty">No history recorded for this range yet</div>';
+  }
+  let low = Math.min(...points.map(p => p[2]));
+  let high = Math.max(...points.map(p => p[3]));
+  if (high === low) {
+    high += 1;
+    low -= 1;
+  }
+  const x = ts => ((ts - from) / (to - from)) * CHART_WIDTH;
+  const y = value => CHART_HEIGHT - ((value - low) / (high - low)) * CHART_HEIGHT;
+  const line = points.map(p => `${x(p[0]).toFixed(1)},${y(p[1]).toFixed(1)}`).join(' ');
+  const band = points.map(p => `${x(p[0]).toFixed(1)},${y(p[3]).toFixed(1)}`)
+    .concat(points.slice().reverse().map(p => `${x(p[0]).toFixed(1)},${y(p[2]).toFixed(1)}`))
+    .join(' ');
+  return `
+    <svg class="chart-svg" viewBox="0 0 ${CHART_WIDTH} ${CHART_HEIGHT}" preserveAspectRatio="none">
+      <polygon class="chart-band" points="${band}"></polygon>
+      <polyline class="chart-line" points="${line}"></polyline>
+    </svg>
+    <div class="chart-axis">
+      <span>${formatChartTime(from, range)}</span>
+      <span>Low ${formatChartValue(low)} / High ${formatChartValue(high)}</span>
+      <span>${formatChartTime(to, range)}</span>
+    </div>
+  `;
+}
+
+async function loadHistory() {
+  const card = document.getElementById('history-card');
+  const metric = document.getElementById('history-metric').value;
+  const range = parseInt(document.getElementById('history-range').value, 10);
+  const to = Math.floor(Date.now() / 1000 + clockOffset / 1000);
+  const from = to - range;
+  try {
+    const response = await fetch(`/api/history?metric=${metric}&from=${from}&to=${to}&points=${CHART_WIDTH / 2}&method=minmax`);
+    if (response.status === 404) {
+      card.style.display = 'none';  // history is disabled on the server
+      return;
+    }
+    if (!response.ok) {
+      console.error("Error fetching history:", response.statusText);
+      return;
+    }
+    const history = await response.json();
+    document.getElementById('history-chart').innerHTML = renderChart(history.points, from, to, range);
+  } catch (e) {
+    console.error("History fetch error:", e);
+  }
+}
+
+document.getElementById('history-metric').addEventListener('change', loadHistory);
+document.getElementById('history-range').addEventListener('change', loadHistory);
+loadHistory();
+setInterval(loadHistory, HISTORY_REFRESH);
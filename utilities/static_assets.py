@@ -0,0 +1,169 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+try:
+    import brotli
+except ImportError:  # optional: smaller responses for browsers that accept br
+    brotli = None
+
+MIN_COMPRESS_SIZE = 512  # Bytes below which responses are sent uncompressed
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)  # Preferred first
+
+
+def accepted_encodings(accept_encoding: str) -> List[str]:
+    """
+    Content encodings the client accepts that we can produce, best first ("br" only if brotli is installed).
+
+    Args:
+        accept_encoding: The request's Accept-Encoding header
+
+    Returns:
+        Encoding names (empty for identity only)
+    """
+    accepted = set()
+    for part in (accept_encoding or "").lower().split(","):
+        name, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(name.strip())
+    return [encoding for encoding in ENCODINGS if encoding in accepted]
+
+
+def accepted_encoding(accept_encoding: str) -> Optional[str]:
+    """Best content encoding the client accepts, or None for identity."""
+    encodings = accepted_encodings(accept_encoding)
+    return encodings[0] if encodings else None
+
+
+def compress(body: bytes, encoding: Optional[str], best: bool = False) -> bytes:
+    """
+    Compress a response body with the given content encoding (None leaves it as is).
+
+    Args:
+        body: Uncompressed body
+        encoding: "br", "gzip" or None
+        best: Maximum compression, for content compressed once and served many times
+
+    Returns:
+        Encoded body
+    """
+    if encoding == "br":
+        return brotli.compress(body, quality=11 if best else 5)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=9 if best else 6, mtime=0)
+    return body
+
+
+def not_modified(request: web.Request, etag: str) -> bool:
+    """Whether the request's If-None-Match already names this ETag."""
+    if_none_match = request.headers.get("If-None-Match", "")
+    return if_none_match.strip() == "*" or etag in (tag.strip() for tag in if_none_match.split(","))
+
+
+class Asset:
+    """
+    A response body kept in memory with its content hash (the ETag) and precompressed variants.
+    """
+    __slots__ = ("body", "content_type", "digest", "etag", "variants")
+
+    def __init__(self, body: bytes, content_type: str):
+        """
+        Hash and precompress a body.
+
+        Args:
+            body: Uncompressed content
+            content_type: MIME type (with charset for text)
+        """
+        self.body = body
+        self.content_type = content_type
+        self.digest = hashlib.sha256(body).hexdigest()[:16]
+        self.etag = f'W/"{self.digest}"'
+        self.variants: Dict[Optional[str], bytes] = {None: body}
+        if len(body) >= MIN_COMPRESS_SIZE:
+            for encoding in ENCODINGS:
+                compressed = compress(body, encoding, best=True)
+                if len(compressed) < len(body):
+                    self.variants[encoding] = compressed
+
+    def response(self, request: web.Request, cache_control: str = REVALIDATE) -> web.Response:
+        """
+        Respond with the best variant the client accepts, or 304 if it already has this content.
+
+        Args:
+            request: The request being answered
+            cache_control: Cache-Control header value
+
+        Returns:
+            The response
+        """
+        headers = {"ETag": self.etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+        if not_modified(request, self.etag):
+            return web.Response(status=304, headers=headers)
+        encoding = next(
+            (name for name in accepted_encodings(request.headers.get("Accept-Encoding", "")) if name in self.variants),
+            None
+        )
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        headers["Content-Type"] = self.content_type
+        return web.Response(body=self.variants[encoding], headers=headers)
+
+
+def _content_type(name: str) -> str:
+    content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    if content_type.startswith("text/") or content_type in ("application/javascript", "application/json"):
+        content_type += "; charset=utf-8"
+    return content_type
+
+
+class StaticAssets:
+    """
+    The files of a static directory, loaded once, served from memory under fingerprinted names
+    (e.g. `dark.<hash>.css`) with long-lived cache headers and precompressed variants. A changed
+    file gets a new name, so browsers never need to revalidate a fingerprinted URL.
+    """
+
+    def __init__(self, directory: str, prefix: str = "/static/"):
+        """
+        Load the directory.
+
+        Args:
+            directory: Directory holding the assets
+            prefix: URL path the assets are served under
+        """
+        self.directory = directory
+        self.prefix = prefix
+        self._urls: Dict[str, str] = {}        # file name -> fingerprinted URL
+        self._assets: Dict[str, Asset] = {}    # fingerprinted or plain name -> asset
+        self._fingerprinted = set()
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            if not os.path.isfile(path):
+                continue
+            with open(path, "rb") as f:
+                asset = Asset(f.read(), _content_type(name))
+            stem, ext = os.path.splitext(name)
+            hashed = f"{stem}.{asset.digest}{ext}"
+            self._assets[name] = asset
+            self._assets[hashed] = asset
+            self._fingerprinted.add(hashed)
+            self._urls[name] = prefix + hashed
+
+    def url(self, name: str) -> str:
+        """Fingerprinted URL of a file in the directory."""
+        return self._urls[name]
+
+    async def handler(self, request: web.Request) -> web.Response:
+        """aiohttp handler for `<prefix>{name}`."""
+        name = request.match_info["name"]
+        asset = self._assets.get(name)
+        if asset is None:
+            raise web.HTTPNotFound()
+        return asset.response(request, IMMUTABLE if name in self._fingerprinted else REVALIDATE)
@@ -0,0 +1,315 @@
+import asyncio
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Retention tiers: raw samples are rolled up into 1 minute buckets, and those into 1 hour buckets
+TIER_RAW = "raw"
+TIER_MINUTE = "1m"
+TIER_HOUR = "1h"
+TIER_SECONDS = {TIER_MINUTE: 60, TIER_HOUR: 3600}
+
+# Metrics recorded by the monitor and the market data client
+METRICS = (
+    "block_height", "block_time", "peer_count",
+    "balance_public", "balance_shielded",
+    "stake_amount", "rewards_amount", "reclaimable_slashed_stake",
+    "price", "market_cap", "volume",
+)
+
+# Widest range each tier is used for when a query doesn't ask for a specific one
+RAW_QUERY_SPAN = 6 * 3600
+MINUTE_QUERY_SPAN = 7 * 86400
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples_raw (
+    metric TEXT NOT NULL,
+    ts REAL NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (metric, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS samples_1m (
+    metric TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    avg REAL NOT NULL,
+    min REAL NOT NULL,
+    max REAL NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (metric, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS samples_1h (
+    metric TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    avg REAL NOT NULL,
+    min REAL NOT NULL,
+    max REAL NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (metric, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup_state (
+    tier TEXT PRIMARY KEY,
+    watermark INTEGER NOT NULL
+);
+"""
+
+# A (timestamp, average, minimum, maximum) point; raw samples have avg == min == max
+Point = Tuple[float, float, float, float]
+
+
+class TimeSeriesStore:
+    """
+    Embedded SQLite (WAL) store for the numeric samples the monitor and market client produce.
+
+    Samples are buffered in memory and written in batches; completed minutes are rolled up
+    into 1 minute buckets and completed hours into 1 hour buckets, and each tier is trimmed
+    to its own retention, so the database stays bounded however long the process runs.
+    All database work happens on a single background thread.
+    """
+
+    def __init__(
+        self,
+        path: str = "duskman_history.db",
+        raw_retention: float = 2 * 86400,
+        minute_retention: float = 30 * 86400,
+        hour_retention: float = 5 * 365 * 86400,
+        flush_interval: float = 10,
+        max_buffer: int = 1000,
+        log_action_func: Callable = None
+    ):
+        """
+        Initialize the time-series store.
+
+        Args:
+            path: SQLite database file
+            raw_retention: Seconds raw samples are kept
+            minute_retention: Seconds 1 minute buckets are kept
+            hour_retention: Seconds 1 hour buckets are kept
+            flush_interval: Seconds between batched writes
+            max_buffer: Buffered samples that trigger an early write
+            log_action_func: Function to call for logging
+        """
+        self.path = path
+        self.retention = {
+            TIER_RAW: raw_retention,
+            TIER_MINUTE: minute_retention,
+            TIER_HOUR: hour_retention,
+        }
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.log_action = log_action_func or (lambda *args, **kwargs: None)
+
+        self._buffer: List[Tuple[str, float, float]] = []
+        self._flush_wanted = asyncio.Event()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="timeseries")
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def record(self, metric: str, value: Optional[float], ts: Optional[float] = None) -> None:
+        """
+        Buffer one sample. Non-numeric values are ignored.
+
+        Args:
+            metric: Metric name, e.g. "block_height" or "price"
+            value: Sample value
+            ts: Unix timestamp (defaults to now)
+        """
+        if value is None or isinstance(value, bool):
+            return
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return
+        self._buffer.append((metric, ts if ts is not None else time.time(), value))
+        if len(self._buffer) >= self.max_buffer:
+            self._flush_wanted.set()
+
+    def record_many(self, samples: Dict[str, Optional[float]], ts: Optional[float] = None) -> None:
+        """
+        Buffer several samples taken at the same time.
+
+        Args:
+            samples: Mapping of metric name to value
+            ts: Unix timestamp (defaults to now)
+        """
+        ts = ts if ts is not None else time.time()
+        for metric, value in samples.items():
+            self.record(metric, value, ts)
+
+    async def _in_thread(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _write(self, batch: List[Tuple[str, float, float]]) -> None:
+        conn = self._connect()
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO samples_raw (metric, ts, value) VALUES (?, ?, ?)", batch)
+
+    def _watermark(self, conn: sqlite3.Connection, tier: str) -> int:
+        row = conn.execute("SELECT watermark FROM rollup_state WHERE tier = ?", (tier,)).fetchone()
+        return row[0] if row else 0
+
+    def _maintain(self, now: float) -> None:
+        """Roll completed buckets up into the next tier, then apply retention to every tier."""
+        conn = self._connect()
+        with conn:
+            # raw -> 1m
+            start = self._watermark(conn, TIER_MINUTE)
+            end = int(now // 60) * 60
+            if end > start:
+                conn.execute(
+                    """INSERT OR REPLACE INTO samples_1m (metric, ts, avg, min, max, count)
+                       SELECT metric, CAST(ts / 60 AS INTEGER) * 60, AVG(value), MIN(value), MAX(value), COUNT(*)
+                       FROM samples_raw WHERE ts >= ? AND ts < ? GROUP BY 1, 2""",
+                    (start, end)
+                )
+                conn.execute("INSERT OR REPLACE INTO rollup_state (tier, watermark) VALUES (?, ?)", (TIER_MINUTE, end))
+
+            # 1m -> 1h (averages weighted by sample count)
+            start = self._watermark(conn, TIER_HOUR)
+            end = int(now // 3600) * 3600
+            if end > start:
+                conn.execute(
+                    """INSERT OR REPLACE INTO samples_1h (metric, ts, avg, min, max, count)
+                       SELECT metric, (ts / 3600) * 3600, SUM(avg * count) / SUM(count), MIN(min), MAX(max), SUM(count)
+                       FROM samples_1m WHERE ts >= ? AND ts < ? GROUP BY 1, 2""",
+                    (start, end)
+                )
+                conn.execute("INSERT OR REPLACE INTO rollup_state (tier, watermark) VALUES (?, ?)", (TIER_HOUR, end))
+
+            conn.execute("DELETE FROM samples_raw WHERE ts < ?", (now - self.retention[TIER_RAW],))
+            conn.execute("DELETE FROM samples_1m WHERE ts < ?", (now - self.retention[TIER_MINUTE],))
+            conn.execute("DELETE FROM samples_1h WHERE ts < ?", (now - self.retention[TIER_HOUR],))
+
+    def _query(self, metric: str, start: float, end: float, tier: str) -> List[Point]:
+        conn = self._connect()
+        if tier == TIER_RAW:
+            rows = conn.execute(
+                "SELECT ts, value, value, value FROM samples_raw WHERE metric = ? AND ts >= ? AND ts <= ? ORDER BY ts",
+                (metric, start, end)
+            )
+            return rows.fetchall()
+
+        rows = conn.execute(
+            f"SELECT ts, avg, min, max FROM samples_{tier} WHERE metric = ? AND ts >= ? AND ts <= ? ORDER BY ts",
+            (metric, start, end)
+        ).fetchall()
+        watermark = self._watermark(conn, tier)
+        if end >= watermark:
+            rows.extend(self._query_unrolled(conn, metric, max(start, watermark), end, tier))
+        return rows
+
+    def _query_unrolled(self, conn: sqlite3.Connection, metric: str, start: float, end: float, tier: str) -> List[Point]:
+        """
+        Samples newer than a tier's last rollup, bucketed at that tier's resolution on the fly,
+        so a rolled-up tier still reaches up to now (and isn't empty right after startup).
+        """
+        bucket = TIER_SECONDS[tier]
+        minute_watermark = self._watermark(conn, TIER_MINUTE) if tier == TIER_HOUR else start
+        rows = conn.execute(
+            f"""SELECT CAST(ts / {bucket} AS INTEGER) * {bucket}, SUM(avg * count) / SUM(count), MIN(min), MAX(max)
+                FROM (
+                    SELECT ts, avg, min, max, count FROM samples_1m
+                    WHERE metric = ? AND ts >= ? AND ts < ? AND ts <= ?
+                    UNION ALL
+                    SELECT ts, value, value, value, 1 FROM samples_raw
+                    WHERE metric = ? AND ts >= ? AND ts <= ?
+                )
+                GROUP BY 1 ORDER BY 1""",
+            (metric, start, minute_watermark, end, metric, max(start, minute_watermark), end)
+        )
+        return rows.fetchall()
+
+    def pick_tier(self, start: float, end: float, now: Optional[float] = None) -> str:
+        """
+        Choose the finest tier that still holds the whole range at a sensible resolution.
+
+        Args:
+            start: Range start (unix timestamp)
+            end: Range end (unix timestamp)
+            now: Current time (defaults to now)
+
+        Returns:
+            TIER_RAW, TIER_MINUTE or TIER_HOUR
+        """
+        now = now if now is not None else time.time()
+        span = end - start
+        if span <= RAW_QUERY_SPAN and start >= now - self.retention[TIER_RAW]:
+            return TIER_RAW
+        if span <= MINUTE_QUERY_SPAN and start >= now - self.retention[TIER_MINUTE]:
+            return TIER_MINUTE
+        return TIER_HOUR
+
+    async def flush(self) -> None:
+        """Write all buffered samples in one transaction."""
+        self._flush_wanted.clear()
+        if not self._buffer:
+            return
+        batch, self._buffer = self._buffer, []
+        try:
+            await self._in_thread(self._write, batch)
+        except sqlite3.Error as e:
+            self.log_action("History Write Error", f"{len(batch)} samples dropped: {e}", "error")
+
+    async def maintain(self) -> None:
+        """Run rollups and retention."""
+        try:
+            await self._in_thread(self._maintain, time.time())
+        except sqlite3.Error as e:
+            self.log_action("History Maintenance Error", str(e), "error")
+
+    async def query(
+        self,
+        metric: str,
+        start: float,
+        end: Optional[float] = None,
+        tier: Optional[str] = None
+    ) -> List[Point]:
+        """
+        Fetch the samples of one metric within a time range, oldest first.
+
+        Args:
+            metric: Metric name
+            start: Range start (unix timestamp)
+            end: Range end (defaults to now)
+            tier: TIER_RAW, TIER_MINUTE or TIER_HOUR; picked from the range when omitted
+
+        Returns:
+            List of (timestamp, avg, min, max) points
+        """
+        end = end if end is not None else time.time()
+        tier = tier or self.pick_tier(start, end)
+        await self.flush()
+        try:
+            return await self._in_thread(self._query, metric, start, end, tier)
+        except sqlite3.Error as e:
+            self.log_action("History Query Error", str(e), "error")
+            return []
+
+    async def run(self) -> None:
+        """Background loop: batched writes every flush_interval (or when the buffer fills), rollups every minute."""
+        last_maintenance = 0.0
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_wanted.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+            if time.monotonic() - last_maintenance >= 60:
+                await self.maintain()
+                last_maintenance = time.monotonic()
+
+    async def close(self) -> None:
+        """Write any remaining samples and close the database."""
+        await self.flush()
+        if self._conn is not None:
+            await self._in_thread(self._conn.close)
+            self._conn = None
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,52 @@
+import asyncio
+import time
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter: allows bursts of up to `capacity` and refills at
+    `rate` tokens per second.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1):
+        """
+        Initialize the bucket (full).
+
+        Args:
+            rate: Tokens added per second
+            capacity: Largest burst allowed
+        """
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self) -> float:
+        """Seconds until a token is available (0 if one is available now)."""
+        self._refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate if self.rate > 0 else float("inf")
+
+    def try_acquire(self) -> bool:
+        """Take a token if one is available."""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    async def acquire(self) -> None:
+        """Wait for a token and take it."""
+        while not self.try_acquire():
+            await asyncio.sleep(self.delay())
+
+    def drain(self) -> None:
+        """Empty the bucket, e.g. after the provider reports it is rate limiting us."""
+        self._refill()
+        self.tokens = 0
@@ -1,5 +1,6 @@
 import re
 import os
+import time
 from datetime import datetime
 from typing import Optional, Tuple, Dict, Any, Union, List
 
@@ -153,6 +154,21 @@ def format_hms(seconds: int) -> str:
     parts.append(f"{s}s" if s > 9 else f"{s}s ")  # always include seconds
     return ' '.join(parts)
 
+def remaining_seconds(shared_state: Dict[str, Any]) -> int:
+    """
+    Seconds left until the stake manager's current deadline.
+    The deadline is stored once as "completion_timestamp" (milliseconds since epoch);
+    consumers compute the remaining time on read instead of it being counted down.
+    
+    Args:
+        shared_state: Shared state dictionary
+        
+    Returns:
+        Remaining whole seconds (0 if there is no deadline or it has passed)
+    """
+    deadline_ms = shared_state.get("completion_timestamp") or 0
+    return max(0, int(round(deadline_ms / 1000 - time.time())))
+
 def write_to_log(file_path: str, message: str) -> None:
     """
     Write a message to the specified log file.
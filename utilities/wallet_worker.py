@@ -0,0 +1,132 @@
+import asyncio
+from typing import Optional, Dict, Callable, Awaitable, List, Sequence, Tuple
+
+
+class WalletWorker:
+    """
+    Serialising, coalescing queue in front of rusk-wallet.
+    Every wallet command is queued here and run by a fixed number of worker tasks,
+    so no more than `workers` of them run at once; identical queued reads share one
+    result, and a worker task that crashes is restarted. Each command still spawns
+    its own rusk-wallet process - no wallet process is kept alive between commands.
+    """
+
+    def __init__(
+        self,
+        execute_func: Callable[..., Awaitable[Optional[str]]],
+        workers: int = 4,
+        log_action_func=None
+    ):
+        """
+        Initialize the wallet worker.
+
+        Args:
+            execute_func: Coroutine function that runs a single wallet command
+            workers: Number of wallet commands allowed to run at the same time
+            log_action_func: Function to call for logging
+        """
+        self.execute = execute_func
+        self.workers = max(1, int(workers))
+        self.log_action = log_action_func or (lambda *args, **kwargs: None)
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._pending: Dict[Tuple[str, ...], asyncio.Future] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = False
+
+    def start(self) -> None:
+        """Start the worker tasks if they are not running yet."""
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        self._stopping = False
+        self._tasks = [task for task in self._tasks if not task.done()]
+        while len(self._tasks) < self.workers:
+            self._spawn()
+
+    def _spawn(self) -> None:
+        """Create one worker task and watch it for crashes."""
+        task = asyncio.ensure_future(self._run())
+        task.add_done_callback(self._on_worker_done)
+        self._tasks.append(task)
+
+    def _on_worker_done(self, task: asyncio.Task) -> None:
+        """Restart a worker that exited unexpectedly."""
+        if task in self._tasks:
+            self._tasks.remove(task)
+        if self._stopping or task.cancelled():
+            return
+        error = task.exception()
+        self.log_action("Wallet worker crashed", f"{error} - restarting", "error")
+        self._spawn()
+
+    async def stop(self) -> None:
+        """Stop the worker tasks and fail any commands still queued."""
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        while self._queue is not None and not self._queue.empty():
+            _, _, _, future, _ = self._queue.get_nowait()
+            if not future.done():
+                future.cancel()
+
+    async def submit(
+        self,
+        command: Sequence[str],
+        log_output: bool = True,
+        coalesce: bool = True,
+        timeout: Optional[float] = None
+    ) -> Optional[str]:
+        """
+        Queue a wallet command and wait for its output.
+
+        Args:
+            command: Wallet argument vector to execute
+            log_output: Whether to log the command and its output
+            coalesce: Share the result with an identical command that is already queued.
+                      Must be False for transactions (withdraw/stake/unstake).
+            timeout: Deadline in seconds for the command once it starts running
+
+        Returns:
+            Command output as string, or None if the command failed
+        """
+        self.start()
+
+        key = tuple(command)
+        if coalesce and key in self._pending:
+            return await asyncio.shield(self._pending[key])
+
+        future = asyncio.get_running_loop().create_future()
+        if coalesce:
+            self._pending[key] = future
+        await self._queue.put((key, log_output, timeout, future, coalesce))
+        return await asyncio.shield(future)
+
+    async def _run(self) -> None:
+        """Worker body: execute queued commands one at a time."""
+        while True:
+            key, log_output, timeout, future, coalesce = await self._queue.get()
+            try:
+                if future.done():
+                    continue
+                result = await self.execute(list(key), log_output, timeout)
+                if not future.done():
+                    future.set_result(result)
+            except asyncio.CancelledError:
+                if not future.done():
+                    future.cancel()
+                raise
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+                raise
+            finally:
+                if coalesce and self._pending.get(key) is future:
+                    del self._pending[key]
+                self._queue.task_done()
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of commands waiting for a worker."""
+        return self._queue.qsize() if self._queue is not None else 0
@@ -1,130 +1,555 @@
 import asyncio
-from aiohttp import web
+import datetime
+import logging
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
 import aiohttp
+from aiohttp import web
 
+from utilities.block_time import EPOCH_BLOCKS
+from utilities.downsample import METHODS, METHOD_LTTB, downsample, to_array
+from utilities.metrics import REGISTRY, CONTENT_TYPE as METRICS_CONTENT_TYPE, GAUGE, MetricsRegistry
+from utilities.state_snapshot import StateSnapshot, encode, state_delta, to_json
+from utilities.timeseries import METRICS, TIER_SECONDS, TIER_RAW, TimeSeriesStore
+from utilities.static_assets import (
+    Asset, StaticAssets, MIN_COMPRESS_SIZE, REVALIDATE, accepted_encoding, compress, not_modified
+)
 
-# Add these imports for WebSockets
-from aiohttp import WSCloseCode
-import weakref
+THIS_DIR = os.path.dirname(__file__)
+TEMPLATE_DIR = os.path.join(THIS_DIR, 'templates')
+STATIC_DIR = os.path.join(THIS_DIR, 'static')
 
-# Store active WebSocket connections
-active_ws_connections = weakref.WeakSet()
+PUSH_INTERVAL = 0.25  # Seconds between checks of the state version for changes to push
+SEND_TIMEOUT = 10     # Seconds a viewer may take to accept a message before it is dropped
+MAX_CACHED_BODIES = 64   # Encoded /api/data bodies kept for the current version
+HISTORY_POINTS = 300      # Default points per /api/history series
+MAX_HISTORY_POINTS = 5000
+HISTORY_RANGE = 86400     # Default /api/history range in seconds
+THEMES = ("dark", "light")
+THEME_COOKIE = "duskman_theme"
 
-# Function to broadcast updates to all connected clients
-async def broadcast_updates(shared_state, log_entries):
-    if not active_ws_connections:
-        return
-    
-    # Prepare the data to send
-    data = await get_dashboard_data()
-    
-    # Send to all connected clients
-    for ws in active_ws_connections:
-        try:
-            await ws.send_json(data)
-        except Exception as e:
-            print(f"Error sending to WebSocket: {e}")
-
-# WebSocket handler
-async def websocket_handler(request):
-    ws = web.WebSocketResponse()
-    await ws.prepare(request)
-    
-    # Add this connection to our set of active connections
-    active_ws_connections.add(ws)
-    
-    try:
-        # Send initial data
-        shared_state = request.app['shared_state']
-        log_entries = request.app['log_entries']
-        data = await get_dashboard_data()
-        await ws.send_json(data)
-        
-        # Keep the connection open and handle messages
-        async for msg in ws:
-            if msg.type == aiohttp.WSMsgType.TEXT:
-                if msg.data == 'close':
-                    await ws.close()
-            elif msg.type == aiohttp.WSMsgType.ERROR:
-                print(f'WebSocket connection closed with exception {ws.exception()}')
-    finally:
-        # Remove from active connections when done
-        active_ws_connections.discard(ws)
-    
-    return ws
-
-# Start a background task to send updates every 5 seconds
-async def start_update_broadcaster(app):
-    while True:
-        await broadcast_updates(app['shared_state'], app['log_entries'])
-        await asyncio.sleep(5)  # Send updates every 5 seconds
-
-# Add the WebSocket route and start the broadcaster
-async def start_dashboard(shared_state, log_entries, host='0.0.0.0', port=8080):
-    app = web.Application()
-    
-    # Store shared state and log entries in the app
-    app['shared_state'] = shared_state
-    app['log_entries'] = log_entries
-    
-    app.router.add_get('/ws', websocket_handler)  # Add WebSocket endpoint
-    
-    # Start the update broadcaster
-    asyncio.create_task(start_update_broadcaster(app))
-    
-    # Start the server
-    runner = web.AppRunner(app)
-    await runner.setup()
-    site = web.TCPSite(runner, host, port)
-    await site.start()
-    print(f"Dashboard running at http://{host}:{port}")
-
-async def get_dashboard_data():
+DATA_RESPONSES = REGISTRY.counter(
+    "duskman_dashboard_data_responses_total", "/api/data responses, by status (304 = client already up to date)",
+    ("status",)
+)
+
+
+def metrics_response(registry: MetricsRegistry, request: web.Request) -> web.Response:
     """
-    Get the current dashboard data from the shared state.
-    
+    The /metrics response: the registry in the Prometheus text format, compressed if the scraper accepts it.
+
+    Args:
+        registry: Metrics to render
+        request: The scrape request
+
     Returns:
-        dict: The current dashboard data
+        The response
     """
-    # Import shared_state directly from the main module to ensure we get the latest data
-    from duskman import shared_state
-    
-    # Create a deep copy to avoid modifying the original data
-    data = {
-        "block_height": shared_state.get("block_height", 0),
-        "current_epoch": shared_state.get("block_height", 0) // 2160,
-        "peer_count": shared_state.get("peer_count", 0),
-        "last_action": shared_state.get("last_action_taken", "Starting Up"),
-        "remain_time": shared_state.get("remain_time", 0),  # Keep for backward compatibility
-        "completion_time": shared_state.get("completion_time", "--:--"),  # Keep for backward compatibility
-        "completion_timestamp": shared_state.get("completion_timestamp", 0),  # New field with millisecond timestamp
-        "balances_public": shared_state.get("balances", {}).get("public", 0),
-        "balances_shielded": shared_state.get("balances", {}).get("shielded", 0),
-        "balances_total": shared_state.get("balances", {}).get("public", 0) + shared_state.get("balances", {}).get("shielded", 0),
-        "stake_info": shared_state.get("stake_info", {"stake_amount": 0, "reclaimable_slashed_stake": 0, "rewards_amount": 0}),
-        "price": shared_state.get("price", 0),
-        "active_block": shared_state.get("stake_active_blk", 0),
-        "rewards_per_epoch": shared_state.get("rewards_per_epoch", 0),
-        # Add market data fields
-        "usd_24h_change": shared_state.get("usd_24h_change", 0),
-        "price_change_7d": shared_state.get("price_change_7d", 0),
-        "price_change_30d": shared_state.get("price_change_30d", 0),
-        "price_change_1y": shared_state.get("price_change_1y", 0),
-        "volume": shared_state.get("volume", 0),
-        "market_cap": shared_state.get("market_cap", 0),
-        "market_cap_change_24h": shared_state.get("market_cap_change_24h", 0),
-        "ath": shared_state.get("ath", 0),
-        "ath_change": shared_state.get("ath_change", 0),
-        "atl": shared_state.get("atl", 0),
-    }
-    
-    # Calculate reward percentage
-    if data["stake_info"]["stake_amount"] > 0:
-        data["reward_percent"] = (data["stake_info"]["rewards_amount"] / data["stake_info"]["stake_amount"]) * 100
-    else:
-        data["reward_percent"] = 0
-    
+    body = registry.render().encode('utf-8')
+    headers = {'Cache-Control': 'no-store', 'Content-Type': METRICS_CONTENT_TYPE, 'Vary': 'Accept-Encoding'}
+    encoding = accepted_encoding(request.headers.get('Accept-Encoding', ''))
+    if encoding is not None and len(body) >= MIN_COMPRESS_SIZE:
+        body = compress(body, encoding)
+        headers['Content-Encoding'] = encoding
+    return web.Response(body=body, headers=headers)
+
+
+def dashboard_data(view: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The dashboard's "data" object, built from a state snapshot view.
+
+    Args:
+        view: StateSnapshot view of the shared state
+
+    Returns:
+        dict: Dashboard fields
+    """
+    balances = view.get("balances") or {}
+    stake_info = view.get("stake_info") or {}
+    public = balances.get("public") or 0.0
+    shielded = balances.get("shielded") or 0.0
+    stake = stake_info.get("stake_amount") or 0.0
+    rewards = stake_info.get("rewards_amount") or 0.0
+    block_height = view.get("block_height") or 0
     return {
-        "data": data,
-        "log_entries": shared_state.get("log_entries", [])
-    } 
\ No newline at end of file
+        "block_height": block_height,
+        "peer_count": view.get("peer_count") or 0,
+        "completion_time": view.get("completion_time") or "--:--",
+        "completion_timestamp": view.get("completion_timestamp") or 0,
+        "balances_public": public,
+        "balances_shielded": shielded,
+        "balances_total": public + shielded,
+        "price": view.get("price") or 0.0,
+        "usd_24h_change": view.get("usd_24h_change") or 0.0,
+        "stake_info": {
+            "stake_amount": stake,
+            "rewards_amount": rewards,
+            "reclaimable_slashed_stake": stake_info.get("reclaimable_slashed_stake") or 0.0,
+        },
+        "last_action": view.get("last_action_taken") or "",
+        "rendered": view.get("rendered"),
+
+        # Market data
+        "price_change_7d": view.get("price_change_percentage_7d_in_currency") or 0,
+        "price_change_30d": view.get("price_change_percentage_30d_in_currency") or 0,
+        "price_change_1y": view.get("price_change_percentage_1y_in_currency") or 0,
+        "volume": view.get("volume") or 0,
+        "market_cap": view.get("market_cap") or 0,
+        "market_cap_change_24h": view.get("market_cap_change_percentage_24h") or 0,
+        "ath": view.get("ath") or 0,
+        "ath_change": view.get("ath_change_percentage") or 0,
+        "ath_date": view.get("ath_date") or "",
+        "atl": view.get("atl") or 0,
+        "atl_date": view.get("atl_date") or "",
+
+        # Rewards per epoch only once there has been at least one claim
+        "rewards_per_epoch": (view.get("rewards_per_epoch") or 0) if (view.get("last_claim_block") or 0) > 0 else 0,
+        "reward_percent": (rewards / stake) * 100 if stake > 0 else 0,
+
+        # Epoch information
+        "current_epoch": block_height // EPOCH_BLOCKS,
+        "active_block": view.get("active_blk") or 0,
+    }
+
+
+class DashboardServer:
+    """
+    The web dashboard: an aiohttp server running in the main event loop.
+
+    Routes:
+        - /          => main HTML page, pre-rendered per (year, theme), with an ETag
+        - /static/*  => fingerprinted CSS/JS, cached by browsers for a year, precompressed
+        - /api/data  => JSON with real-time stats + logs (?cursor=N for only the entries newer than N),
+                        cached and compressed per state version, with ETag / 304 Not Modified
+        - /api/history => one metric's recorded history, downsampled on the server
+                        (?metric=price&from=UNIX&to=UNIX&points=N&method=lttb|minmax)
+        - /ws        => WebSocket push: a full snapshot, then only the changed fields and new log
+                        entries (?since=VERSION&cursor=N&server=ID resumes after a reconnect)
+        - /metrics   => Prometheus text format metrics (only when a metrics registry is given)
+
+    Every response is built from the cached StateSnapshot view of the current state version,
+    so all viewers see a consistent state and unchanged state is never rebuilt. Each push
+    message is serialized once per (base version, new version, log cursor) and shared by every
+    viewer at that point. A slow viewer is sent one combined delta when it is ready instead of
+    every intermediate version, and dropped if it stops accepting data for SEND_TIMEOUT seconds.
+    """
+
+    def __init__(
+        self,
+        shared_state: Dict[str, Any],
+        snapshot: Optional[StateSnapshot] = None,
+        host: str = "0.0.0.0",
+        port: int = 5000,
+        update_interval: float = PUSH_INTERVAL,
+        log_action_func=None,
+        max_versions: int = 64,
+        history: Optional[TimeSeriesStore] = None,
+        metrics: Optional[MetricsRegistry] = None
+    ):
+        """
+        Initialize the dashboard server.
+
+        Args:
+            shared_state: Shared state dictionary
+            snapshot: Snapshot serializer for the shared state (created if not given)
+            host: Address to listen on
+            port: Port to listen on
+            update_interval: Seconds between checks for state changes to push to WebSocket clients
+            log_action_func: Function to call for logging
+            max_versions: Recent versions kept so reconnecting and slow viewers can get deltas
+            history: Time-series store behind /api/history (the endpoint is disabled without one)
+            metrics: Registry served at /metrics (the endpoint is disabled without one)
+        """
+        self.shared_state = shared_state
+        self.snapshot = snapshot or StateSnapshot(shared_state)
+        self.host = host
+        self.port = int(port)
+        self.update_interval = update_interval
+        self.log_action = log_action_func or (lambda *args, **kwargs: None)
+
+        self.app = web.Application()
+        self.app.router.add_get('/', self.index)
+        self.app.router.add_get('/api/data', self.data_api)
+        self.app.router.add_get('/api/history', self.history_api)
+        self.app.router.add_get('/ws', self.websocket_handler)
+        self.metrics = metrics
+        if metrics is not None:
+            self.app.router.add_get('/metrics', self.metrics_api)
+
+        self._runner: Optional[web.AppRunner] = None
+        self.max_versions = max(int(max_versions), 1)
+        self.history = history
+        self.server_id = f"{int(time.time() * 1000):x}"
+        self._viewers: Dict[web.WebSocketResponse, "_Viewer"] = {}
+        self._data_version: Optional[int] = None
+        self._data: Dict[str, Any] = {}
+        self._data_history: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._messages: Dict[Tuple[Optional[int], int], Tuple[str, int]] = {}
+        self._bodies: Dict[Tuple[int, Optional[str]], bytes] = {}  # (cursor, encoding) -> /api/data body
+
+        # Page template and static assets are loaded once; the page is rendered per (year, theme)
+        with open(os.path.join(TEMPLATE_DIR, 'dashboard.html'), 'r', encoding='utf-8') as f:
+            self._template = f.read()
+        self.static = StaticAssets(STATIC_DIR)
+        self.app.router.add_get('/static/{name}', self.static.handler)
+        self._pages: Dict[Tuple[int, str], Asset] = {}
+
+    def page(self, theme: str = "dark") -> Asset:
+        """
+        The dashboard page for a theme, rendered once per (year, theme) and kept with its content hash.
+
+        Args:
+            theme: "dark" or "light"
+
+        Returns:
+            The page as an Asset
+        """
+        year = datetime.datetime.now().year
+        theme = theme if theme in THEMES else THEMES[0]
+        key = (year, theme)
+        page = self._pages.get(key)
+        if page is None:
+            dark_css, light_css = self.static.url('dark.css'), self.static.url('light.css')
+            html = (
+                self._template
+                .replace('{{ year }}', str(year))
+                .replace('{{ theme }}', theme)
+                .replace('{{ theme_css }}', dark_css if theme == 'dark' else light_css)
+                .replace('{{ dark_css }}', dark_css)
+                .replace('{{ light_css }}', light_css)
+                .replace('{{ dashboard_js }}', self.static.url('dashboard.js'))
+            )
+            self._pages = {k: v for k, v in self._pages.items() if k[0] == year}
+            page = self._pages[key] = Asset(html.encode('utf-8'), 'text/html; charset=utf-8')
+        return page
+
+    def data(self) -> Dict[str, Any]:
+        """Dashboard data for the current state version (cached; do not modify it)."""
+        version = self.snapshot.version
+        if version is None or version != self._data_version:
+            self._data = dashboard_data(self.snapshot.view())
+            self._data["version"] = version
+            self._data_version = version
+            if version is not None:
+                self._data_history[version] = self._data
+                while len(self._data_history) > self.max_versions:
+                    self._data_history.popitem(last=False)
+            self._messages.clear()
+            self._bodies.clear()
+        return self._data
+
+    def payload(self, cursor: int = 0) -> Dict[str, Any]:
+        """
+        The /api/data body: dashboard data plus the log entries newer than a cursor.
+
+        Args:
+            cursor: Newest log sequence number the client already has
+
+        Returns:
+            dict: {"data", "log_entries", "log_items", "log_cursor", "log_reset"}
+        """
+        return {"data": self.data(), **self.shared_state["log_entries"].response(cursor)}
+
+    def etag(self) -> Optional[str]:
+        """Weak ETag of the current state version (None if the state isn't versioned)."""
+        version = self.data()["version"]
+        return None if version is None else f'W/"{self.server_id}-{version}"'
+
+    def body(self, cursor: int, encoding: Optional[str]) -> bytes:
+        """
+        The encoded /api/data body, built and compressed once per state version, cursor and encoding.
+
+        Args:
+            cursor: Newest log sequence number the client already has
+            encoding: Content encoding ("br", "gzip" or None)
+
+        Returns:
+            Body bytes
+        """
+        self.data()  # drops the cached bodies if the version changed
+        key = (cursor, encoding)
+        body = self._bodies.get(key)
+        if body is None:
+            if encoding is None:
+                body = encode(self.payload(cursor))
+            else:
+                body = compress(self.body(cursor, None), encoding)
+            if self._data_version is not None:
+                if len(self._bodies) >= MAX_CACHED_BODIES:
+                    self._bodies.clear()
+                self._bodies[key] = body
+        return body
+
+    def message(self, since: Optional[int], cursor: int) -> Tuple[str, Optional[int], int]:
+        """
+        The push message bringing a viewer from the version and log cursor it has to the current ones.
+
+        Args:
+            since: State version the viewer has (None for a full snapshot)
+            cursor: Newest log sequence number the viewer has
+
+        Returns:
+            (JSON text, version it brings the viewer to, new log cursor)
+        """
+        data = self.data()
+        version = data["version"]
+        old = self._data_history.get(since) if since is not None else None
+        if old is None:
+            cursor = 0  # a full snapshot also resends the whole log history
+        key = (since if old is not None else None, cursor)
+        cached = self._messages.get(key) if version is not None else None
+        if cached is not None:
+            return cached[0], version, cached[1]
+
+        if old is None:
+            message = {"type": "full", "version": version, "data": data}
+        else:
+            message = state_delta(old, data)
+            message["type"] = "delta"
+        logs = self.shared_state["log_entries"].response(cursor)
+        message["log_items"] = logs["log_items"]
+        message["log_cursor"] = logs["log_cursor"]
+        message["log_reset"] = logs["log_reset"] or old is None
+        message["server"] = self.server_id
+        message["now"] = int(time.time() * 1000)
+        text = to_json(message)
+        if version is not None:
+            self._messages[key] = (text, logs["log_cursor"])
+        return text, version, logs["log_cursor"]
+
+    @property
+    def viewer_count(self) -> int:
+        """Number of connected WebSocket viewers."""
+        return len(self._viewers)
+
+    def register_metrics(self, registry: MetricsRegistry = REGISTRY) -> None:
+        """
+        Export the number of connected viewers, read when metrics are collected.
+
+        Args:
+            registry: Registry to add the metrics to
+        """
+        registry.register_callback(
+            "duskman_dashboard_viewers", "Connected dashboard WebSocket viewers", GAUGE, lambda: self.viewer_count
+        )
+
+    async def index(self, request: web.Request) -> web.Response:
+        return self.page(request.cookies.get(THEME_COOKIE, THEMES[0])).response(request, REVALIDATE)
+
+    async def data_api(self, request: web.Request) -> web.Response:
+        try:
+            cursor = int(request.query.get('cursor', 0))
+        except ValueError:
+            cursor = 0
+        headers = {'Cache-Control': REVALIDATE, 'Vary': 'Accept-Encoding'}
+        etag = self.etag()
+        if etag is not None:
+            headers['ETag'] = etag
+            if not_modified(request, etag):
+                DATA_RESPONSES.labels(304).inc()
+                return web.Response(status=304, headers=headers)
+
+        encoding = accepted_encoding(request.headers.get('Accept-Encoding', ''))
+        body = self.body(cursor, None)
+        if encoding is not None and len(body) >= MIN_COMPRESS_SIZE:
+            body = self.body(cursor, encoding)
+            headers['Content-Encoding'] = encoding
+        DATA_RESPONSES.labels(200).inc()
+        return web.Response(body=body, headers=headers, content_type='application/json')
+
+    async def metrics_api(self, request: web.Request) -> web.Response:
+        return metrics_response(self.metrics, request)
+
+    async def history_api(self, request: web.Request) -> web.Response:
+        if self.history is None:
+            return web.json_response({"error": "History is disabled"}, status=404)
+        query = request.query
+        metric = query.get('metric', '')
+        if metric not in METRICS:
+            return web.json_response({"error": f"Unknown metric, expected one of: {', '.join(METRICS)}"}, status=400)
+        method = query.get('method', METHOD_LTTB)
+        tier = query.get('tier') or None
+        if method not in METHODS or (tier is not None and tier not in (TIER_RAW, *TIER_SECONDS)):
+            return web.json_response({"error": "Unknown method or tier"}, status=400)
+        try:
+            end = float(query.get('to') or time.time())
+            start = float(query.get('from') or end - HISTORY_RANGE)
+            points = min(max(int(query.get('points', HISTORY_POINTS)), 2), MAX_HISTORY_POINTS)
+        except ValueError:
+            return web.json_response({"error": "from, to and points must be finite numbers"}, status=400)
+        if not (math.isfinite(start) and math.isfinite(end)):
+            return web.json_response({"error": "from, to and points must be finite numbers"}, status=400)
+        if start >= end:
+            return web.json_response({"error": "from must be before to"}, status=400)
+
+        tier = tier or self.history.pick_tier(start, end)
+        series = downsample(to_array(await self.history.query(metric, start, end, tier)), points, method)
+        return web.json_response({
+            "metric": metric,
+            "from": start,
+            "to": end,
+            "tier": tier,
+            "method": method,
+            "points": series.tolist(),  # [timestamp, avg, min, max]
+        }, dumps=to_json)
+
+    async def websocket_handler(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        try:
+            since = int(request.query['since']) if 'since' in request.query else None
+            cursor = int(request.query.get('cursor', 0))
+        except ValueError:
+            since, cursor = None, 0
+        if request.query.get('server') != self.server_id:
+            since = None  # versions from before a restart mean nothing now
+
+        viewer = _Viewer(ws, since, cursor)
+        self._viewers[ws] = viewer
+        writer = asyncio.create_task(self._push(viewer))
+        try:
+            async for msg in ws:
+                if msg.type == aiohttp.WSMsgType.TEXT and msg.data == 'close':
+                    await ws.close()
+                elif msg.type == aiohttp.WSMsgType.ERROR:
+                    logging.debug(f"Dashboard WebSocket closed with exception {ws.exception()}")
+        finally:
+            self._viewers.pop(ws, None)
+            writer.cancel()
+        return ws
+
+    async def _push(self, viewer: "_Viewer") -> None:
+        """
+        Send a viewer whatever it is missing each time the state changes. Changes made while a
+        send is in progress are combined into the next message, so a slow viewer never queues
+        up stale versions.
+        """
+        ws = viewer.ws
+        while not ws.closed:
+            await viewer.wake.wait()
+            viewer.wake.clear()
+            if viewer.version is not None and viewer.version == self.snapshot.version:
+                continue
+            text, version, cursor = self.message(viewer.version, viewer.cursor)
+            try:
+                await asyncio.wait_for(ws.send_str(text), SEND_TIMEOUT)
+            except asyncio.TimeoutError:
+                logging.debug("Dashboard viewer too slow, disconnecting it.")
+                await ws.close(code=aiohttp.WSCloseCode.TRY_AGAIN_LATER, message=b'Too slow')
+                return
+            except (ConnectionResetError, RuntimeError) as e:
+                logging.debug(f"Dashboard WebSocket send failed: {e}")
+                return
+            viewer.version, viewer.cursor = version, cursor
+
+    def broadcast(self) -> None:
+        """Wake every viewer's sender to push the current state."""
+        for viewer in list(self._viewers.values()):
+            viewer.wake.set()
+
+    async def start(self) -> bool:
+        """
+        Start listening.
+
+        Returns:
+            bool: False if the server couldn't be started (e.g. the port is in use)
+        """
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        try:
+            await site.start()
+        except OSError as e:
+            self.log_action("Web Dashboard Error", f"Could not listen on {self.host}:{self.port}: {e}", "error")
+            await self._runner.cleanup()
+            self._runner = None
+            return False
+        logging.debug(f"DuskMan dashboard running at http://{self.host}:{self.port}")
+        return True
+
+    async def run(self) -> None:
+        """Push state changes to WebSocket clients until cancelled."""
+        last_version = self.snapshot.version
+        while True:
+            await asyncio.sleep(self.update_interval)
+            version = self.snapshot.version
+            if version is None or version != last_version:
+                if self._viewers:
+                    self.broadcast()
+                last_version = version
+
+    async def close(self) -> None:
+        """Close WebSocket connections and stop the server."""
+        for ws in list(self._viewers):
+            await ws.close(code=aiohttp.WSCloseCode.GOING_AWAY, message=b'Server shutdown')
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+class _Viewer:
+    """A connected WebSocket viewer: the state version and log cursor it has been sent."""
+    __slots__ = ("ws", "version", "cursor", "wake")
+
+    def __init__(self, ws: web.WebSocketResponse, version: Optional[int], cursor: int):
+        self.ws = ws
+        self.version = version
+        self.cursor = cursor
+        self.wake = asyncio.Event()
+        self.wake.set()  # send the initial snapshot (or the delta since a resumed version)
+
+
+class MetricsServer:
+    """
+    A minimal aiohttp server with only /metrics, for scraping metrics when the web dashboard is disabled.
+    """
+
+    def __init__(self, registry: MetricsRegistry = REGISTRY, host: str = "0.0.0.0", port: int = 5000, log_action_func=None):
+        """
+        Initialize the metrics server.
+
+        Args:
+            registry: Metrics to serve
+            host: Address to listen on
+            port: Port to listen on
+            log_action_func: Function to call for logging
+        """
+        self.registry = registry
+        self.host = host
+        self.port = int(port)
+        self.log_action = log_action_func or (lambda *args, **kwargs: None)
+        self.app = web.Application()
+        self.app.router.add_get('/metrics', self.metrics_api)
+        self._runner: Optional[web.AppRunner] = None
+
+    async def metrics_api(self, request: web.Request) -> web.Response:
+        return metrics_response(self.registry, request)
+
+    async def start(self) -> bool:
+        """
+        Start listening.
+
+        Returns:
+            bool: False if the server couldn't be started (e.g. the port is in use)
+        """
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        try:
+            await web.TCPSite(self._runner, self.host, self.port).start()
+        except OSError as e:
+            self.log_action("Metrics Server Error", f"Could not listen on {self.host}:{self.port}: {e}", "error")
+            await self._runner.cleanup()
+            self._runner = None
+            return False
+        logging.debug(f"DuskMan metrics at http://{self.host}:{self.port}/metrics")
+        return True
+
+    async def close(self) -> None:
+        """Stop the server."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None